@@ -0,0 +1,147 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+# Compares the PDFBodyLexer to the chunked token reader that StreamRepr used
+# previously for finding object boundaries in the body of a PDF file.
+
+import sys
+import time
+import random
+import argparse
+from llpdf.FileRepr import StreamRepr, TokenDelimiter
+from llpdf.repr.PDFBodyLexer import PDFBodyLexer
+
+class LegacyStreamRepr(StreamRepr):
+	"""The previous, chunk-based implementation of the token reader."""
+	def read_until(self, delimiters, chunksize = 128):
+		delimiters = set(delimiters)
+		delimiter_patterns = [ (delimiter, delimiter.to_bytes()) for delimiter in sorted(delimiters) if (delimiter != TokenDelimiter.EOF) ]
+		match_eof = TokenDelimiter.EOF in delimiters
+
+		initial_pos = self.tell()
+		result = bytearray()
+		start_offset = 0
+		while True:
+			new_data = self.read(chunksize)
+			if len(new_data) == 0:
+				return None
+
+			result += new_data
+
+			matches = [ (result.find(pattern, start_offset), delimiter, pattern) for (delimiter, pattern) in delimiter_patterns ]
+			matches = [ (index, delimiter, pattern) for (index, delimiter, pattern) in matches if (index != -1) ]
+			if len(matches) > 0:
+				matches.sort()
+				(index, delimiter, pattern) = matches[0]
+				found_data = result[ : index]
+				self.seek(initial_pos + len(found_data) + len(pattern))
+				return (found_data, delimiter)
+
+			if self.at_eof and match_eof:
+				return (result, TokenDelimiter.EOF)
+
+			start_offset = len(result) - 2
+
+	def _read_until_pattern(self, pattern, chunksize = 128 * 1024):
+		result = bytearray()
+		initial_pos = self.tell()
+		while True:
+			new_data = self.read(chunksize)
+			if len(new_data) == 0:
+				return None
+
+			result += new_data
+			index = result.find(pattern)
+			if index != -1:
+				found_data = result[ : index]
+				self.seek(initial_pos + index)
+				return found_data
+
+	def read_next_token(self, accept_empty_data = False, accept_eof = False):
+		delimiters = [ TokenDelimiter.CRLF, TokenDelimiter.CR, TokenDelimiter.LF, TokenDelimiter.TAB, TokenDelimiter.SPACE ]
+		if accept_eof:
+			delimiters.append(TokenDelimiter.EOF)
+		while True:
+			next_token = self.read_until(delimiters)
+			if next_token is None:
+				return None
+			(data, delimiter) = next_token
+
+			if (len(data.strip(b"\r\n\t ")) == 0) and (not accept_empty_data):
+				continue
+			return data
+
+def generate_body(object_count, max_stream_size):
+	prng = random.Random(0)
+	body = bytearray()
+	for objid in range(1, object_count + 1):
+		body += b"%d 0 obj\n" % (objid)
+		if prng.randint(0, 3) == 0:
+			stream_data = prng.randbytes(prng.randint(0, max_stream_size))
+			body += b"<< /Length %d /Filter /FlateDecode >>\nstream\n" % (len(stream_data))
+			body += stream_data.replace(b"endobj", b"endobk")
+			body += b"\nendstream\n"
+		else:
+			body += b"<< /Type /Annot /Rect [ 0 0 100 200 ] /Parent 1 0 R >>\n"
+		body += b"endobj\n"
+	return bytes(body)
+
+def legacy_boundaries(body):
+	f = LegacyStreamRepr(body)
+	count = 0
+	while True:
+		pos = f.tell()
+		objid = f.read_next_token()
+		gennum = f.read_next_token()
+		object_start = f.read_next_token()
+		object_data = f.read_until_token(b"endobj")
+		if (object_start is None) or (object_data is None) or (object_start != b"obj"):
+			f.seek(pos)
+			break
+		count += 1
+	return count
+
+def lexer_boundaries(body):
+	return sum(1 for boundary in PDFBodyLexer(StreamRepr(body)))
+
+def measure(function, body, repeats):
+	times = [ ]
+	for i in range(repeats):
+		t0 = time.perf_counter()
+		count = function(body)
+		times.append(time.perf_counter() - t0)
+	return (count, min(times))
+
+parser = argparse.ArgumentParser(description = "Benchmark finding object boundaries in a PDF body.")
+parser.add_argument("-n", "--objects", metavar = "count", type = int, default = 20000, help = "Number of objects in the synthetic PDF body. Defaults to %(default)d.")
+parser.add_argument("-s", "--max-stream-size", metavar = "bytes", type = int, default = 16384, help = "Maximum size of a stream in the synthetic PDF body. Defaults to %(default)d.")
+parser.add_argument("-r", "--repeats", metavar = "count", type = int, default = 3, help = "Number of times each measurement is repeated. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+body = generate_body(args.objects, args.max_stream_size)
+print("Synthetic body: %d objects, %.1f MiB" % (args.objects, len(body) / 1024 / 1024))
+(legacy_count, legacy_time) = measure(legacy_boundaries, body, args.repeats)
+(lexer_count, lexer_time) = measure(lexer_boundaries, body, args.repeats)
+assert(legacy_count == lexer_count == args.objects)
+print("Chunked token reader: %7.3f sec" % (legacy_time))
+print("PDFBodyLexer:         %7.3f sec (%.1fx faster)" % (lexer_time, legacy_time / lexer_time))
@@ -0,0 +1,56 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+# Compares the size and time of Flate compression with different compression
+# settings on content-stream-like and binary data.
+
+import sys
+import zlib
+import time
+import random
+import argparse
+from llpdf.CompressionPolicy import CompressionSettings, CompressionBackend, zopfli
+
+parser = argparse.ArgumentParser(description = "Benchmark Flate compression settings.")
+parser.add_argument("-s", "--size", metavar = "kib", type = int, default = 1024, help = "Size of the compressed data in kiB. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+rng = random.Random(0)
+content_stream = b"".join(b"%d %d %d %d re f\nBT /F1 %d Tf (%s) Tj ET\n" % (rng.randrange(600), rng.randrange(800), rng.randrange(100), rng.randrange(100), rng.randrange(6, 20), rng.randbytes(4).hex().encode()) for i in range(args.size * 24))[ : args.size * 1024]
+binary = bytes(rng.choice((0, 0, 0, 1, 2, 3, 255, rng.randrange(256))) for i in range(args.size * 1024))
+
+settings = [
+	("zlib fast", CompressionSettings.fast()),
+	("zlib default", CompressionSettings()),
+	("zlib maximum", CompressionSettings.maximum()),
+	("zlib RLE", CompressionSettings(strategy = zlib.Z_RLE)),
+	("zlib 4k window", CompressionSettings(window_bits = 12)),
+	("exhaustive", CompressionSettings(backend = CompressionBackend.Exhaustive)),
+]
+if zopfli is not None:
+	settings.append(("zopfli", CompressionSettings(backend = CompressionBackend.Zopfli)))
+
+for (data_name, data) in [ ("content", content_stream), ("binary", binary) ]:
+	for (settings_name, compression) in settings:
+		t0 = time.perf_counter()
+		compressed = compression.compress(data)
+		t1 = time.perf_counter()
+		print("%-8s %-15s %8d bytes (%5.1f%%) %7.3f sec" % (data_name, settings_name, len(compressed), 100 * len(compressed) / len(data), t1 - t0))
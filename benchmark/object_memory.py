@@ -0,0 +1,79 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Reports the memory used per PDFObject for a document consisting of many
+# small objects, once as read, once with all contents parsed and once after
+# compacting the document again.
+
+import sys
+import gc
+import tempfile
+import argparse
+import tracemalloc
+from llpdf.PDFDocument import PDFDocument
+from llpdf.PDFReader import PDFReader
+from llpdf.PDFWriter import PDFWriter
+from llpdf.EncodeDecode import EncodedObject
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFXRef import PDFXRef
+
+def create_document(count):
+	pdf = PDFDocument()
+	pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+	pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+	for objid in range(2, count + 1):
+		if (objid % 4) == 0:
+			pdf.add(PDFObject.create(objid, 0, { PDFName("/Foo"): objid }, stream = EncodedObject.create(b"BT ET")))
+		else:
+			pdf.add(PDFObject.create(objid, 0, { PDFName("/Type"): PDFName("/Annot"), PDFName("/Rect"): [ 0, 0, objid, objid ], PDFName("/P"): PDFXRef(objid + 1, 0) }))
+	return pdf
+
+def traced_memory():
+	gc.collect()
+	return tracemalloc.get_traced_memory()[0]
+
+parser = argparse.ArgumentParser(description = "Report memory usage per PDFObject.")
+parser.add_argument("-n", "--count", metavar = "count", type = int, default = 50000, help = "Number of objects. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+with tempfile.NamedTemporaryFile(suffix = ".pdf") as f:
+	PDFWriter(use_object_streams = False).write(create_document(args.count), f.name)
+	with open(f.name, "rb") as pdf_file:
+		file_size = len(pdf_file.read())
+
+	tracemalloc.start()
+	before = traced_memory()
+	pdf = PDFReader().read(f.name)
+	objcount = pdf.objcount
+	read = traced_memory()
+	print("File size:         %6.1f bytes per object" % (file_size / objcount))
+	print("Read:              %6.1f bytes per object" % ((read - before - file_size) / objcount))
+
+	for obj in pdf:
+		obj.content
+	parsed = traced_memory()
+	print("Contents parsed:   %6.1f bytes per object" % ((parsed - before - file_size) / objcount))
+
+	pdf.compact()
+	compacted = traced_memory()
+	print("Compacted:         %6.1f bytes per object" % ((compacted - before - file_size) / objcount))
@@ -0,0 +1,59 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+# Compares the recursive-descent PDFObjectParser to the TPG grammar on typical
+# object dictionaries.
+
+import sys
+import time
+import argparse
+from llpdf.repr import PDFParser
+from llpdf.repr.PDFObjectParser import PDFObjectParser
+
+SAMPLES = [
+	"<< /Type /Page /Parent 3 0 R /Resources << /Font << /F1 12 0 R /F2 13 0 R >> /ProcSet [ /PDF /Text ] >> /MediaBox [ 0 0 595.276 841.89 ] /Contents 14 0 R >>",
+	"<< /Type /Annot /Subtype /Link /Rect [ 71.004 692.73 183.312 704.466 ] /Border [ 0 0 0 ] /A << /S /URI /URI (https://example.com/foo\\(bar\\)) >> >>",
+	"<< /Type /FontDescriptor /FontName /ABCDEF+Helvetica /Flags 32 /FontBBox [ -166 -225 1000 931 ] /ItalicAngle 0 /Ascent 718 /Descent -207 /CapHeight 718 /StemV 88 /FontFile2 21 0 R >>",
+	"[ 278 278 355 556 556 889 667 191 333 333 389 584 278 333 278 278 556 556 556 556 556 556 556 556 556 556 278 278 584 584 584 556 ]",
+	"<< /Length 1234 /Filter /FlateDecode /DecodeParms << /Predictor 12 /Columns 5 >> /ID [ <0123456789abcdef0123456789abcdef> <fedcba9876543210fedcba9876543210> ] >>",
+]
+
+def measure(function, count):
+	t0 = time.perf_counter()
+	for i in range(count):
+		for sample in SAMPLES:
+			function(sample)
+	return time.perf_counter() - t0
+
+parser = argparse.ArgumentParser(description = "Benchmark parsing of PDF object syntax.")
+parser.add_argument("-n", "--iterations", metavar = "count", type = int, default = 500, help = "Number of times each sample is parsed. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+for sample in SAMPLES:
+	assert(PDFObjectParser.parse(sample) == PDFParser.parse_tpg(sample))
+
+tpg_time = measure(PDFParser.parse_tpg, args.iterations)
+fast_time = measure(PDFObjectParser.parse, args.iterations)
+print("Parsed %d expressions" % (args.iterations * len(SAMPLES)))
+print("TPG grammar:     %7.3f sec" % (tpg_time))
+print("PDFObjectParser: %7.3f sec (%.1fx faster)" % (fast_time, tpg_time / fast_time))
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Compares compressing many streams and writing a document with many object
+# streams with different numbers of worker threads.
+
+import os
+import sys
+import time
+import random
+import tempfile
+import argparse
+from llpdf.PDFDocument import PDFDocument
+from llpdf.PDFWriter import PDFWriter
+from llpdf.EncodeDecode import EncodedObject
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFXRef import PDFXRef
+from llpdf.tools.WorkerPool import WorkerPool
+
+parser = argparse.ArgumentParser(description = "Benchmark parallel compression.")
+parser.add_argument("-s", "--streams", metavar = "count", type = int, default = 64, help = "Number of 1 MiB streams to compress. Defaults to %(default)d.")
+parser.add_argument("-n", "--objects", metavar = "count", type = int, default = 200000, help = "Number of objects in the written document. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+rng = random.Random(0)
+words = [ rng.randbytes(rng.randrange(2, 8)).hex().encode() for i in range(1000) ]
+datas = [ b" ".join(rng.choices(words, k = 100000))[ : 1024 * 1024] for i in range(args.streams) ]
+
+pdf = PDFDocument()
+pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+for objid in range(2, args.objects + 1):
+	pdf.add(PDFObject.create(objid, 0, { PDFName("/Type"): PDFName("/Annot"), PDFName("/Rect"): [ 0, 0, objid, objid ], PDFName("/Contents"): rng.choice(words) }))
+
+for max_workers in sorted(set([ 1, 2, 4, os.cpu_count() or 1 ])):
+	WorkerPool.set_max_workers(max_workers)
+	t0 = time.perf_counter()
+	EncodedObject.create_many(datas)
+	t1 = time.perf_counter()
+	with tempfile.NamedTemporaryFile(suffix = ".pdf") as f:
+		PDFWriter(compress_object_count = 1000).write(pdf, f.name)
+	t2 = time.perf_counter()
+	print("%2d workers: create_many() %.3f sec, write() %.3f sec" % (max_workers, t1 - t0, t2 - t1))
@@ -0,0 +1,63 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Measures undoing PNG prediction on image-sized data for every predictor,
+# with and without NumPy, and the compressed size that applying each
+# predictor to a smooth image yields.
+
+import sys
+import time
+import random
+import argparse
+import zlib
+from llpdf.PNGPrediction import PNGPrediction, PNGPredictor, numpy
+
+parser = argparse.ArgumentParser(description = "Benchmark PNG predictor decoding.")
+parser.add_argument("-w", "--width", metavar = "pixels", type = int, default = 1000, help = "Image width in pixels. Defaults to %(default)d.")
+parser.add_argument("-H", "--height", metavar = "pixels", type = int, default = 1000, help = "Image height in pixels. Defaults to %(default)d.")
+parser.add_argument("-c", "--colors", metavar = "count", type = int, default = 3, help = "Color components per pixel. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+row_length = args.width * args.colors
+prediction = PNGPrediction(row_length, args.colors)
+random_data = random.Random(0).randbytes(args.height * row_length)
+for png_predictor in PNGPredictor:
+	data = b"".join(bytes([ png_predictor ]) + random_data[row * row_length : (row + 1) * row_length] for row in range(args.height))
+	results = [ ]
+	for use_numpy in ([ False, True ] if (numpy is not None) else [ False ]):
+		t0 = time.perf_counter()
+		prediction.depredict(data, use_numpy = use_numpy)
+		results.append("%s %.3f sec" % ("NumPy" if use_numpy else "native", time.perf_counter() - t0))
+	print("%-8s %s" % (png_predictor.name + ":", ", ".join(results)))
+
+# Smooth gradient with some noise, as is typical for photographs
+rng = random.Random(1)
+image_data = bytes(((((c + 1) * x) // 4 + y // 2 + ((x * y) // (1000 * (c + 1))) + rng.randrange(4)) & 0xff) for y in range(args.height) for x in range(args.width) for c in range(args.colors))
+print()
+print("%-8s %d bytes" % ("Raw:", len(zlib.compress(image_data))))
+for png_predictor in list(PNGPredictor) + [ None ]:
+	results = [ ]
+	for use_numpy in ([ False, True ] if (numpy is not None) else [ False ]):
+		t0 = time.perf_counter()
+		predicted_data = prediction.predict(image_data, png_predictor = png_predictor, use_numpy = use_numpy)
+		results.append("%s %.3f sec %d bytes" % ("NumPy" if use_numpy else "native", time.perf_counter() - t0, len(zlib.compress(predicted_data))))
+	print("%-8s %s" % (((png_predictor.name if (png_predictor is not None) else "Optimum") + ":"), ", ".join(results)))
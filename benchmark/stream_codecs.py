@@ -0,0 +1,53 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Measures encoding and decoding throughput of the stream filters on
+# image-like data.
+
+import sys
+import time
+import random
+import argparse
+from llpdf.StreamCodecs import ASCIIHexCodec, ASCII85Codec, LZWCodec, RunLengthCodec
+
+parser = argparse.ArgumentParser(description = "Benchmark stream filter codecs.")
+parser.add_argument("-s", "--size", metavar = "bytes", type = int, default = 1024 * 1024, help = "Size of the sample data. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+# Runs of random length of either constant or random bytes
+rng = random.Random(0)
+data = bytearray()
+while len(data) < args.size:
+	if rng.random() < 0.5:
+		data += bytes([ rng.randrange(256) ]) * rng.randrange(1, 64)
+	else:
+		data += rng.randbytes(rng.randrange(1, 64))
+data = bytes(data[ : args.size])
+
+for codec in [ ASCIIHexCodec, ASCII85Codec, LZWCodec, RunLengthCodec ]:
+	t0 = time.perf_counter()
+	encoded_data = codec.encode(data)
+	t1 = time.perf_counter()
+	decoded_data = codec.decode(encoded_data)
+	t2 = time.perf_counter()
+	assert(decoded_data == data)
+	print("%-15s encode %6.1f MB/s, decode %6.1f MB/s, %d bytes" % (codec.__name__ + ":", len(data) / (t1 - t0) / 1e6, len(data) / (t2 - t1) / 1e6, len(encoded_data)))
@@ -0,0 +1,52 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Compares peak memory usage and run time of decoding a large predicted and
+# compressed image stream at once and in chunks.
+
+import sys
+import time
+import argparse
+import tracemalloc
+from llpdf.EncodeDecode import EncodedObject
+
+parser = argparse.ArgumentParser(description = "Benchmark decoding of large streams.")
+parser.add_argument("-w", "--width", metavar = "pixels", type = int, default = 4000, help = "Image width in pixels. Defaults to %(default)d.")
+parser.add_argument("-H", "--height", metavar = "pixels", type = int, default = 3000, help = "Image height in pixels. Defaults to %(default)d.")
+parser.add_argument("-c", "--chunk-size", metavar = "bytes", type = int, default = 1024 * 1024, help = "Chunk size for iter_decode(). Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+def image_rows():
+	for y in range(args.height):
+		yield bytes(((x // 3) + y) & 0xff for x in range(args.width * 3))
+
+obj = EncodedObject.create_streaming(image_rows(), predict = True, columns = args.width, colors = 3)
+print("Image: %d bytes, encoded %d bytes" % (args.width * args.height * 3, len(obj)))
+
+for (name, decode) in [ ("decode()", lambda: len(obj.decode())), ("iter_decode()", lambda: sum(len(chunk) for chunk in obj.iter_decode(args.chunk_size))) ]:
+	tracemalloc.start()
+	t0 = time.perf_counter()
+	decode()
+	t1 = time.perf_counter()
+	peak = tracemalloc.get_traced_memory()[1]
+	tracemalloc.stop()
+	print("%-14s %.3f sec, peak %.1f MiB" % (name, t1 - t0, peak / 1024 / 1024))
@@ -0,0 +1,121 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Micro-benchmarks of set and dictionary heavy workloads on PDF value types,
+# compared to the generic cmpkey() based comparison they used before.
+
+import sys
+import time
+import argparse
+from llpdf.types.PDFXRef import PDFXRef
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFString import PDFString
+
+class LegacyComparable(object):
+	def _compare(self, other, method):
+		try:
+			return method(self.cmpkey(), other.cmpkey())
+		except (AttributeError, TypeError):
+			return NotImplemented
+
+	def __eq__(self, other):
+		return self._compare(other, lambda s, o: s == o)
+
+	def __hash__(self):
+		return hash(self.cmpkey())
+
+class LegacyXRef(LegacyComparable):
+	def __init__(self, objid, gennum):
+		self._objid = objid
+		self._gennum = gennum
+
+	def cmpkey(self):
+		return ("PDFXRef", self._objid, self._gennum)
+
+class LegacyName(LegacyComparable):
+	def __init__(self, name):
+		self._name = name
+
+	def cmpkey(self):
+		return ("PDFName", self._name)
+
+class LegacyString(LegacyComparable):
+	def __init__(self, text):
+		self._text = text
+
+	def cmpkey(self):
+		return ("PDFString", self._text)
+
+# Values are created before measuring, like references that were parsed from
+# object content; only the set and dictionary operations are timed.
+def xref_set_workload(values):
+	# Like DeleteOrphanedObjectsFilter: collect all references, then diff sets
+	(all_xrefs, referenced_xrefs) = values
+	return len(set(all_xrefs) - set(referenced_xrefs))
+
+def xref_dict_workload(values):
+	# Like Relinker: map old references to new ones and look them up
+	(old_xrefs, new_xrefs, lookup_xrefs) = values
+	mapping = dict(zip(old_xrefs, new_xrefs))
+	return sum(1 for xref in lookup_xrefs if xref in mapping)
+
+def name_dict_workload(values):
+	(keys, lookup_keys) = values
+	content = { key: index for (index, key) in enumerate(keys) }
+	return sum(content[key] for key in lookup_keys)
+
+def string_set_workload(values):
+	return len(set(values))
+
+def xref_values(xref_class, count):
+	return ([ xref_class(objid, 0) for objid in range(count) ], [ xref_class(objid, 0) for objid in range(0, 2 * count, 2) ])
+
+def xref_mapping_values(xref_class, count):
+	return ([ xref_class(objid, 0) for objid in range(count) ], [ xref_class(objid + count, 0) for objid in range(count) ], [ xref_class(objid, 0) for objid in range(count) ])
+
+def name_values(name_class, count):
+	names = [ "/Type", "/Subtype", "/Length", "/Filter", "/Resources", "/Contents" ]
+	return ([ name_class(name) for name in names ], [ name_class(names[i % len(names)]) for i in range(count) ])
+
+def string_values(string_class, count):
+	return [ string_class("Text %d" % (i % 1000)) for i in range(count) ]
+
+def measure(function, values):
+	t0 = time.perf_counter()
+	function(values)
+	return time.perf_counter() - t0
+
+parser = argparse.ArgumentParser(description = "Benchmark set and dictionary operations on PDF value types.")
+parser.add_argument("-n", "--count", metavar = "count", type = int, default = 200000, help = "Number of values per workload. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+workloads = [
+	("XRef set difference", xref_set_workload, xref_values, LegacyXRef, PDFXRef),
+	("XRef dict mapping", xref_dict_workload, xref_mapping_values, LegacyXRef, PDFXRef),
+	("Name dict lookup", name_dict_workload, name_values, LegacyName, PDFName),
+	("String set", string_set_workload, string_values, LegacyString, PDFString),
+]
+for (name, function, create_values, legacy_class, value_class) in workloads:
+	assert(function(create_values(legacy_class, 1000)) == function(create_values(value_class, 1000)))
+	legacy_time = measure(function, create_values(legacy_class, args.count))
+	value_time = measure(function, create_values(value_class, args.count))
+	print("%-20s legacy %6.3f sec, now %6.3f sec (%.1fx faster)" % (name + ":", legacy_time, value_time, legacy_time / value_time))
@@ -0,0 +1,67 @@
+#!/usr/bin/python3
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+
+# Measures reading of large XRef sections: classic XRef tables, once in the
+# standard 20 byte per entry layout and once with nonstandard line endings, and
+# the binary data of XRef streams.
+
+import sys
+import time
+import argparse
+from llpdf.FileRepr import StreamRepr
+from llpdf.types.XRefTable import XRefTable
+
+def build_table(count, line_end):
+	data = bytearray(b"0 %d\n" % (count + 1))
+	data += b"0000000000 65535 f" + line_end
+	for objid in range(1, count + 1):
+		data += b"%010d 00000 n" % (objid * 100) + line_end
+	data += b"trailer\n"
+	return bytes(data)
+
+def build_stream_data(count):
+	data = bytearray()
+	for objid in range(count):
+		data += bytes([ 1 ]) + (objid * 100).to_bytes(length = 4, byteorder = "big") + bytes([ 0 ])
+	return bytes(data)
+
+def measure(data):
+	t0 = time.perf_counter()
+	xref_table = XRefTable.read_xref_table_from_file(StreamRepr(data))
+	return (time.perf_counter() - t0, xref_table)
+
+parser = argparse.ArgumentParser(description = "Benchmark reading of classic XRef tables.")
+parser.add_argument("-n", "--entries", metavar = "count", type = int, default = 500000, help = "Number of XRef entries. Defaults to %(default)d.")
+args = parser.parse_args(sys.argv[1:])
+
+for (name, line_end) in [ ("20 byte entries", b" \n"), ("LF only", b"\n") ]:
+	(duration, xref_table) = measure(build_table(args.entries, line_end))
+	assert(len(xref_table) == args.entries)
+	print("%-16s %d entries in %.3f sec" % (name + ":", args.entries, duration))
+
+data = build_stream_data(args.entries)
+t0 = time.perf_counter()
+xref_table = XRefTable()
+xref_table.parse_xref_object(data, [ 1, args.entries // 2, args.entries, args.entries - (args.entries // 2) ], [ 1, 4, 1 ])
+duration = time.perf_counter() - t0
+assert(len(xref_table) == args.entries)
+print("%-16s %d entries in %.3f sec" % ("XRef stream:", args.entries, duration))
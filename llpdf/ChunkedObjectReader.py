@@ -0,0 +1,133 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import re
+import logging
+from llpdf.FileRepr import StreamRepr
+from llpdf.types.PDFObject import PDFObject
+from llpdf.repr.PDFBodyLexer import PDFBodyLexer
+
+class ChunkedObjectReader(object):
+	"""Parses the objects of a file body in the order in which they appear,
+	reading the file in chunks. Only a window of the file is kept in memory;
+	it grows beyond two chunks only while an object does not fit into it, so
+	the result does not depend on the chunk size. Data that cannot be parsed
+	is skipped up to the next object header."""
+	_log = logging.getLogger("llpdf.ChunkedObjectReader")
+	_CROSS_REFERENCE_RE = re.compile(rb"(?:[\x00\t\n\x0c\r ]|%[^\r\n]*)*(?P<keyword>xref|trailer|startxref)?")
+	_HEADER_OVERLAP = 64
+
+	def __init__(self, f = None, chunk_size = 1024 * 1024, stream = None):
+		"""Reads either the file object 'f' in chunks or a 'stream' that
+		already holds the whole file (e.g., a mapped file), starting at its
+		current position."""
+		assert((f is None) != (stream is None))
+		self._f = f
+		self._chunk_size = chunk_size
+		self._base = 0
+		if stream is None:
+			self._window = StreamRepr(b"")
+			self._eof = False
+			self._refill()
+		else:
+			self._window = stream
+			self._eof = True
+
+	@property
+	def window(self):
+		"""StreamRepr of the part of the file that is currently in memory. Its
+		position is where parsing continues."""
+		return self._window
+
+	def _refill(self, grow = False):
+		"""Discards the data before the current position and appends the next
+		chunk. When growing, at least as much as remains in the window is read
+		so that an object that spans many chunks is read in linear time."""
+		window = self._window
+		offset = window.tell()
+		size = self._chunk_size
+		if grow:
+			size = max(size, len(window) - offset)
+		chunk = self._f.read(size)
+		if len(chunk) < size:
+			self._eof = True
+		self._base += offset
+		self._window = StreamRepr(bytes(window.view(offset, len(window))) + chunk)
+
+	def _is_cross_reference(self, offset):
+		"""Returns if the data at the given offset of the window is an XRef
+		section or trailer (or only whitespace and comments up to the end of
+		the file), which is expected between objects and skipped silently."""
+		match = self._window.match(self._CROSS_REFERENCE_RE, offset)
+		return (match.group("keyword") is not None) or (self._eof and (match.end() == len(self._window)))
+
+	def _report_skipped(self, start, end, silent):
+		if silent:
+			self._log.debug("Skipping XRef section and trailer at offset 0x%x.", start)
+		elif end is None:
+			self._log.warning("Skipping unparsable data at offset 0x%x up to the end of the file.", start)
+		else:
+			self._log.warning("Skipping %d bytes of unparsable data at offset 0x%x, continuing with next object at offset 0x%x.", end - start, start, end)
+
+	def __iter__(self):
+		skip_start = None
+		skip_silent = False
+		while True:
+			window = self._window
+			if (not self._eof) and (len(window) - window.tell() < self._chunk_size):
+				self._refill()
+				continue
+
+			offset = window.tell()
+			lexer = PDFBodyLexer(window)
+			if skip_start is None:
+				obj = PDFObject.parse(window, base_offset = self._base, truncated = not self._eof)
+				if (obj is not None) and (self._eof or (window.tell() < len(window))):
+					yield obj
+					continue
+
+				window.seek(offset)
+				if lexer.object_header(offset) is not None:
+					if not self._eof:
+						# The object may only be incomplete because the window
+						# ends before it does, retry with more data
+						self._refill(grow = True)
+						continue
+					search_offset = lexer.find_object_header(offset) + 1
+				else:
+					search_offset = offset
+				skip_start = self._base + offset
+				skip_silent = self._is_cross_reference(offset)
+				window.seek(search_offset)
+
+			next_header = lexer.find_object_header(window.tell())
+			if next_header != -1:
+				self._report_skipped(skip_start, self._base + next_header, skip_silent)
+				skip_start = None
+				window.seek(next_header)
+			elif self._eof:
+				self._report_skipped(skip_start, None, skip_silent)
+				break
+			else:
+				# Keep the end of the window, a header might begin there
+				window.seek(max(window.tell(), len(window) - self._HEADER_OVERLAP))
+				self._refill()
@@ -0,0 +1,185 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import zlib
+import enum
+try:
+	import zopfli.zlib
+except ImportError:
+	zopfli = None
+from llpdf.types.PDFName import NAME_TYPE, NAME_SUBTYPE, NAME_N, NAME_OBJSTM, NAME_XREF, NAME_IMAGE, NAME_METADATA, NAME_FORM, NAME_FUNCTION_TYPE, NAME_LENGTH1, NAME_LENGTH2, NAME_LENGTH3, NAME_TYPE1C, NAME_CID_FONT_TYPE0C, NAME_OPEN_TYPE
+
+class CompressionBackend(enum.Enum):
+	Zlib = "zlib"
+	Exhaustive = "exhaustive"
+	Zopfli = "zopfli"
+
+class CompressionSettings(object):
+	"""Parameters of Flate compression. The Zlib backend compresses with the
+	given level, strategy, window size (as a base two logarithm) and memory
+	level. The Exhaustive backend instead tries all levels, strategies and
+	memory levels with zlib and keeps the smallest output. The Zopfli
+	backend requires the optional zopfli module and spends 'iterations'
+	rounds of optimization on every stream."""
+	_EXHAUSTIVE_STRATEGIES = ( zlib.Z_DEFAULT_STRATEGY, zlib.Z_FILTERED, zlib.Z_RLE, zlib.Z_HUFFMAN_ONLY )
+
+	def __init__(self, level = zlib.Z_DEFAULT_COMPRESSION, strategy = zlib.Z_DEFAULT_STRATEGY, window_bits = zlib.MAX_WBITS, memory_level = 8, backend = CompressionBackend.Zlib, iterations = 15):
+		assert((level == zlib.Z_DEFAULT_COMPRESSION) or (0 <= level <= 9))
+		assert(9 <= window_bits <= 15)
+		assert(1 <= memory_level <= 9)
+		if (backend == CompressionBackend.Zopfli) and (zopfli is None):
+			raise Exception("Zopfli compression backend requested, but the zopfli module is not installed.")
+		self._level = level
+		self._strategy = strategy
+		self._window_bits = window_bits
+		self._memory_level = memory_level
+		self._backend = backend
+		self._iterations = iterations
+
+	@classmethod
+	def fast(cls):
+		return cls(level = 1)
+
+	@classmethod
+	def maximum(cls):
+		return cls(level = 9, memory_level = 9)
+
+	@property
+	def level(self):
+		return self._level
+
+	@property
+	def strategy(self):
+		return self._strategy
+
+	@property
+	def window_bits(self):
+		return self._window_bits
+
+	@property
+	def memory_level(self):
+		return self._memory_level
+
+	@property
+	def backend(self):
+		return self._backend
+
+	@property
+	def iterations(self):
+		return self._iterations
+
+	def compressobj(self):
+		"""Returns a zlib compression object for streaming compression. This
+		always uses zlib with the configured parameters, regardless of the
+		backend."""
+		return zlib.compressobj(self._level, zlib.DEFLATED, self._window_bits, self._memory_level, self._strategy)
+
+	@staticmethod
+	def _zlib_compress(data, level, window_bits, memory_level, strategy):
+		compressor = zlib.compressobj(level, zlib.DEFLATED, window_bits, memory_level, strategy)
+		return compressor.compress(data) + compressor.flush()
+
+	def compress(self, data):
+		if self._backend == CompressionBackend.Zlib:
+			return self._zlib_compress(data, self._level, self._window_bits, self._memory_level, self._strategy)
+		elif self._backend == CompressionBackend.Exhaustive:
+			candidates = (self._zlib_compress(data, level, self._window_bits, memory_level, strategy) for level in range(1, 10) for memory_level in (8, 9) for strategy in self._EXHAUSTIVE_STRATEGIES)
+			return min(candidates, key = len)
+		else:
+			return zopfli.zlib.compress(bytes(data), numiterations = self._iterations)
+
+	def __str__(self):
+		if self._backend == CompressionBackend.Zlib:
+			return "CompressionSettings<level %d, strategy %d, %d window bits, memory level %d>" % (self._level, self._strategy, self._window_bits, self._memory_level)
+		elif self._backend == CompressionBackend.Exhaustive:
+			return "CompressionSettings<exhaustive, %d window bits>" % (self._window_bits)
+		else:
+			return "CompressionSettings<zopfli, %d iterations>" % (self._iterations)
+
+class StreamKind(enum.Enum):
+	ContentStream = "content"
+	Image = "image"
+	Font = "font"
+	ICCProfile = "icc"
+	Metadata = "metadata"
+	ObjectStream = "objstm"
+	XRefStream = "xref"
+	Other = "other"
+
+	@classmethod
+	def classify(cls, content):
+		"""Determines the kind of stream from the dictionary of its object."""
+		if not isinstance(content, dict):
+			return cls.Other
+		stream_type = content.get(NAME_TYPE)
+		stream_subtype = content.get(NAME_SUBTYPE)
+		if stream_type == NAME_XREF:
+			return cls.XRefStream
+		elif stream_type == NAME_OBJSTM:
+			return cls.ObjectStream
+		elif stream_type == NAME_METADATA:
+			return cls.Metadata
+		elif stream_subtype == NAME_IMAGE:
+			return cls.Image
+		elif stream_subtype == NAME_FORM:
+			return cls.ContentStream
+		elif any(key in content for key in (NAME_LENGTH1, NAME_LENGTH2, NAME_LENGTH3)) or (stream_subtype in (NAME_TYPE1C, NAME_CID_FONT_TYPE0C, NAME_OPEN_TYPE)):
+			return cls.Font
+		elif (stream_type is None) and (NAME_N in content) and (NAME_FUNCTION_TYPE not in content):
+			return cls.ICCProfile
+		elif (stream_type is None) and (stream_subtype is None) and (NAME_FUNCTION_TYPE not in content):
+			return cls.ContentStream
+		return cls.Other
+
+class CompressionPolicy(object):
+	"""Chooses CompressionSettings by the kind of stream that is compressed.
+	Kinds that have no settings of their own use the default settings."""
+	def __init__(self, default = None, settings_by_kind = None):
+		self._default = default if (default is not None) else CompressionSettings()
+		self._settings_by_kind = dict(settings_by_kind) if (settings_by_kind is not None) else { }
+
+	@classmethod
+	def balanced(cls):
+		"""Fast compression for content streams, which are large and numerous,
+		maximum compression for fonts and ICC profiles, which are compressed
+		once and often embedded in many documents."""
+		return cls(settings_by_kind = {
+			StreamKind.ContentStream:	CompressionSettings.fast(),
+			StreamKind.Font:			CompressionSettings.maximum(),
+			StreamKind.ICCProfile:		CompressionSettings.maximum(),
+		})
+
+	@property
+	def default(self):
+		return self._default
+
+	def set_settings(self, kind, settings):
+		self._settings_by_kind[kind] = settings
+
+	def settings_for(self, kind):
+		return self._settings_by_kind.get(kind, self._default)
+
+	def settings_for_object(self, content):
+		return self.settings_for(StreamKind.classify(content))
+
+	def __str__(self):
+		return "CompressionPolicy<default %s%s>" % (self._default, "".join(", %s: %s" % (kind.value, settings) for (kind, settings) in self._settings_by_kind.items()))
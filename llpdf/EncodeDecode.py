@@ -22,7 +22,12 @@
 
 import enum
 import zlib
-from llpdf.types.PDFName import PDFName
+import collections
+from llpdf.types.PDFName import PDFName, NAME_LENGTH, NAME_FILTER, NAME_DECODE_PARMS, NAME_PREDICTOR, NAME_COLUMNS, NAME_COLORS, NAME_BITS_PER_COMPONENT, NAME_EARLY_CHANGE
+from llpdf.PNGPrediction import PNGPrediction
+from llpdf.StreamCodecs import ASCIIHexCodec, ASCII85Codec, LZWCodec, RunLengthCodec
+from llpdf.tools.WorkerPool import WorkerPool
+from llpdf.CompressionPolicy import CompressionSettings
 
 class Filter(enum.IntEnum):
 	Uncompressed = 0
@@ -32,13 +37,7 @@ class Filter(enum.IntEnum):
 	CCITTFaxDecode = 4
 	ASCIIHexDecode = 5
 	ASCII85Decode = 6
-
-class PNGPredictor(enum.IntEnum):
-	No = 0
-	Sub = 1
-	Up = 2
-	Average = 3
-	Paeth = 4
+	LZWDecode = 7
 
 class Predictor(enum.IntEnum):
 	NoPredictor = 1
@@ -51,6 +50,7 @@ class Predictor(enum.IntEnum):
 	PNGPredictionOptimum = 15
 
 class EncodedObject(object):
+	__slots__ = ( "_encoded_data", "_filtering", "_columns", "_predictor", "_colors", "_bits_per_component", "_early_change", "_prefilters", "_decode_cache", "_decode_cache_key" )
 	_FILTER_MAP = {
 		Filter.FlateDecode:		PDFName("/FlateDecode"),
 		Filter.RunLengthDecode:	PDFName("/RunLengthDecode"),
@@ -58,22 +58,49 @@ class EncodedObject(object):
 		Filter.CCITTFaxDecode:	PDFName("/CCITTFaxDecode"),
 		Filter.ASCIIHexDecode:	PDFName("/ASCIIHexDecode"),
 		Filter.ASCII85Decode:	PDFName("/ASCII85Decode"),
+		Filter.LZWDecode:		PDFName("/LZWDecode"),
 	}
 	_REV_FILTER_MAP = { value: key for (key, value) in _FILTER_MAP.items() }
-
-	def __init__(self, encoded_data, filtering, columns = 1, predictor = Predictor.NoPredictor):
+	_DECOMPRESSIBLE_FILTERS = frozenset([ Filter.Uncompressed, Filter.FlateDecode, Filter.RunLengthDecode, Filter.ASCIIHexDecode, Filter.ASCII85Decode, Filter.LZWDecode ])
+	_PREDICTABLE_FILTERS = frozenset([ Filter.FlateDecode, Filter.LZWDecode ])
+
+	def __init__(self, encoded_data, filtering, columns = 1, predictor = Predictor.NoPredictor, colors = 1, bits_per_component = 8, early_change = 1, prefilters = ( )):
+		"""'filtering' and the predictor parameters describe the last filter
+		that is undone when decoding. Any filters that need to be undone
+		before it are given in decoding order as 'prefilters', a sequence of
+		tuples of Filter and their /DecodeParms dictionary (or None)."""
 		self._encoded_data = encoded_data
 		self._filtering = filtering
 		self._columns = columns
 		self._predictor = predictor
+		self._colors = colors
+		self._bits_per_component = bits_per_component
+		self._early_change = early_change
+		self._prefilters = tuple(prefilters)
+		self._decode_cache = None
+		self._decode_cache_key = None
+
+	def use_decode_cache(self, cache, key):
+		"""Makes decode() look up and store the decoded data in the given
+		cache under the given key."""
+		self._decode_cache = cache
+		self._decode_cache_key = key
+
+	@property
+	def filter_chain(self):
+		"""All filters of the object in decoding order."""
+		chain = [ filtering for (filtering, decode_parms) in self._prefilters ]
+		if self._filtering != Filter.Uncompressed:
+			chain.append(self._filtering)
+		return chain
 
 	@property
 	def decompressible(self):
-		return self._filtering != Filter.DCTDecode
+		return all(filtering in self._DECOMPRESSIBLE_FILTERS for filtering in self.filter_chain)
 
 	@property
 	def compressed(self):
-		return self._filtering != Filter.Uncompressed
+		return len(self.filter_chain) > 0
 
 	@property
 	def encoded_data(self):
@@ -91,181 +118,318 @@ class EncodedObject(object):
 	def predictor(self):
 		return self._predictor
 
+	@property
+	def colors(self):
+		return self._colors
+
+	@property
+	def bits_per_component(self):
+		return self._bits_per_component
+
+	@property
+	def early_change(self):
+		return self._early_change
+
+	@property
+	def prefilters(self):
+		return self._prefilters
+
+	@property
+	def decoding_parameters(self):
+		"""Hashable summary of all filters and their parameters, i.e., of
+		everything that determines the decoded data besides the encoded
+		data."""
+		prefilters = tuple((filtering, tuple(sorted(self._decode_parms_arguments(decode_parms).items()))) for (filtering, decode_parms) in self._prefilters)
+		return (self._filtering, self._columns, self._predictor, self._colors, self._bits_per_component, self._early_change, prefilters)
+
 	@property
 	def lossless(self):
-		return self._filtering != Filter.DCTDecode
+		return Filter.DCTDecode not in self.filter_chain
+
+	@property
+	def decode_parms(self):
+		"""The /DecodeParms dictionary of the last filter, or None."""
+		decode_parms = { }
+		if self._predictor != Predictor.NoPredictor:
+			decode_parms[NAME_COLUMNS] = self.columns
+			decode_parms[NAME_PREDICTOR] = int(self.predictor)
+			if self.colors != 1:
+				decode_parms[NAME_COLORS] = self.colors
+			if self.bits_per_component != 8:
+				decode_parms[NAME_BITS_PER_COMPONENT] = self.bits_per_component
+		if self.early_change != 1:
+			decode_parms[NAME_EARLY_CHANGE] = self.early_change
+		return decode_parms if (len(decode_parms) > 0) else None
 
 	@property
 	def meta_dict(self):
 		meta = {
-			PDFName("/Length"):		len(self),
+			NAME_LENGTH:		len(self),
 		}
-		if self._filtering != Filter.Uncompressed:
-			meta[PDFName("/Filter")] = self._FILTER_MAP[self._filtering]
-		if self._predictor != Predictor.NoPredictor:
-			meta[PDFName("/DecodeParms")] = {
-				PDFName("/Columns"): self.columns,
-				PDFName("/Predictor"): int(self.predictor),
-			}
+		if len(self._prefilters) == 0:
+			if self._filtering != Filter.Uncompressed:
+				meta[NAME_FILTER] = self._FILTER_MAP[self._filtering]
+			if self.decode_parms is not None:
+				meta[NAME_DECODE_PARMS] = self.decode_parms
+		else:
+			meta[NAME_FILTER] = [ self._FILTER_MAP[filtering] for filtering in self.filter_chain ]
+			decode_parms = [ decode_parms for (filtering, decode_parms) in self._prefilters ]
+			if self._filtering != Filter.Uncompressed:
+				decode_parms.append(self.decode_parms)
+			if any(value is not None for value in decode_parms):
+				meta[NAME_DECODE_PARMS] = decode_parms
 		return meta
 
 	def update_meta_dict(self, content_object):
-		if PDFName("/Filter") in content_object:
-			del content_object[PDFName("/Filter")]
-		if PDFName("/DecodeParms") in content_object:
-			del content_object[PDFName("/DecodeParms")]
+		if NAME_FILTER in content_object:
+			del content_object[NAME_FILTER]
+		if NAME_DECODE_PARMS in content_object:
+			del content_object[NAME_DECODE_PARMS]
 		content_object.update(self.meta_dict)
 
-	@staticmethod
-	def _rle_decode(rle_data):
-		result = bytearray()
-		index = 0
-		while index < len(rle_data):
-			length = rle_data[index]
-			index += 1
-			if 0 <= length <= 127:
-				bytecnt = 1 + length
-				result += rle_data[index : index + bytecnt]
-				index += bytecnt
-			elif length == 128:
-				# EOD
-				break
-			else:
-				bytecnt = 257 - length
-				value = rle_data[index]
-				result += bytecnt * bytes([ value ])
-				index += 1
-		return result
+	@classmethod
+	def _decode_parms_arguments(cls, decode_parms):
+		"""Translates a /DecodeParms dictionary into constructor arguments."""
+		arguments = { }
+		if isinstance(decode_parms, dict):
+			if NAME_PREDICTOR in decode_parms:
+				arguments["predictor"] = Predictor(decode_parms[NAME_PREDICTOR])
+				arguments["columns"] = decode_parms.get(NAME_COLUMNS, 1)
+				arguments["colors"] = decode_parms.get(NAME_COLORS, 1)
+				arguments["bits_per_component"] = decode_parms.get(NAME_BITS_PER_COMPONENT, 8)
+			if NAME_EARLY_CHANGE in decode_parms:
+				arguments["early_change"] = decode_parms[NAME_EARLY_CHANGE]
+		return arguments
+
+	def _undo_prefilters(self):
+		data = self._encoded_data
+		for (filtering, decode_parms) in self._prefilters:
+			data = EncodedObject(data, filtering, **self._decode_parms_arguments(decode_parms)).decode()
+		return data
 
 	def _decompress(self):
-		"""Only decompress filter, but do not de-predict."""
+		"""Undo all filters, but do not de-predict."""
+		data = self._undo_prefilters()
 		if self._filtering == Filter.Uncompressed:
-			return self._encoded_data
+			if isinstance(data, memoryview):
+				return bytes(data)
+			return data
 		elif self._filtering == Filter.FlateDecode:
-			return zlib.decompress(self._encoded_data)
+			return zlib.decompress(data)
 		elif self._filtering == Filter.RunLengthDecode:
-			return self._rle_decode(self._encoded_data)
+			return RunLengthCodec.decode(data)
+		elif self._filtering == Filter.ASCIIHexDecode:
+			return ASCIIHexCodec.decode(data)
+		elif self._filtering == Filter.ASCII85Decode:
+			return ASCII85Codec.decode(data)
+		elif self._filtering == Filter.LZWDecode:
+			return LZWCodec.decode(data, early_change = self._early_change)
 		else:
 			raise Exception(NotImplemented, self._filtering)
 
-	@staticmethod
-	def _paeth_predictor(a, b, c):
-		# a = left, b = above, c = upper left
-		p = a + b - c
-		pa = abs(p - a)
-		pb = abs(p - b)
-		pc = abs(p - c)
-		if (pa <= pb) and (pa <= pc):
-			return a
-		elif pb <= pc:
-			return b
-		else:
-			return c
+	@property
+	def row_length(self):
+		"""Length in bytes of one row of predicted data, excluding the PNG
+		predictor byte."""
+		return ((self._columns * self._colors * self._bits_per_component) + 7) // 8
+
+	@property
+	def bytes_per_pixel(self):
+		return max(1, (self._colors * self._bits_per_component) // 8)
 
 	def _depredict(self, deencoded_data):
 		if self.predictor == Predictor.NoPredictor:
 			return deencoded_data
 		else:
-			result = bytearray()
-			previous_scanline = bytes(self.columns)
-			for i in range(0, len(deencoded_data), self.columns + 1):
-				png_filter = PNGPredictor(deencoded_data[i])
-				scanline = deencoded_data[i + 1 : i + self.columns + 1]
-				if png_filter == PNGPredictor.No:
-					decompressed_scanline = scanline
-				elif png_filter == PNGPredictor.Sub:
-					previous_value = 0
-					decompressed_scanline = bytearray()
-					for (index, value) in enumerate(scanline):
-						new_value = (value + previous_value) & 0xff
-						decompressed_scanline.append(new_value)
-						previous_value = new_value
-				elif png_filter == PNGPredictor.Up:
-					decompressed_scanline = bytes((prev + cur) & 0xff for (prev, cur) in zip(previous_scanline, scanline))
-				elif png_filter == PNGPredictor.Average:
-					previous_value = 0
-					decompressed_scanline = bytearray()
-					for (index, value) in enumerate(scanline):
-						new_value = (value + ((previous_value + previous_scanline[index]) // 2)) & 0xff
-						decompressed_scanline.append(new_value)
-						previous_value = new_value
-				elif png_filter == PNGPredictor.Paeth:
-					previous_value = 0
-					decompressed_scanline = bytearray()
-					for (index, value) in enumerate(scanline):
-						new_value = (value + self._paeth_predictor(previous_value, previous_scanline[index], previous_scanline[index - 1] if (index > 0) else 0)) & 0xff
-						decompressed_scanline.append(new_value)
-						previous_value = new_value
-				else:
-					raise Exception(NotImplemented, png_filter)
-				result += decompressed_scanline
-#				print("%2d %2d: %s" % (int(png_filter), i // (self.columns + 1), scanline.hex()))
-#				print("   %2d: %s" % (i // (self.columns + 1), decompressed_scanline.hex()))
-				previous_scanline = decompressed_scanline
-			return result
+			return PNGPrediction(self.row_length, self.bytes_per_pixel).depredict(deencoded_data)
 
 	def decode(self):
-		return self._depredict(self._decompress())
+		"""Returns the decoded data as bytes. Cached data is shared between
+		callers, so it is immutable whether it comes from the cache or not."""
+		if self._decode_cache is None:
+			return bytes(self._depredict(self._decompress()))
+		decoded_data = self._decode_cache.get(self._decode_cache_key)
+		if decoded_data is None:
+			decoded_data = bytes(self._depredict(self._decompress()))
+			self._decode_cache[self._decode_cache_key] = decoded_data
+		return decoded_data
+
+	def _iter_decompress(self, chunk_size):
+		"""Like _decompress(), but yields the data in pieces of at most
+		'chunk_size' bytes."""
+		if self._filtering == Filter.Uncompressed:
+			data = self._undo_prefilters()
+			for offset in range(0, len(data), chunk_size):
+				yield bytes(data[offset : offset + chunk_size])
+		elif self._filtering == Filter.FlateDecode:
+			decompressor = zlib.decompressobj()
+			encoded_data = memoryview(self._undo_prefilters())
+			for offset in range(0, len(encoded_data), chunk_size):
+				pending = encoded_data[offset : offset + chunk_size]
+				while (len(pending) > 0) and (not decompressor.eof):
+					data = decompressor.decompress(pending, chunk_size)
+					pending = decompressor.unconsumed_tail
+					if len(data) > 0:
+						yield data
+			while not decompressor.eof:
+				data = decompressor.decompress(b"", chunk_size)
+				if len(data) == 0:
+					raise zlib.error("Incomplete or truncated FlateDecode stream")
+				yield data
+		else:
+			data = self._decompress()
+			for offset in range(0, len(data), chunk_size):
+				yield data[offset : offset + chunk_size]
+
+	def iter_decode(self, chunk_size = 1024 * 1024):
+		"""Yields the decoded data in chunks of about 'chunk_size' bytes. If a
+		predictor is used, every chunk consists of complete rows. Unlike
+		decode(), this never holds all of the decompressed data in memory at
+		once."""
+		assert(chunk_size > 0)
+		if self._decode_cache is not None:
+			decoded_data = self._decode_cache.get(self._decode_cache_key)
+			if decoded_data is not None:
+				for offset in range(0, len(decoded_data), chunk_size):
+					yield decoded_data[offset : offset + chunk_size]
+				return
+
+		if self.predictor == Predictor.NoPredictor:
+			yield from self._iter_decompress(chunk_size)
+			return
+
+		prediction = PNGPrediction(self.row_length, self.bytes_per_pixel)
+		stride = self.row_length + 1
+		pending = bytearray()
+		previous_scanline = None
+		for data in self._iter_decompress(max(1, chunk_size // self.row_length) * stride):
+			pending += data
+			complete_length = len(pending) - (len(pending) % stride)
+			if complete_length > 0:
+				decoded_data = prediction.depredict(pending[ : complete_length], previous_scanline = previous_scanline)
+				del pending[ : complete_length]
+				previous_scanline = decoded_data[-self.row_length : ]
+				yield decoded_data
+		if len(pending) > 0:
+			yield prediction.depredict(pending, previous_scanline = previous_scanline)
 
 	@classmethod
-	def _predict(cls, unpredicted_data, columns):
-		assert(len(unpredicted_data) % columns == 0)
-		rows = len(unpredicted_data) // columns
-
-		predicted_data = bytearray()
-		if rows == 1:
-			predictor = Predictor.PNGPredictionSub
-			predicted_data.append(PNGPredictor.Sub)
-			predicted_data += bytearray((x - y) & 0xff for (x, y) in zip(unpredicted_data[1:], unpredicted_data))
+	def _compress(cls, filtering, data, compression):
+		if filtering == Filter.FlateDecode:
+			return (compression or CompressionSettings()).compress(data)
+		elif filtering == Filter.RunLengthDecode:
+			return RunLengthCodec.encode(data)
+		elif filtering == Filter.ASCIIHexDecode:
+			return ASCIIHexCodec.encode(data)
+		elif filtering == Filter.ASCII85Decode:
+			return ASCII85Codec.encode(data)
+		elif filtering == Filter.LZWDecode:
+			return LZWCodec.encode(data)
 		else:
-			predictor = Predictor.PNGPredictionUp
-			previous_scanline = bytes(columns)
-			for row in range(rows):
-				scanline = unpredicted_data[row * columns : (row + 1) * columns]
-				predicted_data.append(PNGPredictor.Up)
-				predicted_data += bytearray((x - y) & 0xff for (x, y) in zip(previous_scanline, scanline))
-
-		return (predicted_data, predictor, columns)
+			raise Exception(NotImplemented, filtering)
 
 	@classmethod
-	def create(cls, unencoded_data, compress = True, predict = False, columns = None):
-		if predict:
-			if columns is None:
-				columns = len(unencoded_data)
-			(predicted_data, used_predictor, predictor_columns) = cls._predict(unencoded_data, columns)
+	def create(cls, unencoded_data, compress = True, predict = False, columns = None, colors = 1, bits_per_component = 8, filtering = Filter.FlateDecode, compression = None):
+		"""Creates an encoded object from the given data, which is encoded
+		with the given filter if 'compress' is set; FlateDecode uses the
+		given CompressionSettings. If 'predict' is set, the data is split
+		into rows of 'columns' pixels (all of the data by default) and PNG
+		predictors are chosen for each row adaptively. Only FlateDecode and
+		LZWDecode support predictors, so 'predict' is ignored for other
+		filters and for uncompressed data."""
+		predict = predict and compress and (filtering in cls._PREDICTABLE_FILTERS)
+		if (not predict) or (len(unencoded_data) == 0):
+			(candidates, columns, colors, bits_per_component) = ([ (unencoded_data, Predictor.NoPredictor) ], 1, 1, 8)
 		else:
-			(predicted_data, used_predictor, predictor_columns) = (unencoded_data, Predictor.NoPredictor, 1)
+			if columns is None:
+				columns = (len(unencoded_data) * 8) // (colors * bits_per_component)
+			row_length = ((columns * colors * bits_per_component) + 7) // 8
+			prediction = PNGPrediction(row_length, max(1, (colors * bits_per_component) // 8))
+			predicted_data = prediction.predict(unencoded_data)
+			# Choosing predictors per row is only a heuristic and the
+			# compression often does better when all rows are predicted the
+			# same way, so also try the predictor chosen most often
+			png_predictor = collections.Counter(predicted_data[ : : row_length + 1]).most_common(1)[0][0]
+			candidates = [ (predicted_data, Predictor.PNGPredictionOptimum), (prediction.predict(unencoded_data, png_predictor = png_predictor), Predictor(Predictor.PNGPredictionNone + png_predictor)) ]
 
 		if compress:
-			encoded_data = zlib.compress(predicted_data)
-			filtering = Filter.FlateDecode
+			(encoded_data, used_predictor) = min(((cls._compress(filtering, data, compression), predictor) for (data, predictor) in candidates), key = lambda candidate: len(candidate[0]))
 		else:
-			encoded_data = predicted_data
+			(encoded_data, used_predictor) = candidates[0]
 			filtering = Filter.Uncompressed
-		encoded_object = cls(encoded_data = encoded_data, filtering = filtering, predictor = used_predictor, columns = predictor_columns)
-		return encoded_object
+		return cls(encoded_data = encoded_data, filtering = filtering, predictor = used_predictor, columns = columns, colors = colors, bits_per_component = bits_per_component)
 
 	@classmethod
-	def from_object(cls, obj):
-		if PDFName("/Filter") in obj.content:
-			pdf_filter = obj.content[PDFName("/Filter")]
-			if isinstance(pdf_filter, list):
-				if len(pdf_filter) == 1:
-					pdf_filter = pdf_filter[0]
-				else:
-					raise Exception("Cannot create EncodedObject from object that has multiple filters applied: %s" % (str(pdf_filter)))
-			filtering = cls._REV_FILTER_MAP[pdf_filter]
-		else:
-			filtering = Filter.Uncompressed
+	def create_many(cls, unencoded_datas, **kwargs):
+		"""Like create() with the given arguments for every element of
+		'unencoded_datas', but encodes them in parallel on the WorkerPool.
+		Returns the encoded objects in order."""
+		return WorkerPool.map(lambda unencoded_data: cls.create(unencoded_data, **kwargs), unencoded_datas)
 
-		if (PDFName("/DecodeParms") in obj.content) and (PDFName("/Predictor") in obj.content[PDFName("/DecodeParms")]):
-			predictor = Predictor(obj.content[PDFName("/DecodeParms")][PDFName("/Predictor")])
-			columns = obj.content[PDFName("/DecodeParms")][PDFName("/Columns")]
+	@classmethod
+	def create_streaming(cls, chunks, compress = True, predict = False, columns = None, colors = 1, bits_per_component = 8, compression = None):
+		"""Like create(), but takes the unencoded data as an iterable of
+		chunks, which are compressed as they come in using zlib with the
+		parameters of the given CompressionSettings. If 'predict' is set,
+		'columns' must be given and the PNG predictor of every row is chosen
+		adaptively; as in create(), it is ignored for uncompressed data."""
+		predict = predict and compress
+		if predict:
+			assert(columns is not None)
+			row_length = ((columns * colors * bits_per_component) + 7) // 8
+			prediction = PNGPrediction(row_length, max(1, (colors * bits_per_component) // 8))
+			(used_predictor, pending, previous_scanline) = (Predictor.PNGPredictionOptimum, bytearray(), None)
 		else:
-			predictor = Predictor.NoPredictor
-			columns = 1
+			(used_predictor, columns, colors, bits_per_component) = (Predictor.NoPredictor, 1, 1, 8)
+		compressor = (compression or CompressionSettings()).compressobj() if compress else None
+
+		encoded_data = bytearray()
+		for data in chunks:
+			if predict:
+				pending += data
+				complete_length = len(pending) - (len(pending) % row_length)
+				if complete_length == 0:
+					continue
+				scanlines = bytes(pending[ : complete_length])
+				del pending[ : complete_length]
+				data = prediction.predict(scanlines, previous_scanline = previous_scanline)
+				previous_scanline = scanlines[-row_length : ]
+			encoded_data += compressor.compress(data) if compress else data
+		if predict:
+			assert(len(pending) == 0)
+		if compress:
+			encoded_data += compressor.flush()
+
+		filtering = Filter.FlateDecode if compress else Filter.Uncompressed
+		return cls(encoded_data = bytes(encoded_data), filtering = filtering, predictor = used_predictor, columns = columns, colors = colors, bits_per_component = bits_per_component)
+
+	@staticmethod
+	def _pdf_filters(obj):
+		pdf_filters = obj.content.get(NAME_FILTER, [ ])
+		if not isinstance(pdf_filters, list):
+			pdf_filters = [ pdf_filters ]
+		return pdf_filters
+
+	@classmethod
+	def supports_object(cls, obj):
+		"""Returns if all filters of the object's stream are known, i.e., if
+		from_object() can represent it (e.g., not for /JPXDecode)."""
+		return all(pdf_filter in cls._REV_FILTER_MAP for pdf_filter in cls._pdf_filters(obj))
+
+	@classmethod
+	def from_object(cls, obj):
+		filter_chain = [ cls._REV_FILTER_MAP[pdf_filter] for pdf_filter in cls._pdf_filters(obj) ]
+
+		# /DecodeParms is an array with one entry per filter if there are
+		# multiple filters; a single dictionary refers to the last filter
+		decode_parms = obj.content.get(NAME_DECODE_PARMS)
+		if not isinstance(decode_parms, list):
+			decode_parms = ([ None ] * (len(filter_chain) - 1)) + [ decode_parms ]
+		decode_parms = (decode_parms + ([ None ] * len(filter_chain)))[ : max(1, len(filter_chain))]
 
-		return cls(encoded_data = obj.raw_stream, filtering = filtering, predictor = predictor, columns = columns)
+		filtering = filter_chain[-1] if (len(filter_chain) > 0) else Filter.Uncompressed
+		prefilters = list(zip(filter_chain[ : -1], decode_parms[ : -1]))
+		return cls(encoded_data = obj.raw_stream, filtering = filtering, prefilters = prefilters, **cls._decode_parms_arguments(decode_parms[-1]))
 
 	def __len__(self):
 		return len(self._encoded_data)
@@ -273,7 +437,7 @@ class EncodedObject(object):
 	def __str__(self):
 		details = [ ]
 		details.append("%d bytes" % (len(self)))
-		details.append(self._filtering.name)
+		details.append(" -> ".join(filtering.name for filtering in self.filter_chain) if self.compressed else self._filtering.name)
 		if self.predictor != Predictor.NoPredictor:
 			details.append(self.predictor.name)
 			details.append("%d columns" % (self.columns))
@@ -22,3 +22,6 @@
 
 class UnsupportedImageException(Exception):
 	pass
+
+class MalformedPDFException(Exception):
+	pass
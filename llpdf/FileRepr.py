@@ -21,6 +21,8 @@
 #
 
 import os
+import re
+import mmap
 import types
 import enum
 
@@ -77,8 +79,14 @@ class TokenDelimiter(enum.IntEnum):
 		}[self]
 
 class StreamRepr(object):
+	_DELIMITER_REGEXES = { }
+	_DELIMITER_BY_BYTES = { delimiter.to_bytes(): delimiter for delimiter in TokenDelimiter if (delimiter != TokenDelimiter.EOF) }
+	_WHITESPACE_REGEX = re.compile(rb"[\r\n\t ]*")
+	_TOKEN_REGEX = re.compile(rb"(?P<token>[^\r\n\t ]*)(?P<delimiter>\r\n|[\r\n\t ]|)")
+
 	def __init__(self, buf):
 		self._buf = buf
+		self._view = memoryview(buf)
 		self._offset = 0
 
 	def tell(self):
@@ -104,58 +112,95 @@ class StreamRepr(object):
 		self._offset += len(data)
 		return data
 
-	@property
-	def at_eof(self):
-		return self._offset == len(self._buf)
+	def view(self, start, end):
+		"""Returns a zero-copy view of the buffer between the given absolute
+		offsets. Does not modify the current position."""
+		return self._view[start : end]
 
-	def read_until(self, delimiters, chunksize = 128):
-		assert(all(isinstance(delimiter, TokenDelimiter) for delimiter in delimiters))
-		delimiters = set(delimiters)
-		delimiter_patterns = [ (delimiter, delimiter.to_bytes()) for delimiter in sorted(delimiters) if (delimiter != TokenDelimiter.EOF) ]
-		match_eof = TokenDelimiter.EOF in delimiters
+	def read_view(self, length):
+		data = self._view[self._offset : self._offset + length]
+		self._offset += len(data)
+		return data
 
-		initial_pos = self.tell()
-		result = bytearray()
-		start_offset = 0
-		while True:
-			new_data = self.read(chunksize)
-			if len(new_data) == 0:
-				return None
+	def find(self, pattern, start = None, end = None):
+		"""Returns the absolute offset of the first occurrence of the pattern
+		at or after the current position (or the given start offset), -1 if
+		it is not found. Does not modify the current position."""
+		if start is None:
+			start = self._offset
+		if end is None:
+			end = len(self._buf)
+		return self._buf.find(pattern, start, end)
 
-			result += new_data
+	def rfind(self, pattern, start = 0, end = None):
+		if end is None:
+			end = len(self._buf)
+		return self._buf.rfind(pattern, start, end)
 
-			matches = [ (result.find(pattern, start_offset), delimiter, pattern) for (delimiter, pattern) in delimiter_patterns ]
-			matches = [ (index, delimiter, pattern) for (index, delimiter, pattern) in matches if (index != -1) ]
-			if len(matches) > 0:
-				# Take the one that comes earliest, i.e., with lowest offset
-				matches.sort()
-				(index, delimiter, pattern) = matches[0]
-				found_data = result[ : index]
-				self.seek(initial_pos + len(found_data) + len(pattern))
-				return (found_data, delimiter)
+	def __len__(self):
+		return len(self._buf)
 
-			if self.at_eof and match_eof:
-				return (result, TokenDelimiter.EOF)
+	@property
+	def at_eof(self):
+		return self._offset == len(self._buf)
 
-			start_offset = len(result) - 2
+	@classmethod
+	def _delimiter_regex(cls, delimiters):
+		delimiters = frozenset(delimiters)
+		regex = cls._DELIMITER_REGEXES.get(delimiters)
+		if regex is None:
+			assert(all(isinstance(delimiter, TokenDelimiter) for delimiter in delimiters))
+			# Alternatives are ordered by the delimiter value so that CRLF takes
+			# precedence over CR at the same offset
+			patterns = [ re.escape(delimiter.to_bytes()) for delimiter in sorted(delimiters) if (delimiter != TokenDelimiter.EOF) ]
+			regex = re.compile(b"|".join(patterns))
+			cls._DELIMITER_REGEXES[delimiters] = regex
+		return regex
+
+	def match(self, regex, start = None):
+		"""Matches a compiled regular expression against the buffer at the
+		current position (or the given start offset). Does not modify the
+		current position."""
+		return regex.match(self._buf, self._offset if (start is None) else start)
+
+	def search(self, regex, start = None, end = None):
+		if start is None:
+			start = self._offset
+		if end is None:
+			end = len(self._buf)
+		return regex.search(self._buf, start, end)
+
+	def finditer(self, regex, start = 0, end = None):
+		if end is None:
+			end = len(self._buf)
+		return regex.finditer(self._buf, start, end)
+
+	def read_until(self, delimiters):
+		if self.at_eof:
+			return None
 
-	def _read_until_pattern(self, pattern, chunksize = 128 * 1024):
-		result = bytearray()
-		start_offset = 0
-		initial_pos = self.tell()
-		while True:
-			new_data = self.read(chunksize)
-			if len(new_data) == 0:
+		match = self._delimiter_regex(delimiters).search(self._buf, self._offset)
+		if match is not None:
+			found_data = self._buf[self._offset : match.start()]
+			self._offset = match.end()
+			delimiter = self._DELIMITER_BY_BYTES[match.group(0)]
+			return (found_data, delimiter)
+		else:
+			found_data = self._buf[self._offset : ]
+			self._offset = len(self._buf)
+			if TokenDelimiter.EOF in delimiters:
+				return (found_data, TokenDelimiter.EOF)
+			else:
 				return None
 
-			result += new_data
-			index = result.find(pattern)
-			if index != -1:
-				found_data = result[ : index]
-				self.seek(initial_pos + index)
-				return found_data
-
-			start_offset = len(result) - len(pattern)
+	def _read_until_pattern(self, pattern):
+		index = self._buf.find(pattern, self._offset)
+		if index == -1:
+			self._offset = len(self._buf)
+			return None
+		found_data = self._buf[self._offset : index]
+		self._offset = index
+		return found_data
 
 	def read_until_token(self, token, rewind = False):
 		match = self._read_until_pattern(token)
@@ -168,18 +213,22 @@ class StreamRepr(object):
 		return match
 
 	def read_next_token(self, accept_empty_data = False, accept_eof = False):
-		delimiters = [ TokenDelimiter.CRLF, TokenDelimiter.CR, TokenDelimiter.LF, TokenDelimiter.TAB, TokenDelimiter.SPACE ]
-		if accept_eof:
-			delimiters.append(TokenDelimiter.EOF)
-		while True:
-			next_token = self.read_until(delimiters)
-			if next_token is None:
-				return None
-			(data, delimiter) = next_token
-
-			if (len(data.strip(b"\r\n\t ")) == 0) and (not accept_empty_data):
-				continue
-			return data
+		if not accept_empty_data:
+			whitespace = self._WHITESPACE_REGEX.match(self._buf, self._offset)
+			self._offset = whitespace.end()
+		token = self._TOKEN_REGEX.match(self._buf, self._offset)
+		if token.end() == self._offset:
+			# Nothing left to read
+			return None
+		elif token.group("delimiter") != b"":
+			self._offset = token.end()
+			return token.group("token")
+		elif accept_eof:
+			self._offset = token.end()
+			return token.group("token")
+		else:
+			self._offset = len(self._buf)
+			return None
 
 	def read_n_tokens(self, count):
 		return [ self.read_next_token() for i in range(count) ]
@@ -199,6 +248,17 @@ class StreamRepr(object):
 		data = f.read()
 		return cls(data)
 
+	@classmethod
+	def from_filename(cls, filename, use_mmap = False):
+		"""Reads a file, optionally by mapping it into memory instead of
+		copying its contents. A mapped file must not be modified or truncated
+		while the StreamRepr or any view obtained from it is still in use."""
+		with open(filename, "rb") as f:
+			if use_mmap and (os.fstat(f.fileno()).st_size > 0):
+				return cls(mmap.mmap(f.fileno(), 0, access = mmap.ACCESS_READ))
+			else:
+				return cls.from_file(f)
+
 if __name__ == "__main__":
 	f = StreamRepr(b"foobar barfoo mookoo\rline2\n")
 	print(f.readline())
@@ -48,12 +48,19 @@ class LogLevel(enum.IntEnum):
 		return cls(intvalue)
 
 
+# The TRACE level is used throughout the library, so it needs to be present
+# even when the user never calls configure_logging()
+logging.TRACE = logging.DEBUG - 1
+logging.addLevelName(logging.TRACE, "TRACE")
+
+def _log_trace(self, message, *args, **kwargs):
+	if self.isEnabledFor(logging.TRACE):
+		self._log(logging.TRACE, message, args, **kwargs)
+logging.Logger.trace = _log_trace
+
 def configure_logging(verbosity_loglevel):
 	llvl = LogLevel.getbyverbosity(verbosity_loglevel)
 
-	logging.TRACE = logging.DEBUG - 1
-	logging.addLevelName(logging.TRACE, "TRACE")
-
 	logging_loglevel = {
 		LogLevel.Silent:	logging.WARNING,
 		LogLevel.Normal:	logging.INFO,
@@ -61,11 +68,6 @@ def configure_logging(verbosity_loglevel):
 		LogLevel.Debug:		logging.TRACE,
 	}[llvl]
 
-	def __log_trace(self, message, *args, **kwargs):
-		if self.isEnabledFor(logging.TRACE):
-			self._log(logging.TRACE, message, args, **kwargs)
-	logging.Logger.trace = __log_trace
-
 	logging.basicConfig(format = " {name:>20s} [{levelname:.1s}]: {message}", style = "{", level = logging_loglevel)
 
 if __name__ == "__main__":
@@ -0,0 +1,156 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import logging
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.XRefTable import UncompressedXRefEntry, CompressedXRefEntry
+from llpdf.repr.PDFBodyLexer import PDFBodyLexer
+from llpdf.ObjectStreamLoader import ObjectStreamLoader
+
+class ObjectLoader(object):
+	"""Loads objects of a PDF file on demand, parsing them only at the offsets
+	that are recorded in the XRef table of the file."""
+	_log = logging.getLogger("llpdf.ObjectLoader")
+
+	def __init__(self, f, xref_table, deferred_objstrms = None):
+		"""'deferred_objstrms' is a list of (offset, ObjId) tuples of object
+		streams whose contents are not listed in the XRef table. They are only
+		decompressed once an object that might be inside them is requested,
+		see discover()."""
+		self._f = f
+		self._xref_table = xref_table
+		self._deferred_objstrms = sorted(deferred_objstrms or [ ])
+		self._discovered = [ ]
+		self._objstrm_objids = set(entry.inside_objid for (key, entry) in xref_table if entry.compressed) | set(objid for (offset, objid) in self._deferred_objstrms)
+		self._objstrm_loader = ObjectStreamLoader(self._load_container)
+
+	@property
+	def xref_table(self):
+		return self._xref_table
+
+	def keys(self):
+		"""Returns the keys of all objects that can be loaded. Object streams
+		themselves are omitted since their contents are returned instead."""
+		for ((objid, gennum), entry) in self._xref_table:
+			if objid not in self._objstrm_objids:
+				yield (objid, gennum)
+
+	@property
+	def has_deferred_objects(self):
+		return (len(self._deferred_objstrms) > 0) or (len(self._discovered) > 0)
+
+	def broken_entries(self):
+		"""Yields ObjId, GenNum and offset of all uncompressed objects whose
+		offset does not point to the header of the object."""
+		lexer = PDFBodyLexer(self._f)
+		for (objid, gennum, offset) in self._xref_table.uncompressed_objects():
+			if lexer.object_header(offset) != (objid, gennum):
+				yield (objid, gennum, offset)
+
+	def _expand_objstrm(self, offset, container_objid):
+		"""Adds the objects inside a deferred object stream to the XRef table
+		unless they are found at a later offset in the file."""
+		self._log.debug("Expanding object stream %d at offset 0x%x.", container_objid, offset)
+		try:
+			index = self._objstrm_loader.index(container_objid)
+		except Exception as e:
+			self._log.warning("Ignoring unreadable object stream %d: %s", container_objid, e)
+			return
+		if index is None:
+			return
+		for (index_no, objid) in enumerate(index):
+			entry = self._xref_table.find_entry(objid)
+			if (entry is None) or (isinstance(entry, UncompressedXRefEntry) and (entry.offset < offset)):
+				self._xref_table.add_entry(CompressedXRefEntry(objid, container_objid, index_no))
+				if entry is None:
+					self._discovered.append((objid, 0))
+
+	def _expand_deferred(self, objid = None):
+		"""Expands deferred object streams, newest first, until the newest
+		location of the given ObjId is known. Expands all of them if no ObjId
+		is given."""
+		while len(self._deferred_objstrms) > 0:
+			entry = self._xref_table.find_entry(objid) if (objid is not None) else None
+			if entry is not None:
+				if entry.compressed:
+					# Found in a deferred object stream; any deferred object
+					# stream that remains is older
+					break
+				elif isinstance(entry, UncompressedXRefEntry) and (self._deferred_objstrms[-1][0] < entry.offset):
+					break
+			(offset, container_objid) = self._deferred_objstrms.pop()
+			self._expand_objstrm(offset, container_objid)
+
+	def discover(self, key = None):
+		"""Returns the keys of objects that were not known before and that are
+		found inside deferred object streams while looking for the given key.
+		Looks inside all deferred object streams if no key is given."""
+		if key is None:
+			self._expand_deferred()
+		elif self._xref_table.find_entry(key[0]) is None:
+			self._expand_deferred(key[0])
+		(discovered, self._discovered) = (self._discovered, [ ])
+		return discovered
+
+	@staticmethod
+	def _length_resolver(lookup):
+		if lookup is None:
+			return None
+		def resolve(xref):
+			length_obj = lookup(xref)
+			return None if (length_obj is None) else length_obj.content
+		return resolve
+
+	def _load_uncompressed(self, entry, lookup = None):
+		self._f.seek(entry.offset)
+		obj = PDFObject.parse(self._f, length_resolver = self._length_resolver(lookup))
+		if obj is None:
+			self._log.error("XRef table entry for ObjId %d points to offset 0x%x, but no object could be parsed there.", entry.objid, entry.offset)
+			return None
+		if (obj.objid, obj.gennum) != (entry.objid, entry.gennum):
+			self._log.error("XRef table entry for ObjId %d, GenNum %d points to offset 0x%x, but found %s there.", entry.objid, entry.gennum, entry.offset, obj)
+			return None
+		return obj
+
+	def _load_container(self, container_objid):
+		container_entry = self._xref_table.get_entry(container_objid, 0)
+		if (container_entry is None) or container_entry.compressed:
+			self._log.error("Object stream %d has no valid XRef entry.", container_objid)
+			return None
+		return self._load_uncompressed(container_entry)
+
+	def _load_compressed(self, entry):
+		return self._objstrm_loader.load(entry.objid, 0, container_objid = entry.inside_objid)
+
+	def load(self, objid, gennum, lookup = None):
+		"""Loads a single object. The optional 'lookup' callable is used to
+		resolve indirect stream lengths so that stream data can be skipped
+		without searching for its end marker."""
+		if len(self._deferred_objstrms) > 0:
+			self._expand_deferred(objid)
+		entry = self._xref_table.get_entry(objid, gennum)
+		if entry is None:
+			return None
+		elif entry.compressed:
+			return self._load_compressed(entry)
+		else:
+			return self._load_uncompressed(entry, lookup = lookup)
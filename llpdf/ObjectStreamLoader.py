@@ -0,0 +1,114 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import logging
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFName import NAME_N, NAME_FIRST
+from llpdf.tools.LRUCache import LRUCache
+
+class ObjectStreamLoader(object):
+	"""Loads objects that are contained in object streams on demand. The
+	index of every object stream (built from its header) is kept, but the
+	decompressed payloads are only cached for the most recently used object
+	streams."""
+	_log = logging.getLogger("llpdf.ObjectStreamLoader")
+
+	def __init__(self, container_lookup, max_cached_payloads = 16):
+		self._container_lookup = container_lookup
+		self._indices = { }
+		self._payloads = LRUCache(max_cached_payloads)
+		self._containers_of = { }
+
+	@staticmethod
+	def parse_index(objstrm_obj, payload):
+		"""Returns a dictionary that maps the ObjIds inside the object stream
+		to the (begin, end) offsets of their data in the payload."""
+		count = objstrm_obj.content[NAME_N]
+		first = objstrm_obj.content[NAME_FIRST]
+		header = [ int(value) for value in payload[ : first].split() ]
+		if len(header) != 2 * count:
+			ObjectStreamLoader._log.warning("Object stream %s should contain %d objects according to /N, but header has %d entries.", objstrm_obj, count, len(header) // 2)
+
+		index = { }
+		pairs = list(zip(header[0 : : 2], header[1 : : 2]))
+		for (pair_no, (objid, offset)) in enumerate(pairs):
+			if pair_no + 1 < len(pairs):
+				end = first + pairs[pair_no + 1][1]
+			else:
+				end = len(payload)
+			index[objid] = (first + offset, end)
+		return index
+
+	@classmethod
+	def unpack(cls, objstrm_obj):
+		"""Yields all objects inside the given object stream."""
+		payload = objstrm_obj.stream.decode()
+		for (objid, (begin, end)) in cls.parse_index(objstrm_obj, payload).items():
+			yield PDFObject(objid, 0, payload[begin : end])
+
+	def _get_payload(self, container_objid):
+		payload = self._payloads.get(container_objid)
+		if payload is None:
+			container = self._container_lookup(container_objid)
+			if (container is None) or (not container.is_objstrm):
+				self._log.error("Object %d is supposed to be an object stream, but is %s.", container_objid, container)
+				return None
+			self._log.trace("Decompressing object stream %s.", container)
+			payload = container.stream.decode()
+			if container_objid not in self._indices:
+				self._indices[container_objid] = self.parse_index(container, payload)
+			self._payloads[container_objid] = payload
+		return payload
+
+	def index(self, container_objid):
+		if container_objid not in self._indices:
+			self._get_payload(container_objid)
+		return self._indices.get(container_objid)
+
+	def add_container(self, container_objid):
+		"""Registers all objects inside the given object stream so that they
+		can be loaded through load() without specifying their container."""
+		index = self.index(container_objid)
+		if index is None:
+			return
+		self._log.debug("Object stream %d contains %d objects.", container_objid, len(index))
+		for objid in index:
+			self._containers_of[objid] = container_objid
+
+	def keys(self):
+		for objid in self._containers_of:
+			yield (objid, 0)
+
+	def load(self, objid, gennum, lookup = None, container_objid = None):
+		if container_objid is None:
+			container_objid = self._containers_of.get(objid)
+		if (container_objid is None) or (gennum != 0):
+			return None
+		payload = self._get_payload(container_objid)
+		if payload is None:
+			return None
+		object_range = self._indices[container_objid].get(objid)
+		if object_range is None:
+			self._log.error("ObjId %d is supposed to be inside object stream %d, but is not listed in its header.", objid, container_objid)
+			return None
+		(begin, end) = object_range
+		return PDFObject(objid, 0, payload[begin : end])
@@ -25,27 +25,105 @@ import logging
 from llpdf.repr import PDFParser, GraphicsParser
 from .img.PDFImage import PDFImage
 from .types.PDFObject import PDFObject
-from .types.PDFName import PDFName
+from .types.PDFName import PDFName, NAME_TYPE, NAME_LENGTH, NAME_N, NAME_FIRST, NAME_XREF, NAME_XOBJECT, NAME_RESOURCES, NAME_PAGE, NAME_PAGES, NAME_KIDS, NAME_CONTENTS, NAME_ROOT, NAME_BBOX, NAME_SMASK
 from .types.PDFXRef import PDFXRef
 from .types.XRefTable import XRefTable
 from .FileRepr import StreamRepr
+from .ObjectStreamLoader import ObjectStreamLoader
 
 class PDFDocument(object):
 	_log = logging.getLogger("llpdf.PDFDocument")
 
 	def __init__(self):
 		self._objs = { }
+		self._unloaded_objs = { }
+		self._deferred_loaders = [ ]
 		self._xref_table = XRefTable()
 		self._trailer = { }
+		self._revisions = [ ]
 
 	@property
 	def objcount(self):
-		return len(self._objs)
+		self._discover_objects()
+		return len(self._objs) + len(self._unloaded_objs)
 
 	@property
 	def xref_table(self):
 		return self._xref_table
 
+	@xref_table.setter
+	def xref_table(self, value):
+		self._xref_table = value
+
+	@property
+	def revisions(self):
+		"""Revisions of the file the document was read from, oldest first."""
+		return self._revisions
+
+	@revisions.setter
+	def revisions(self, value):
+		self._revisions = value
+
+	def add_lazy_objects(self, loader, replace = False):
+		"""Registers all objects that the loader knows about. They are only
+		parsed when they are first accessed. Unless 'replace' is set, objects
+		that are already present take precedence."""
+		for key in loader.keys():
+			if replace:
+				self._objs.pop(key, None)
+			elif key in self._objs:
+				continue
+			self._unloaded_objs[key] = loader
+
+	def add_deferred_objects(self, loader):
+		"""Registers a loader which only finds some of its objects when it is
+		asked for them, see ObjectLoader.discover(). It is asked whenever an
+		unknown object is looked up or all objects are needed."""
+		self.add_lazy_objects(loader)
+		if loader.has_deferred_objects:
+			self._deferred_loaders.append(loader)
+
+	def _discover_objects(self, key = None):
+		if len(self._deferred_loaders) == 0:
+			return
+		for loader in self._deferred_loaders:
+			for discovered_key in loader.discover(key):
+				if discovered_key not in self._objs:
+					self._unloaded_objs[discovered_key] = loader
+		self._deferred_loaders = [ loader for loader in self._deferred_loaders if loader.has_deferred_objects ]
+
+	def _load_object(self, key):
+		loader = self._unloaded_objs.pop(key)
+		obj = loader.load(*key, lookup = self._lookup_loaded)
+		if obj is not None:
+			self._objs[key] = obj
+			self._fix_object_size(obj)
+		return obj
+
+	def compact(self):
+		"""Compacts all loaded objects, see PDFObject.compact(). Returns the
+		number of objects whose parsed content was dropped."""
+		return sum(1 for obj in self._objs.values() if obj.compact())
+
+	def load_all_objects(self):
+		self._discover_objects()
+		for key in list(self._unloaded_objs):
+			if key in self._unloaded_objs:
+				self._load_object(key)
+
+	def _lookup_loaded(self, xref):
+		key = (xref.objid, xref.gennum)
+		if (key not in self._objs) and (key not in self._unloaded_objs):
+			self._discover_objects(key)
+		if key in self._unloaded_objs:
+			return self._load_object(key)
+		return self._objs.get(key)
+
+	def _has_object(self, key):
+		if (key not in self._objs) and (key not in self._unloaded_objs):
+			self._discover_objects(key)
+		return (key in self._objs) or (key in self._unloaded_objs)
+
 	def _identify(self):
 		self._f.seek(0)
 		version = self._f.readline()
@@ -67,24 +145,24 @@ class PDFDocument(object):
 
 	@property
 	def image_objects(self):
-		return [ obj for obj in self._objs.values() if obj.is_image ]
+		return [ obj for obj in self if obj.is_image ]
 
 	@property
 	def pattern_objects(self):
-		return [ obj for obj in self._objs.values() if obj.is_pattern ]
+		return [ obj for obj in self if obj.is_pattern ]
 
 	@property
 	def objstrm_objects(self):
-		return [ obj for obj in self._objs.values() if obj.is_objstrm ]
+		return [ obj for obj in self if obj.is_objstrm ]
 
 	@property
 	def stream_objects(self):
-		return [ obj for obj in self._objs.values() if obj.has_stream ]
+		return [ obj for obj in self if obj.has_stream ]
 
 	def get_objects_that_reference(self, xref):
 		for obj in self.pattern_objects:
-			resources = obj.content.get(PDFName("/Resources"))
-			xobjects = resources.get(PDFName("/XObject"))
+			resources = obj.content.get(NAME_RESOURCES)
+			xobjects = resources.get(NAME_XOBJECT)
 			xrefs = set(xobjects.values())
 			if xref in xrefs:
 				yield obj
@@ -94,29 +172,29 @@ class PDFDocument(object):
 		for obj in self.get_objects_that_reference(img_object.xref):
 			if obj.is_pattern:
 				print("Referenced by pattern %s" % (obj), obj.content)
-				bbox = obj.content.get(PDFName("/BBox"))
+				bbox = obj.content.get(NAME_BBOX)
 				(width, height) = (bbox[2] - bbox[0], bbox[3] - bbox[1])
 				return (width, height)
 			else:
 				print("Cannot determine phyiscal extents of image, scaling probably done in page code :-(")
 
 	def _get_pages_from_pages_obj(self, pages_obj):
-		pagecontent_xrefs = pages_obj.content[PDFName("/Kids")]
+		pagecontent_xrefs = pages_obj.content[NAME_KIDS]
 		for page_xref in pagecontent_xrefs:
 			page = self.lookup(page_xref)
-			if page.content[PDFName("/Type")] == PDFName("/Page"):
+			if page.content[NAME_TYPE] == NAME_PAGE:
 				yield page
-			elif page.content[PDFName("/Type")] == PDFName("/Pages"):
+			elif page.content[NAME_TYPE] == NAME_PAGES:
 				yield from self._get_pages_from_pages_obj(page)
 			else:
-				raise Exception("Page object %s contains neither page nor pages (/Type = %s)." % (pages_obj, page.content[PDFName("/Type")]))
+				raise Exception("Page object %s contains neither page nor pages (/Type = %s)." % (pages_obj, page.content[NAME_TYPE]))
 
 	@property
 	def pages_object(self):
 		if self._trailer is None:
 			self._log.error("Cannot access page data without trailer; returning empty page set.")
 			return [ ]
-		root_xref = self._trailer.get(PDFName("/Root"))
+		root_xref = self._trailer.get(NAME_ROOT)
 		if root_xref is None:
 			self._log.error("Cannot access page data without /Root node in trailer; returning empty page set.")
 			return [ ]
@@ -124,7 +202,7 @@ class PDFDocument(object):
 		if root_obj is None:
 			self._log.error("Cannot access page data without /Root node (failed to lookup %s); returning empty page set.", root_xref)
 			return [ ]
-		pages_obj = self.lookup(root_obj.content[PDFName("/Pages")])
+		pages_obj = self.lookup(root_obj.content[NAME_PAGES])
 		return pages_obj
 
 	@property
@@ -134,7 +212,7 @@ class PDFDocument(object):
 	@property
 	def parsed_pages(self):
 		for page in self.pages:
-			content_xref = page.content[PDFName("/Contents")]
+			content_xref = page.content[NAME_CONTENTS]
 			content = self.lookup(content_xref)
 			pagedata = content.stream.decode()
 			pagedata = pagedata.decode("latin1")
@@ -142,12 +220,18 @@ class PDFDocument(object):
 
 	def __getitem__(self, key):
 		(objid, gennum) = key
-		return self._objs.get((objid, gennum))
+		obj = self._objs.get((objid, gennum))
+		if (obj is None) and ((objid, gennum) not in self._unloaded_objs):
+			self._discover_objects((objid, gennum))
+		if (obj is None) and ((objid, gennum) in self._unloaded_objs):
+			obj = self._load_object((objid, gennum))
+		return obj
 
 	def lookup(self, xref):
 		return self[(xref.objid, xref.gennum)]
 
 	def __iter__(self):
+		self.load_all_objects()
 		return iter(self._objs.values())
 
 	def _read_objects(self):
@@ -166,7 +250,7 @@ class PDFDocument(object):
 	def _fix_object_sizes(self):
 		self._log.debug("Fixing object sizes of indirect referenced /Length fields")
 		for obj in self.stream_objects:
-			length_xref = obj.content.get(PDFName("/Length"))
+			length_xref = obj.content.get(NAME_LENGTH)
 			if (length_xref is not None) and isinstance(length_xref, PDFXRef):
 				length_obj = self.lookup(length_xref)
 				length = length_obj.content
@@ -207,7 +291,7 @@ class PDFDocument(object):
 							self._log.error("Could not parse a valid type /XRef object at 0x%x. Corrupt PDF?", xref_offset)
 						else:
 							self._trailer = xref_object.content
-							assert(self._trailer[PDFName("/Type")] == PDFName("/XRef"))
+							assert(self._trailer[NAME_TYPE] == NAME_XREF)
 							self._xref_table.parse_xref_object(xref_object.stream.decode(), self._trailer.get(PDFName("/Index")), self._trailer[PDFName("/W")])
 			elif line == "%%EOF":
 				self._log.debug("Hit EOF marker at 0x%x.", self._f.tell())
@@ -228,8 +312,8 @@ class PDFDocument(object):
 
 	def _unpack_objstrm(self, objstrm_obj):
 		data = objstrm_obj.stream.decode()
-		objcnt = objstrm_obj.content[PDFName("/N")]
-		first = objstrm_obj.content[PDFName("/First")]
+		objcnt = objstrm_obj.content[NAME_N]
+		first = objstrm_obj.content[NAME_FIRST]
 		self._log.debug("Object stream %s contains %d objects starting at offset %d.", objstrm_obj, objcnt, first)
 
 		header = data[:first]
@@ -258,9 +342,9 @@ class PDFDocument(object):
 
 	def get_image(self, img_xref):
 		image = self.lookup(img_xref)
-		if PDFName("/SMask") in image.content:
+		if NAME_SMASK in image.content:
 			# image has an alpha channel
-			alpha_channel = self.lookup(image.content[PDFName("/SMask")])
+			alpha_channel = self.lookup(image.content[NAME_SMASK])
 		else:
 			alpha_channel = None
 		image = PDFImage.create_from_object(image, alpha_channel)
@@ -291,11 +375,12 @@ class PDFDocument(object):
 
 	def get_free_objids(self, count = 1):
 		assert(count >= 1)
-		for objid in range(1, len(self._objs) + count + 1):
-			if (objid, 0) not in self._objs:
+		for objid in range(1, self.objcount + count + 1):
+			if not self._has_object((objid, 0)):
 				yield objid
 
 	def add(self, obj):
+		self._unloaded_objs.pop((obj.objid, obj.gennum), None)
 		self._objs[(obj.objid, obj.gennum)] = obj
 		return self
 
@@ -312,48 +397,46 @@ class PDFDocument(object):
 
 	def delete_object(self, objid, gennum):
 		key = (objid, gennum)
+		self._discover_objects(key)
+		self._unloaded_objs.pop(key, None)
 		if key in self._objs:
 			del self._objs[key]
 
 	def replace_object(self, obj):
+		self._unloaded_objs.pop((obj.objid, obj.gennum), None)
 		self._objs[(obj.objid, obj.gennum)] = obj
 		return self
 
+	def _fix_object_size(self, obj):
+		if (not obj.has_stream) or obj.stream_length_verified or (not isinstance(obj.content, dict)):
+			return
+		length_xref = obj.content.get(NAME_LENGTH)
+		if (length_xref is not None) and isinstance(length_xref, PDFXRef):
+			length_obj = self.lookup(length_xref)
+			if length_obj is None:
+				self._log.warning("Indirect length reference of %s points to nonexistent object %s", obj, length_xref)
+				return
+			length = length_obj.content
+			if not isinstance(length, int):
+				self._log.warning("Indirect length reference supposed to point to integer value, but points to %s (%s)", length_obj, length)
+			else:
+				if length != len(obj):
+					obj.truncate(length)
+
 	def _fix_object_sizes(self):
+		"""Fixes the sizes of all loaded objects. Objects that are not loaded
+		yet are fixed when they are loaded."""
 		self._log.debug("Fixing object sizes of indirect referenced /Length fields")
-		for obj in self.stream_objects:
-			length_xref = obj.content.get(PDFName("/Length"))
-			if (length_xref is not None) and isinstance(length_xref, PDFXRef):
-				length_obj = self.lookup(length_xref)
-				length = length_obj.content
-				if not isinstance(length, int):
-					self._log.warning("Indirect length reference supposed to point to integer value, but points to %s (%s)", length_obj, length)
-				else:
-					if length != len(obj):
-						obj.truncate(length)
-
-	def _unpack_objstrm(self, objstrm_obj):
-		data = objstrm_obj.stream.decode()
-		objcnt = objstrm_obj.content[PDFName("/N")]
-		first = objstrm_obj.content[PDFName("/First")]
-		self._log.debug("Object stream %s contains %d objects starting at offset %d.", objstrm_obj, objcnt, first)
-
-		header = data[:first]
-		data = data[first:]
-		header = [ int(value) for value in header.decode("ascii").replace("\n", " ").split() ]
-		for idx in range(0, len(header), 2):
-			(objid, sub_offset) = (header[idx], header[idx + 1])
-			if idx + 3 >= len(header):
-				# Last object
-				sub_obj_data = data[sub_offset : ]
-			else:
-				next_sub_offset = header[idx + 3]
-				sub_obj_data = data[sub_offset : next_sub_offset]
-			sub_obj = PDFObject(objid, 0, sub_obj_data)
-			self.replace_object(sub_obj)
-		self.delete_object(objstrm_obj.objid, objstrm_obj.gennum)
+		for obj in list(self._objs.values()):
+			self._fix_object_size(obj)
 
 	def unpack_objstrms(self):
-		for obj in self.objstrm_objects:
-			self._unpack_objstrm(obj)
+		"""Removes all object streams from the document. The objects they
+		contain are loaded from them on demand."""
+		objstrms = { obj.objid: obj for obj in self.objstrm_objects }
+		loader = ObjectStreamLoader(objstrms.get)
+		for objstrm_obj in objstrms.values():
+			loader.add_container(objstrm_obj.objid)
+			self.delete_object(objstrm_obj.objid, objstrm_obj.gennum)
+		self.add_lazy_objects(loader, replace = True)
 		self._fix_object_sizes()
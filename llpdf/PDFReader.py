@@ -27,9 +27,23 @@ from .types.PDFObject import PDFObject
 from llpdf.types.PDFName import PDFName
 from .types.XRefTable import XRefTable
 from .FileRepr import StreamRepr
+from .ObjectLoader import ObjectLoader
+from .ObjectStreamLoader import ObjectStreamLoader
+from .ChunkedObjectReader import ChunkedObjectReader
+from .PDFRevision import PDFRevision
+from .XRefRecovery import XRefRecovery
+from .Exceptions import MalformedPDFException
 
 class PDFReader(object):
 	_log = logging.getLogger("llpdf.PDFReader")
+	_STARTXREF_SEARCH_WINDOW = 4096
+
+	def __init__(self, lazy = False, use_mmap = False, index_cache = None, recover = False, compact = False):
+		self._lazy = lazy
+		self._use_mmap = use_mmap
+		self._index_cache = index_cache
+		self._recover = recover
+		self._compact = compact
 
 	def _read_identifying_header(self, f):
 		f.seek(0)
@@ -108,6 +122,102 @@ class PDFReader(object):
 		trailer = PDFParser.parse(trailer_data)
 		return trailer
 
+	def _find_startxref_offset(self, f):
+		startxref = f.rfind(b"startxref", max(0, len(f) - self._STARTXREF_SEARCH_WINDOW))
+		if startxref == -1:
+			raise MalformedPDFException("Could not find startxref marker at the end of the file.")
+		f.seek(startxref + len(b"startxref"))
+		return int(f.read_next_token())
+
+	def _read_xref_stream(self, f, offset):
+		f.seek(offset)
+		xref_object = PDFObject.parse(f)
+		if (xref_object is None) or (not isinstance(xref_object.content, dict)) or (xref_object.content.get(PDFName("/Type")) != PDFName("/XRef")):
+			raise MalformedPDFException("Could not parse a valid XRef table or type /XRef object at offset 0x%x." % (offset))
+		trailer = xref_object.content
+		xref_table = XRefTable()
+		xref_table.parse_xref_object(xref_object.stream.decode(), trailer.get(PDFName("/Index")), trailer[PDFName("/W")])
+		return (xref_table, trailer)
+
+	def _read_xref_section(self, f, offset):
+		self._log.debug("Reading XRef section at offset 0x%x.", offset)
+		f.seek(offset)
+		if f.read_next_token() == b"xref":
+			xref_table = XRefTable.read_xref_table_from_file(f)
+			trailer_offset = f.find(b"trailer")
+			if trailer_offset == -1:
+				raise MalformedPDFException("XRef table at offset 0x%x is not followed by a trailer." % (offset))
+			f.seek(trailer_offset + len(b"trailer"))
+			trailer = self._read_trailer(f)
+			xref_stream_offset = trailer.get(PDFName("/XRefStm"))
+			if xref_stream_offset is not None:
+				# Hybrid-reference file, compressed objects are only listed in
+				# the XRef stream
+				self._log.debug("Hybrid-reference file, reading XRef stream at offset 0x%x.", xref_stream_offset)
+				(xref_stream_table, xref_stream_trailer) = self._read_xref_stream(f, xref_stream_offset)
+				xref_table.merge_hybrid(xref_stream_table)
+		else:
+			(xref_table, trailer) = self._read_xref_stream(f, offset)
+		return (xref_table, trailer)
+
+	def _read_revisions(self, f):
+		"""Follows the /Prev chain of XRef sections, starting with the one
+		startxref points to. Only the XRef sections are read, not the objects.
+		Returns the list of revisions, oldest first."""
+		offset = self._find_startxref_offset(f)
+		sections = [ ]
+		seen_offsets = set()
+		while offset is not None:
+			if offset in seen_offsets:
+				raise MalformedPDFException("XRef sections form a loop at offset 0x%x." % (offset))
+			seen_offsets.add(offset)
+			(xref_table, trailer) = self._read_xref_section(f, offset)
+			sections.append((offset, xref_table, trailer))
+			offset = trailer.get(PDFName("/Prev"))
+
+		revisions = [ ]
+		for (number, (offset, xref_table, trailer)) in enumerate(reversed(sections)):
+			previous = revisions[-1] if (len(revisions) > 0) else None
+			revisions.append(PDFRevision(f, number, offset, xref_table, trailer, previous = previous))
+		return revisions
+
+	def _read_xref_driven(self, f, pdf):
+		"""Registers all objects that are live in the newest revision for
+		loading on demand. Returns the ObjectLoader, or None if the XRef
+		sections cannot be used."""
+		try:
+			revisions = self._read_revisions(f)
+		except Exception as e:
+			self._log.warning("Cannot read objects through XRef table, XRef table unusable: %s", e)
+			return None
+
+		newest = revisions[-1]
+		self._log.debug("Read %d revisions, XRef table of newest revision has %d live entries.", len(revisions), len(newest.merged_xref_table))
+		loader = ObjectLoader(f, newest.merged_xref_table)
+		broken_entry = next(loader.broken_entries(), None)
+		if broken_entry is not None:
+			self._log.warning("XRef table entry for ObjId %d, GenNum %d does not point to the object at offset 0x%x, XRef table unusable.", *broken_entry)
+			return None
+		pdf.trailer = newest.trailer
+		pdf.xref_table = newest.merged_xref_table
+		pdf.revisions = revisions
+		pdf.add_lazy_objects(loader)
+		return loader
+
+	def _read_recovered(self, f, pdf):
+		"""Reconstructs the XRef table by sweeping the file for objects and
+		registers them for loading on demand. Raises MalformedPDFException if
+		the XRef table cannot be recovered."""
+		try:
+			(xref_table, trailer, objstrms) = XRefRecovery(f).recover()
+		except Exception as e:
+			raise MalformedPDFException("Cannot recover XRef table: %s" % (e))
+		pdf.trailer = trailer
+		pdf.xref_table = xref_table
+		loader = ObjectLoader(f, xref_table, deferred_objstrms = objstrms)
+		pdf.add_deferred_objects(loader)
+		return loader
+
 	def _get_pages_from_pages_obj(self, pages_obj):
 		pagecontent_xrefs = pages_obj.content[PDFName("/Kids")]
 		for page_xref in pagecontent_xrefs:
@@ -124,19 +234,72 @@ class PDFReader(object):
 #		(data, terminal) = self._f.read_until([ b"endstream\r\n", b"endstream\n" ])
 #		return data
 
-	def read(self, filename):
+	def _read_document(self, f):
 		pdf = PDFDocument()
-		with open(filename, "rb") as f:
-			pdf_data = f.read()
-		f = StreamRepr(pdf_data)
-
 		hdr_version = self._read_identifying_header(f)
 		self._log.debug("Header detected: %s", str(hdr_version))
 		if hdr_version not in [ b"%PDF-1.3", b"%PDF-1.4", b"%PDF-1.5", b"%PDF-1.6", b"%PDF-1.7" ]:
 			self._log.warning("Warning: Header indicates %s, unknown if we can handle this.", hdr_version.decode())
 
+		body_offset = f.tell()
+		xref_usable = self._read_xref_driven(f, pdf) is not None
+		if (not xref_usable) and self._recover:
+			self._read_recovered(f, pdf)
+			xref_usable = True
+		if xref_usable:
+			if not self._lazy:
+				pdf.load_all_objects()
+			return pdf
+
+		# XRef table unusable, scan the whole file
+		self._log.debug("Scanning the body of the file linearly.")
+		f.seek(body_offset)
+
 		self._read_pdf_body(f, pdf)
 		self._log.debug("Finished reading PDF file. %d objects found.", pdf.objcount)
 		pdf.unpack_objstrms()
 		self._log.debug("Finished unpacking all object streams in file. %d objects found total.", pdf.objcount)
 		return pdf
+
+	def iter_objects(self, filename, unpack_objstrms = True, chunk_size = 1024 * 1024):
+		"""Yields all objects in the order in which they appear in the file
+		body, including objects that are superseded by later revisions. No
+		object is retained and, unless the file is mapped, it is read in
+		chunks of 'chunk_size' bytes, so memory use depends neither on the
+		number of objects nor on the size of the file. Data that cannot be
+		parsed is skipped up to the next object header. Object streams are
+		replaced by the objects they contain unless 'unpack_objstrms' is
+		False."""
+		if self._use_mmap:
+			yield from self._iter_body(ChunkedObjectReader(stream = StreamRepr.from_filename(filename, use_mmap = True)), unpack_objstrms)
+		else:
+			with open(filename, "rb") as f:
+				yield from self._iter_body(ChunkedObjectReader(f, chunk_size = chunk_size), unpack_objstrms)
+
+	def _iter_body(self, reader, unpack_objstrms):
+		self._read_identifying_header(reader.window)
+		for obj in reader:
+			if unpack_objstrms and obj.is_objstrm:
+				yield from ObjectStreamLoader.unpack(obj)
+			else:
+				yield obj
+
+	def _read(self, filename):
+		f = StreamRepr.from_filename(filename, use_mmap = self._use_mmap)
+		if self._index_cache is not None:
+			index_key = self._index_cache.key(filename, f)
+			pdf = self._index_cache.load(index_key, f)
+			if pdf is not None:
+				return pdf
+
+		pdf = self._read_document(f)
+		if self._index_cache is not None:
+			self._index_cache.store(index_key, f, pdf)
+		return pdf
+
+	def read(self, filename):
+		pdf = self._read(filename)
+		if self._compact:
+			compacted = pdf.compact()
+			self._log.debug("Compacted %d objects after reading.", compacted)
+		return pdf
@@ -0,0 +1,82 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+from llpdf.PDFDocument import PDFDocument
+from llpdf.ObjectLoader import ObjectLoader
+from llpdf.types.XRefTable import XRefTable
+
+class PDFRevision(object):
+	"""One revision of an incrementally updated PDF file, i.e., an XRef
+	section together with its trailer. Revisions are numbered starting with
+	zero for the original document."""
+	def __init__(self, f, number, offset, xref_table, trailer, previous = None):
+		self._f = f
+		self._number = number
+		self._offset = offset
+		self._xref_table = xref_table
+		self._trailer = trailer
+		self._previous = previous
+		self._merged_xref_table = None
+
+	@property
+	def number(self):
+		return self._number
+
+	@property
+	def offset(self):
+		return self._offset
+
+	@property
+	def xref_table(self):
+		"""XRef table of only this revision's XRef section."""
+		return self._xref_table
+
+	@property
+	def trailer(self):
+		return self._trailer
+
+	@property
+	def previous(self):
+		return self._previous
+
+	@property
+	def merged_xref_table(self):
+		"""XRef table of all objects that are live in this revision."""
+		if self._merged_xref_table is None:
+			self._merged_xref_table = XRefTable()
+			revision = self
+			while revision is not None:
+				self._merged_xref_table.merge_older(revision.xref_table)
+				revision = revision.previous
+		return self._merged_xref_table
+
+	def read_document(self):
+		"""Returns the document as it was in this revision. Objects are loaded
+		on demand."""
+		pdf = PDFDocument()
+		pdf.trailer = self.trailer
+		pdf.xref_table = self.merged_xref_table
+		pdf.add_lazy_objects(ObjectLoader(self._f, pdf.xref_table))
+		return pdf
+
+	def __str__(self):
+		return "PDFRevision<#%d, XRef at 0x%x, %d entries>" % (self.number, self.offset, len(self.xref_table))
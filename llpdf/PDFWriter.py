@@ -25,6 +25,11 @@ from llpdf.repr.PDFSerializer import PDFSerializer
 from llpdf.types.CompressedObjectContainer import CompressedObjectContainer
 from llpdf.types.XRefTable import XRefTable, UncompressedXRefEntry, ReservedXRefEntry
 from llpdf.FileRepr import FileWriterDecorator
+from llpdf.CompressionPolicy import CompressionPolicy, StreamKind
+from llpdf.EncodeDecode import EncodedObject
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFName import NAME_FILTER
+from llpdf.tools.WorkerPool import WorkerPool
 
 class PDFWriteContext(object):
 	_log = logging.getLogger("llpdf.PDFWriteContext")
@@ -57,6 +62,14 @@ class PDFWriteContext(object):
 	def max_container_content_size_bytes(self):
 		return self._writer.max_container_content_size_bytes
 
+	@property
+	def compression_policy(self):
+		return self._writer.compression_policy
+
+	@property
+	def compress_streams(self):
+		return self._writer.compress_streams
+
 	def _write_header(self):
 		if (not self.use_object_streams) and (not self.use_xref_stream):
 			self._f.writeline("%PDF-1.4")
@@ -99,8 +112,27 @@ class PDFWriteContext(object):
 		# Add the compressed XRefEntry to the XRef table
 		self._xref_table.add_entry(compressed_xref_entry)
 
+	def _stream_compressible(self, obj):
+		# Metadata stays uncompressed so that it remains readable
+		return self.compress_streams and obj.has_stream and (NAME_FILTER not in obj.content) and (StreamKind.classify(obj.content) not in (StreamKind.Metadata, StreamKind.ObjectStream, StreamKind.XRefStream))
+
+	def _compress_stream(self, obj):
+		"""Returns a copy of the object whose stream is compressed with the
+		settings for its kind, or the object itself if that does not make the
+		stream smaller. The document is not modified."""
+		stream = EncodedObject.create(obj.raw_stream, compression = self.compression_policy.settings_for_object(obj.content))
+		if len(stream) >= len(obj.raw_stream):
+			return obj
+		return PDFObject.create(obj.objid, obj.gennum, dict(obj.content), stream = stream)
+
 	def _write_objects(self):
-		for obj in sorted(self._pdf):
+		objects = sorted(self._pdf)
+
+		# Uncompressed streams are compressed in parallel, but written in order
+		compressed_objects = WorkerPool.imap(self._compress_stream, (obj for obj in objects if self._stream_compressible(obj)))
+		for obj in objects:
+			if self._stream_compressible(obj):
+				obj = next(compressed_objects)
 			object_compressible = not obj.has_stream
 			if object_compressible and self.use_object_streams:
 				self._compressible_objects.append(obj)
@@ -117,25 +149,30 @@ class PDFWriteContext(object):
 		for obj in self._compressible_objects:
 			self._containerize_compressed_object(obj)
 
-		# Afterwards write containers to file
-		for container in self._compression_containers:
-			self._log.debug("Writing compressed object %s", container)
-			self._writer.serializer.offset = self._f.tell()
-			container_obj = container.serialize(self._writer.serializer)
+		# Afterwards write containers to file; their streams are compressed in
+		# parallel, but written in order. Objects inside containers have no
+		# offset in the file, so they get a serializer of their own that never
+		# records marks for the file's serializer.
+		compression = self.compression_policy.settings_for(StreamKind.ObjectStream)
+		container_serializer = PDFSerializer(pretty = self._writer.pretty)
+		for container_obj in CompressedObjectContainer.serialize_many(self._compression_containers, container_serializer, compression = compression):
+			self._log.debug("Writing compressed object %s", container_obj)
 			self._write_uncompressed_object(container_obj)
 
 	def _write_xrefs(self):
 		if not self.use_xref_stream:
-			self._xref.write_xref_table(f)
+			self._xref_table.write_xref_table(self._f)
 			self._write_trailer()
 		else:
-			xref_object = self._xref_table.serialize_xref_object(self._pdf.trailer, self._xref_table.get_free_objid())
+			compression = self.compression_policy.settings_for(StreamKind.XRefStream)
+			xref_object = self._xref_table.serialize_xref_object(self._pdf.trailer, self._xref_table.get_free_objid(), compression = compression)
 			self._xref_table.xref_offset = self._f.tell()
 			self._write_uncompressed_object(xref_object)
 
 	def _write_trailer(self):
 		self._f.writeline("trailer")
-		self._f.write(self._serializer.serialize(self._pdf.trailer, start_offset = self._f.tell()))
+		trailer = self._xref_table.classic_trailer(self._pdf.trailer)
+		self._f.write(self.serializer.serialize(trailer, start_offset = self._f.tell()))
 
 	def _write_finish(self):
 		self._f.writeline("startxref")
@@ -150,15 +187,26 @@ class PDFWriteContext(object):
 		self._write_finish()
 
 class PDFWriter(object):
+	"""Writes a PDFDocument to a file. The 'compression_policy' chooses the
+	Flate settings for the object streams and the XRef stream. If it is
+	given explicitly, streams without a filter are also compressed with the
+	settings the policy chooses for their kind; otherwise, all streams are
+	written as they are."""
 	_log = logging.getLogger("llpdf.PDFWriter")
 
-	def __init__(self, pretty = False, use_object_streams = True, use_xref_stream = True, compress_object_count = 100, max_container_content_size_bytes = 1024 * 1024):
+	def __init__(self, pretty = False, use_object_streams = True, use_xref_stream = True, compress_object_count = 100, max_container_content_size_bytes = 1024 * 1024, compression_policy = None):
 		self._pretty = pretty
 		self._use_object_streams = use_object_streams and use_xref_stream
 		self._use_xref_stream = use_xref_stream
 		self._compress_object_count = compress_object_count
 		self._max_container_content_size_bytes = max_container_content_size_bytes
 		self._serializer = PDFSerializer(pretty = self._pretty)
+		self._compression_policy = compression_policy if (compression_policy is not None) else CompressionPolicy()
+		self._compress_streams = compression_policy is not None
+
+	@property
+	def pretty(self):
+		return self._pretty
 
 	@property
 	def use_object_streams(self):
@@ -176,6 +224,14 @@ class PDFWriter(object):
 	def max_container_content_size_bytes(self):
 		return self._max_container_content_size_bytes
 
+	@property
+	def compression_policy(self):
+		return self._compression_policy
+
+	@property
+	def compress_streams(self):
+		return self._compress_streams
+
 	@property
 	def serializer(self):
 		return self._serializer
@@ -0,0 +1,394 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import enum
+import itertools
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+class PNGPredictor(enum.IntEnum):
+	No = 0
+	Sub = 1
+	Up = 2
+	Average = 3
+	Paeth = 4
+
+class PNGPrediction(object):
+	"""Applies or undoes PNG prediction of image or XRef stream data. The
+	predicted data consists of rows of 'row_length' bytes, each preceded by
+	a byte that selects the PNGPredictor of that row; 'bpp' is the number of
+	bytes per pixel (at least one) that the Sub, Average and Paeth
+	predictors refer back to. Uses NumPy if it is available."""
+	# Below this number of rows, a Python loop over the rows is faster than a
+	# vectorized loop over the anti-diagonals of the image. Above the maximum,
+	# the image is processed in bands to bound the memory used for shearing.
+	_MIN_SHEARED_ROWS = 16
+	_MAX_SHEARED_ROWS = 1024
+
+	# Number of rows that are predicted at once with NumPy; every row needs
+	# a temporary copy for each candidate predictor
+	_PREDICTION_BAND_ROWS = 1024
+
+	# Maps each residual byte to its magnitude as a signed byte; the sum of
+	# these is the heuristic by which the optimum predictor is chosen
+	_RESIDUAL_MAGNITUDE = bytes(min(value, 256 - value) for value in range(256))
+
+	def __init__(self, row_length, bpp = 1):
+		assert(row_length > 0)
+		assert(bpp > 0)
+		self._row_length = row_length
+		self._bpp = bpp
+
+	@property
+	def row_length(self):
+		return self._row_length
+
+	@property
+	def bpp(self):
+		return self._bpp
+
+	@staticmethod
+	def _add_bytes(data1, data2):
+		"""Adds two byte strings of equal length bytewise modulo 256, using
+		arbitrary precision integers as vectors of bytes."""
+		length = len(data1)
+		value1 = int.from_bytes(data1, byteorder = "big")
+		value2 = int.from_bytes(data2, byteorder = "big")
+		low_mask = int.from_bytes(b"\x7f" * length, byteorder = "big")
+		high_mask = int.from_bytes(b"\x80" * length, byteorder = "big")
+		result = ((value1 & low_mask) + (value2 & low_mask)) ^ ((value1 ^ value2) & high_mask)
+		return result.to_bytes(length = length, byteorder = "big")
+
+	def _undo_sub(self, scanline):
+		# Prefix sum modulo 256 over the bytes that are bpp apart, computed
+		# in log2(row_length) steps: after each step, every byte contains the
+		# sum of itself and 'distance' preceding bytes
+		length = len(scanline)
+		low_mask = int.from_bytes(b"\x7f" * length, byteorder = "big")
+		high_mask = int.from_bytes(b"\x80" * length, byteorder = "big")
+		value = int.from_bytes(scanline, byteorder = "big")
+		distance = self._bpp
+		while distance < length:
+			shifted = value >> (8 * distance)
+			value = ((value & low_mask) + (shifted & low_mask)) ^ ((value ^ shifted) & high_mask)
+			distance *= 2
+		return value.to_bytes(length = length, byteorder = "big")
+
+	def _undo_average(self, scanline, previous_scanline):
+		bpp = self._bpp
+		result = bytearray(scanline)
+		for index in range(len(result)):
+			left = result[index - bpp] if (index >= bpp) else 0
+			result[index] = (result[index] + ((left + previous_scanline[index]) // 2)) & 0xff
+		return result
+
+	def _undo_paeth(self, scanline, previous_scanline):
+		bpp = self._bpp
+		result = bytearray(scanline)
+		for index in range(len(result)):
+			if index >= bpp:
+				(left, upper_left) = (result[index - bpp], previous_scanline[index - bpp])
+			else:
+				(left, upper_left) = (0, 0)
+			above = previous_scanline[index]
+			estimate = left + above - upper_left
+			distance_left = abs(estimate - left)
+			distance_above = abs(estimate - above)
+			distance_upper_left = abs(estimate - upper_left)
+			if (distance_left <= distance_above) and (distance_left <= distance_upper_left):
+				prediction = left
+			elif distance_above <= distance_upper_left:
+				prediction = above
+			else:
+				prediction = upper_left
+			result[index] = (result[index] + prediction) & 0xff
+		return result
+
+	def _undo_row(self, png_predictor, scanline, previous_scanline):
+		if png_predictor == PNGPredictor.No:
+			return scanline
+		elif png_predictor == PNGPredictor.Sub:
+			return self._undo_sub(scanline)
+		elif png_predictor == PNGPredictor.Up:
+			return self._add_bytes(scanline, previous_scanline)
+		elif png_predictor == PNGPredictor.Average:
+			return self._undo_average(scanline, previous_scanline)
+		else:
+			return self._undo_paeth(scanline, previous_scanline)
+
+	@staticmethod
+	def _subtract_bytes(data1, data2):
+		"""Subtracts two byte strings of equal length bytewise modulo 256,
+		using arbitrary precision integers as vectors of bytes."""
+		length = len(data1)
+		value1 = int.from_bytes(data1, byteorder = "big")
+		value2 = int.from_bytes(data2, byteorder = "big")
+		low_mask = int.from_bytes(b"\x7f" * length, byteorder = "big")
+		high_mask = int.from_bytes(b"\x80" * length, byteorder = "big")
+		result = ((value1 | high_mask) - (value2 & low_mask)) ^ ((value1 ^ value2 ^ high_mask) & high_mask)
+		return result.to_bytes(length = length, byteorder = "big")
+
+	def _predict_average(self, scanline, previous_scanline):
+		# The bytewise mean is (x & y) + ((x ^ y) >> 1); the lowest bit of
+		# every byte is masked before shifting so that it does not move into
+		# the neighboring byte
+		length = len(scanline)
+		left = int.from_bytes(bytes(self._bpp) + scanline[ : -self._bpp], byteorder = "big")
+		above = int.from_bytes(previous_scanline, byteorder = "big")
+		even_mask = int.from_bytes(b"\xfe" * length, byteorder = "big")
+		mean = (left & above) + (((left ^ above) & even_mask) >> 1)
+		return self._subtract_bytes(scanline, mean.to_bytes(length = length, byteorder = "big"))
+
+	def _predict_paeth(self, scanline, previous_scanline):
+		bpp = self._bpp
+		result = bytearray(len(scanline))
+		for index in range(len(scanline)):
+			if index >= bpp:
+				(left, upper_left) = (scanline[index - bpp], previous_scanline[index - bpp])
+			else:
+				(left, upper_left) = (0, 0)
+			above = previous_scanline[index]
+			estimate = left + above - upper_left
+			distance_left = abs(estimate - left)
+			distance_above = abs(estimate - above)
+			distance_upper_left = abs(estimate - upper_left)
+			if (distance_left <= distance_above) and (distance_left <= distance_upper_left):
+				prediction = left
+			elif distance_above <= distance_upper_left:
+				prediction = above
+			else:
+				prediction = upper_left
+			result[index] = (scanline[index] - prediction) & 0xff
+		return result
+
+	def _predict_row(self, png_predictor, scanline, previous_scanline):
+		if png_predictor == PNGPredictor.No:
+			return scanline
+		elif png_predictor == PNGPredictor.Sub:
+			return self._subtract_bytes(scanline, bytes(self._bpp) + scanline[ : -self._bpp])
+		elif png_predictor == PNGPredictor.Up:
+			return self._subtract_bytes(scanline, previous_scanline)
+		elif png_predictor == PNGPredictor.Average:
+			return self._predict_average(scanline, previous_scanline)
+		else:
+			return self._predict_paeth(scanline, previous_scanline)
+
+	def _predict_native(self, rows, candidates, previous_scanline):
+		result = bytearray()
+		for scanline in rows:
+			predicted_rows = [ (png_predictor, self._predict_row(png_predictor, scanline, previous_scanline)) for png_predictor in candidates ]
+			if len(predicted_rows) == 1:
+				(png_predictor, predicted_row) = predicted_rows[0]
+			else:
+				(png_predictor, predicted_row) = min(predicted_rows, key = lambda predicted: sum(predicted[1].translate(self._RESIDUAL_MAGNITUDE)))
+			result.append(png_predictor)
+			result += predicted_row
+			previous_scanline = scanline
+		return result
+
+	def _depredict_native(self, rows, predictors, previous_scanline):
+		result = bytearray()
+		for (png_predictor, row) in zip(predictors, rows):
+			previous_scanline = self._undo_row(png_predictor, row, previous_scanline)
+			result += previous_scanline
+		return result
+
+	@staticmethod
+	def _numpy_predictions(png_predictors, left, above, upper_left):
+		"""Computes the prediction for vectors of pixels that are each subject
+		to one of the given PNG predictors."""
+		(left, above, upper_left) = (left.astype(numpy.int16), above.astype(numpy.int16), upper_left.astype(numpy.int16))
+		predictions = { }
+		for png_predictor in set(png_predictors):
+			if png_predictor == PNGPredictor.No:
+				predictions[png_predictor] = 0
+			elif png_predictor == PNGPredictor.Sub:
+				predictions[png_predictor] = left
+			elif png_predictor == PNGPredictor.Up:
+				predictions[png_predictor] = above
+			elif png_predictor == PNGPredictor.Average:
+				predictions[png_predictor] = (left + above) >> 1
+			else:
+				estimate = left + above - upper_left
+				distance_left = numpy.abs(estimate - left)
+				distance_above = numpy.abs(estimate - above)
+				distance_upper_left = numpy.abs(estimate - upper_left)
+				predictions[png_predictor] = numpy.where((distance_left <= distance_above) & (distance_left <= distance_upper_left), left, numpy.where(distance_above <= distance_upper_left, above, upper_left))
+		if len(predictions) == 1:
+			return predictions.popitem()[1]
+		png_predictors = numpy.array(png_predictors, dtype = numpy.uint8)[:, numpy.newaxis]
+		conditions = [ png_predictors == png_predictor for png_predictor in predictions ]
+		return numpy.select(conditions, list(predictions.values()))
+
+	def _depredict_numpy_band(self, rows, predictors, previous_scanline):
+		"""Undoes arbitrary predictors on a band of rows. Every pixel only
+		depends on the pixels to its left, above and upper left, so all pixels
+		on an anti-diagonal are computed at once. For this, the band is
+		sheared so that anti-diagonals become columns: pixel (row, column) is
+		stored at (row + 1, row + column + 2), leaving zeros to the left and
+		the previous scanline above."""
+		(height, row_length) = rows.shape
+		(bpp, width) = (self._bpp, row_length // self._bpp)
+		rows = rows.reshape((height, width, bpp))
+		sheared_rows = numpy.zeros((height, height + width, bpp), dtype = numpy.uint8)
+		sheared = numpy.zeros((height + 1, height + width + 2, bpp), dtype = numpy.uint8)
+		sheared[0, 1 : width + 1] = previous_scanline.reshape((width, bpp))
+		for row in range(height):
+			sheared_rows[row, row : row + width] = rows[row]
+
+		for diagonal in range(height + width - 1):
+			(first_row, last_row) = (max(0, diagonal - width + 1), min(height - 1, diagonal))
+			left = sheared[first_row + 1 : last_row + 2, diagonal + 1]
+			above = sheared[first_row : last_row + 1, diagonal + 1]
+			upper_left = sheared[first_row : last_row + 1, diagonal]
+			prediction = self._numpy_predictions(predictors[first_row : last_row + 1], left, above, upper_left)
+			sheared[first_row + 1 : last_row + 2, diagonal + 2] = (sheared_rows[first_row : last_row + 1, diagonal] + prediction) & 0xff
+
+		for row in range(height):
+			rows[row] = sheared[row + 1, row + 2 : row + width + 2]
+
+	def _depredict_numpy(self, rows, predictors, previous_scanline):
+		rows = numpy.frombuffer(b"".join(rows), dtype = numpy.uint8).reshape((len(predictors), self._row_length)).copy()
+		if ((self._row_length % self._bpp) == 0) and (len(predictors) >= self._MIN_SHEARED_ROWS) and any(png_predictor in (PNGPredictor.Average, PNGPredictor.Paeth) for png_predictor in predictors):
+			previous_scanline = numpy.frombuffer(previous_scanline, dtype = numpy.uint8)
+			for first_row in range(0, len(predictors), self._MAX_SHEARED_ROWS):
+				band = rows[first_row : first_row + self._MAX_SHEARED_ROWS]
+				self._depredict_numpy_band(band, predictors[first_row : first_row + self._MAX_SHEARED_ROWS], previous_scanline)
+				previous_scanline = band[-1]
+			return bytearray(rows.tobytes())
+
+		previous_scanline = numpy.frombuffer(previous_scanline, dtype = numpy.uint8)
+		row_index = 0
+		for (png_predictor, run) in itertools.groupby(predictors):
+			run_length = len(list(run))
+			run_rows = rows[row_index : row_index + run_length]
+			if png_predictor == PNGPredictor.Sub:
+				if (self._row_length % self._bpp) == 0:
+					pixels = run_rows.reshape((run_length, self._row_length // self._bpp, self._bpp))
+					numpy.cumsum(pixels, axis = 1, dtype = numpy.uint8, out = pixels)
+				else:
+					for row in run_rows:
+						row[:] = numpy.frombuffer(self._undo_sub(row.tobytes()), dtype = numpy.uint8)
+			elif png_predictor == PNGPredictor.Up:
+				run_rows[0] += previous_scanline
+				numpy.cumsum(run_rows, axis = 0, dtype = numpy.uint8, out = run_rows)
+			elif png_predictor in (PNGPredictor.Average, PNGPredictor.Paeth):
+				for row in run_rows:
+					row[:] = numpy.frombuffer(self._undo_row(png_predictor, row.tobytes(), previous_scanline.tobytes()), dtype = numpy.uint8)
+					previous_scanline = row
+			row_index += run_length
+			previous_scanline = rows[row_index - 1]
+		return bytearray(rows.tobytes())
+
+	def _numpy_residuals(self, png_predictor, scanlines, left, above, upper_left):
+		if png_predictor == PNGPredictor.No:
+			return scanlines
+		elif png_predictor == PNGPredictor.Sub:
+			return scanlines - left
+		elif png_predictor == PNGPredictor.Up:
+			return scanlines - above
+		elif png_predictor == PNGPredictor.Average:
+			return scanlines - ((left >> 1) + (above >> 1) + (left & above & 1))
+		else:
+			return scanlines - self._numpy_predictions([ png_predictor ], left, above, upper_left).astype(numpy.uint8)
+
+	def _predict_numpy(self, data, candidates, previous_scanline):
+		row_count = len(data) // self._row_length
+		result = numpy.empty((row_count, self._row_length + 1), dtype = numpy.uint8)
+
+		# Pad the image with zeros on top and to the left, so that the left,
+		# above and upper left neighbors of all bytes are plain slices
+		bpp = self._bpp
+		padded = numpy.zeros((row_count + 1, self._row_length + bpp), dtype = numpy.uint8)
+		padded[0, bpp:] = numpy.frombuffer(previous_scanline, dtype = numpy.uint8)
+		padded[1:, bpp:] = numpy.frombuffer(data, dtype = numpy.uint8).reshape((row_count, self._row_length))
+		for first_row in range(0, row_count, self._PREDICTION_BAND_ROWS):
+			band = padded[first_row : first_row + self._PREDICTION_BAND_ROWS + 1]
+			(scanlines, left, above, upper_left) = (band[1:, bpp:], band[1:, : -bpp], band[: -1, bpp:], band[: -1, : -bpp])
+			result_band = result[first_row : first_row + len(scanlines)]
+			if len(candidates) == 1:
+				result_band[:, 0] = candidates[0]
+				result_band[:, 1:] = self._numpy_residuals(candidates[0], scanlines, left, above, upper_left)
+				continue
+
+			all_residuals = [ self._numpy_residuals(png_predictor, scanlines, left, above, upper_left) for png_predictor in candidates ]
+			magnitudes = numpy.stack([ numpy.minimum(residuals, 0 - residuals).sum(axis = 1, dtype = numpy.uint32) for residuals in all_residuals ])
+			choices = numpy.argmin(magnitudes, axis = 0)
+			for (index, (png_predictor, residuals)) in enumerate(zip(candidates, all_residuals)):
+				chosen = (choices == index)
+				result_band[chosen, 0] = png_predictor
+				result_band[chosen, 1:] = residuals[chosen]
+		return bytearray(result.tobytes())
+
+	def _previous_scanline(self, previous_scanline):
+		if previous_scanline is None:
+			return bytes(self._row_length)
+		assert(len(previous_scanline) == self._row_length)
+		return bytes(previous_scanline)
+
+	def predict(self, data, png_predictor = None, use_numpy = True, previous_scanline = None):
+		"""Applies PNG prediction to the given data, which must consist of
+		complete rows. Unless a specific PNGPredictor is given, the predictor
+		of each row is chosen adaptively as the one that minimizes the sum
+		of the residuals interpreted as signed bytes (PDF predictor 15). All
+		predictors are tried with and without NumPy, so the result does not
+		depend on whether it is available. When the data continues a
+		previous call, its last unpredicted row must be passed as
+		'previous_scanline'."""
+		assert((len(data) % self._row_length) == 0)
+		previous_scanline = self._previous_scanline(previous_scanline)
+		candidates = list(PNGPredictor) if (png_predictor is None) else [ png_predictor ]
+		if use_numpy and (numpy is not None):
+			return self._predict_numpy(bytes(data), candidates, previous_scanline)
+		else:
+			data = bytes(data)
+			rows = [ data[offset : offset + self._row_length] for offset in range(0, len(data), self._row_length) ]
+			return self._predict_native(rows, candidates, previous_scanline)
+
+	def depredict(self, data, use_numpy = True, previous_scanline = None):
+		"""Undoes PNG prediction. When the data continues a previous call,
+		the last row that call returned must be passed as
+		'previous_scanline'."""
+		stride = self._row_length + 1
+		row_count = (len(data) + stride - 1) // stride
+		if row_count == 0:
+			return bytearray()
+
+		# Pad a truncated last row; since every byte only depends on bytes to
+		# its left and above, the padding does not affect the data before it
+		padding = (row_count * stride) - len(data)
+		data = bytes(data) + bytes(padding)
+		try:
+			predictors = [ PNGPredictor(value) for value in data[ : : stride] ]
+		except ValueError as e:
+			raise Exception("Unsupported PNG predictor in predicted data: %s" % (str(e)))
+		rows = [ data[offset + 1 : offset + stride] for offset in range(0, len(data), stride) ]
+
+		if use_numpy and (numpy is not None):
+			result = self._depredict_numpy(rows, predictors, self._previous_scanline(previous_scanline))
+		else:
+			result = self._depredict_native(rows, predictors, self._previous_scanline(previous_scanline))
+		if padding > 0:
+			result = result[ : len(result) - padding]
+		return result
@@ -0,0 +1,232 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import os
+import json
+import base64
+import hashlib
+import logging
+from llpdf.PDFDocument import PDFDocument
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFXRef import PDFXRef
+from llpdf.types.PDFString import PDFString
+from llpdf.types.XRefTable import XRefTable
+
+class ParseIndexCache(object):
+	"""On-disk cache of parsed PDF files. An index stores the trailer, the
+	XRef table and the parsed content of every object along with the location
+	of its stream data. It is keyed by the size, modification time and content
+	hash of the file, so a modified file never hits a stale index. The total
+	size of the cache directory is capped by removing the least recently used
+	indices.
+
+	Indices are JSON documents. Names are stored as JSON strings, dictionaries
+	as JSON objects keyed by name; all other PDF values that JSON cannot
+	represent, including arrays, are stored as single-key objects whose key is
+	a tag that is not a name (e.g., {"R": [ objid, gennum ]} for an XRef).
+	The XRef table is stored as its packed arrays."""
+	_log = logging.getLogger("llpdf.ParseIndexCache")
+	_VERSION = 2
+	_SUFFIX = ".llpdfidx"
+
+	def __init__(self, directory, max_size = 256 * 1024 * 1024):
+		self._directory = directory
+		self._max_size = max_size
+		os.makedirs(self._directory, exist_ok = True)
+
+	@property
+	def directory(self):
+		return self._directory
+
+	@staticmethod
+	def key(filename, f):
+		"""Returns the key of the index of the given file. This hashes the
+		whole file, so it is computed once and passed to load() and store()."""
+		stat = os.stat(filename)
+		digest = hashlib.sha256(f.view(0, len(f))).hexdigest()
+		return "%s-%d-%d" % (digest, stat.st_size, stat.st_mtime_ns)
+
+	def _index_filename(self, key):
+		return os.path.join(self._directory, key + self._SUFFIX)
+
+	def _remove(self, index_filename):
+		try:
+			os.unlink(index_filename)
+		except FileNotFoundError:
+			pass
+
+	@classmethod
+	def _encode(cls, value):
+		if isinstance(value, PDFName):
+			return value.value
+		elif isinstance(value, dict):
+			if not all(isinstance(key, PDFName) for key in value):
+				raise TypeError("Dictionary with keys other than names cannot be stored in parse index.")
+			return { key.value: cls._encode(element) for (key, element) in value.items() }
+		elif isinstance(value, list):
+			return { "l": [ cls._encode(element) for element in value ] }
+		elif isinstance(value, PDFXRef):
+			return { "R": [ value.objid, value.gennum ] }
+		elif isinstance(value, bytes):
+			return { "b": value.hex() }
+		elif isinstance(value, bytearray):
+			return { "a": value.hex() }
+		elif isinstance(value, PDFString):
+			return { "s": value.text }
+		elif (value is None) or isinstance(value, (bool, int, float)):
+			return value
+		else:
+			raise TypeError("Value of type %s cannot be stored in parse index." % (type(value).__name__))
+
+	@staticmethod
+	def _decode_name(value):
+		return PDFName(value) if isinstance(value, str) else value
+
+	@staticmethod
+	def _decode_object(value):
+		"""Called by the JSON decoder for every JSON object, innermost first.
+		Objects that are neither dictionaries nor tagged values are the
+		structure of the index itself and remain as they are."""
+		key = next(iter(value), "/")
+		if key.startswith("/"):
+			return { PDFName(key): (PDFName(element) if isinstance(element, str) else element) for (key, element) in value.items() }
+		elif len(value) != 1:
+			return value
+		elif key == "l":
+			return [ (PDFName(element) if isinstance(element, str) else element) for element in value["l"] ]
+		elif key == "R":
+			return PDFXRef(*value["R"])
+		elif key == "b":
+			return bytes.fromhex(value["b"])
+		elif key == "a":
+			return bytearray.fromhex(value["a"])
+		elif key == "s":
+			return PDFString(value["s"])
+		else:
+			return value
+
+	@staticmethod
+	def _encode_xref_table(xref_table):
+		(types, field2, field3) = xref_table.pack()
+		return {
+			"types":		base64.b64encode(types).decode("ascii"),
+			"field2":		base64.b64encode(field2).decode("ascii"),
+			"field3":		base64.b64encode(field3).decode("ascii"),
+			"xref_offset":	xref_table.xref_offset,
+		}
+
+	@staticmethod
+	def _decode_xref_table(data):
+		return XRefTable.unpack(base64.b64decode(data["types"]), base64.b64decode(data["field2"]), base64.b64decode(data["field3"]), xref_offset = data["xref_offset"])
+
+	def load(self, key, f):
+		"""Returns the PDFDocument that was stored for the given key, or None
+		if there is no valid index for it."""
+		index_filename = self._index_filename(key)
+		try:
+			with open(index_filename, "rb") as index_file:
+				index = json.load(index_file, object_hook = self._decode_object)
+			if (not isinstance(index, dict)) or (index.get("version") != self._VERSION) or (index.get("key") != key):
+				self._log.debug("Removing outdated parse index %s.", index_filename)
+				self._remove(index_filename)
+				return None
+
+			pdf = PDFDocument()
+			pdf.trailer = index["trailer"]
+			pdf.xref_table = self._decode_xref_table(index["xref_table"])
+			for (objid, gennum, content, stream_offset, stream_length) in index["objects"]:
+				obj = PDFObject.create(objid, gennum, self._decode_name(content))
+				if stream_offset is not None:
+					obj.set_raw_stream(f.view(stream_offset, stream_offset + stream_length))
+				pdf.add(obj)
+		except FileNotFoundError:
+			return None
+		except Exception as e:
+			self._log.warning("Removing unreadable parse index %s: %s", index_filename, e)
+			self._remove(index_filename)
+			return None
+
+		# Mark as recently used
+		os.utime(index_filename)
+		self._log.debug("Read %d objects from parse index %s.", len(index["objects"]), index_filename)
+		return pdf
+
+	def store(self, key, f, pdf):
+		"""Stores the index of a freshly read document under the given key.
+		This parses all objects of the document that have not been parsed
+		yet."""
+		index_filename = self._index_filename(key)
+		try:
+			objects = [ ]
+			for obj in pdf:
+				content = self._encode(obj.content)
+				if obj.has_stream:
+					if obj.stream_offset is None:
+						self._log.debug("Not storing parse index %s, stream location of %s unknown.", index_filename, obj)
+						return False
+					objects.append([ obj.objid, obj.gennum, content, obj.stream_offset, len(obj.raw_stream) ])
+				else:
+					objects.append([ obj.objid, obj.gennum, content, None, None ])
+			index = {
+				"version":		self._VERSION,
+				"key":			key,
+				"trailer":		self._encode(pdf.trailer),
+				"xref_table":	self._encode_xref_table(pdf.xref_table),
+				"objects":		objects,
+			}
+		except TypeError as e:
+			self._log.debug("Not storing parse index %s: %s", index_filename, e)
+			return False
+
+		try:
+			# json.dumps() uses the C encoder, json.dump() does not
+			with open(index_filename + ".tmp", "w") as index_file:
+				index_file.write(json.dumps(index, separators = (",", ":")))
+			os.replace(index_filename + ".tmp", index_filename)
+		except OSError as e:
+			self._log.warning("Could not store parse index %s: %s", index_filename, e)
+			return False
+		self._prune()
+		return True
+
+	def _prune(self):
+		indices = [ ]
+		for filename in os.listdir(self._directory):
+			if filename.endswith(self._SUFFIX):
+				full_filename = os.path.join(self._directory, filename)
+				stat = os.stat(full_filename)
+				indices.append((stat.st_mtime_ns, stat.st_size, full_filename))
+		indices.sort()
+
+		total_size = sum(size for (mtime, size, filename) in indices)
+		for (mtime, size, filename) in indices:
+			if total_size <= self._max_size:
+				break
+			self._log.debug("Removing parse index %s to keep cache below %d bytes.", filename, self._max_size)
+			self._remove(filename)
+			total_size -= size
+
+	def clear(self):
+		for filename in os.listdir(self._directory):
+			if filename.endswith(self._SUFFIX):
+				self._remove(os.path.join(self._directory, filename))
@@ -0,0 +1,227 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import re
+import base64
+try:
+	import numpy
+except ImportError:
+	numpy = None
+
+class ASCIIHexCodec(object):
+	_WHITESPACE = b"\x00\t\n\x0c\r "
+
+	@classmethod
+	def decode(cls, data):
+		data = bytes(data).split(b">", 1)[0].translate(None, delete = cls._WHITESPACE)
+		if (len(data) % 2) == 1:
+			# A missing last digit is assumed to be zero
+			data += b"0"
+		return bytes.fromhex(data.decode("ascii"))
+
+	@classmethod
+	def encode(cls, data):
+		return data.hex().encode("ascii") + b">"
+
+class ASCII85Codec(object):
+	_WHITESPACE = b"\x00\t\n\x0c\r "
+
+	@staticmethod
+	def _decode_numpy(data):
+		# All groups are complete five digit groups after expanding "z";
+		# a partial last group is padded with the highest digit and the
+		# corresponding number of bytes dropped afterwards
+		data = data.replace(b"z", b"!!!!!")
+		padding = (5 - (len(data) % 5)) % 5
+		digits = numpy.frombuffer(data + (b"u" * padding), dtype = numpy.uint8).reshape((-1, 5)).astype(numpy.uint64) - 33
+		if (digits > 84).any():
+			raise ValueError("Invalid character in ASCII85 data.")
+		values = digits @ numpy.array([ 85 ** 4, 85 ** 3, 85 ** 2, 85, 1 ], dtype = numpy.uint64)
+		if (values > 0xffffffff).any():
+			raise ValueError("ASCII85 group out of range.")
+		result = values.astype(">u4").tobytes()
+		return result[ : len(result) - padding]
+
+	@classmethod
+	def decode(cls, data, use_numpy = True):
+		data = bytes(data).split(b"~>", 1)[0].translate(None, delete = cls._WHITESPACE)
+		if data.startswith(b"<~"):
+			data = data[2 : ]
+		if use_numpy and (numpy is not None):
+			return cls._decode_numpy(data)
+		return base64.a85decode(data)
+
+	@classmethod
+	def encode(cls, data):
+		return base64.a85encode(data, wrapcol = 76) + b"~>"
+
+class LZWCodec(object):
+	"""LZW as used by PDF and TIFF: codes are 9 to 12 bits wide, most
+	significant bit first. With 'early_change', the code width increases one
+	code earlier than strictly necessary."""
+	_CLEAR_TABLE = 256
+	_END_OF_DATA = 257
+	_MAX_TABLE_SIZE = 4096
+
+	@classmethod
+	def decode(cls, data, early_change = 1):
+		initial_table = [ bytes((value, )) for value in range(256) ] + [ b"", b"" ]
+		table = list(initial_table)
+		result = bytearray()
+		(bit_buffer, bit_count, code_length) = (0, 0, 9)
+		previous = None
+		for byte in bytes(data):
+			# Codes are at least nine bits wide, so every byte completes at
+			# most one code
+			bit_buffer = (bit_buffer << 8) | byte
+			bit_count += 8
+			if bit_count < code_length:
+				continue
+			bit_count -= code_length
+			code = bit_buffer >> bit_count
+			bit_buffer &= (1 << bit_count) - 1
+
+			if code == cls._CLEAR_TABLE:
+				table = list(initial_table)
+				code_length = 9
+				previous = None
+				continue
+			elif code == cls._END_OF_DATA:
+				break
+
+			if code < len(table):
+				entry = table[code]
+				new_entry = None if (previous is None) else (previous + entry[ : 1])
+			elif (code == len(table)) and (previous is not None):
+				entry = new_entry = previous + previous[ : 1]
+			else:
+				raise Exception("Invalid code %d in LZW data, table has %d entries." % (code, len(table)))
+			result += entry
+			previous = entry
+
+			# Once the table is full, the encoder has to clear it before any
+			# more entries can be added
+			if (new_entry is not None) and (len(table) < cls._MAX_TABLE_SIZE):
+				table.append(new_entry)
+				if (len(table) + early_change >= (1 << code_length)) and (code_length < 12):
+					code_length += 1
+		return bytes(result)
+
+	@staticmethod
+	def _code_length(table_size, early_change):
+		code_length = 9
+		while (table_size + early_change >= (1 << code_length)) and (code_length < 12):
+			code_length += 1
+		return code_length
+
+	@classmethod
+	def encode(cls, data, early_change = 1):
+		result = bytearray()
+		def emit(code):
+			# The decoder adds a table entry for every code but the first one
+			# after clearing the table, and chooses the code length
+			# according to the size of its table
+			nonlocal decoder_table_size, first_code, bit_buffer, bit_count
+			code_length = cls._code_length(decoder_table_size, early_change)
+			bit_buffer = (bit_buffer << code_length) | code
+			bit_count += code_length
+			while bit_count >= 8:
+				bit_count -= 8
+				result.append((bit_buffer >> bit_count) & 0xff)
+			bit_buffer &= (1 << bit_count) - 1
+			if code == cls._CLEAR_TABLE:
+				(decoder_table_size, first_code) = (258, True)
+			elif first_code:
+				first_code = False
+			else:
+				decoder_table_size = min(decoder_table_size + 1, cls._MAX_TABLE_SIZE)
+
+		(decoder_table_size, first_code, bit_buffer, bit_count) = (258, True, 0, 0)
+		emit(cls._CLEAR_TABLE)
+		(table, next_code) = ({ }, 258)
+		prefix = None
+		for byte in bytes(data):
+			if prefix is None:
+				prefix = byte
+				continue
+			key = (prefix << 8) | byte
+			code = table.get(key)
+			if code is not None:
+				prefix = code
+				continue
+			emit(prefix)
+			table[key] = next_code
+			next_code += 1
+			if next_code == cls._MAX_TABLE_SIZE:
+				emit(cls._CLEAR_TABLE)
+				(table, next_code) = ({ }, 258)
+			prefix = byte
+		if prefix is not None:
+			emit(prefix)
+		emit(cls._END_OF_DATA)
+		if bit_count > 0:
+			result.append((bit_buffer << (8 - bit_count)) & 0xff)
+		return bytes(result)
+
+class RunLengthCodec(object):
+	_END_OF_DATA = 128
+	_REPEATED_BYTES = re.compile(rb"(.)\1{2,127}", flags = re.DOTALL)
+
+	@classmethod
+	def decode(cls, data):
+		data = bytes(data)
+		pieces = [ ]
+		(index, length) = (0, len(data))
+		while index < length:
+			run_length = data[index]
+			if run_length < cls._END_OF_DATA:
+				pieces.append(data[index + 1 : index + 2 + run_length])
+				index += 2 + run_length
+			elif run_length > cls._END_OF_DATA:
+				pieces.append(data[index + 1 : index + 2] * (257 - run_length))
+				index += 2
+			else:
+				break
+		return b"".join(pieces)
+
+	@staticmethod
+	def _append_literal(result, literal):
+		for offset in range(0, len(literal), 128):
+			chunk = literal[offset : offset + 128]
+			result.append(len(chunk) - 1)
+			result += chunk
+
+	@classmethod
+	def encode(cls, data):
+		"""Encodes runs of three or more equal bytes as repetitions and
+		everything in between as literals."""
+		data = bytes(data)
+		result = bytearray()
+		literal_start = 0
+		for match in cls._REPEATED_BYTES.finditer(data):
+			cls._append_literal(result, data[literal_start : match.start()])
+			result.append(257 - (match.end() - match.start()))
+			result.append(data[match.start()])
+			literal_start = match.end()
+		cls._append_literal(result, data[literal_start : ])
+		result.append(cls._END_OF_DATA)
+		return bytes(result)
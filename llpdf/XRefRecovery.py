@@ -0,0 +1,138 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import re
+import logging
+from llpdf.repr import PDFParser
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFName import PDFName
+from llpdf.types.XRefTable import XRefTable, UncompressedXRefEntry
+from llpdf.ObjectStreamLoader import ObjectStreamLoader
+from llpdf.Exceptions import MalformedPDFException
+
+class XRefRecovery(object):
+	"""Reconstructs the XRef table of a file whose XRef sections are damaged
+	by sweeping the whole file for object headers. When the same object is
+	found multiple times, the last occurrence wins. Headers that appear
+	inside stream data are skipped. Object streams are not decompressed
+	during the sweep; their offsets are returned so that the ObjectLoader can
+	look inside them on demand."""
+	_log = logging.getLogger("llpdf.XRefRecovery")
+	_OBJECT_HEADER_RE = re.compile(rb"(?<![0-9])\d+[\x00\t\n\x0c\r ]+\d+[\x00\t\n\x0c\r ]+obj(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+	_TRAILER_RE = re.compile(rb"trailer")
+
+	def __init__(self, f):
+		self._f = f
+
+	def _sweep(self):
+		"""Yields the offset of every object found in the file together with
+		the (lazily parsed) object."""
+		offset = 0
+		while True:
+			match = self._f.search(self._OBJECT_HEADER_RE, offset)
+			if match is None:
+				break
+			self._f.seek(match.start())
+			obj = PDFObject.parse(self._f)
+			if obj is None:
+				offset = match.end()
+				continue
+			# Continue after the object so that headers in its stream data are
+			# not mistaken for objects
+			offset = self._f.tell()
+			yield (match.start(), obj)
+
+	def _find_trailers(self):
+		"""Yields all classic trailer dictionaries with their offsets."""
+		for match in self._f.finditer(self._TRAILER_RE):
+			end = self._f.find(b"startxref", match.end())
+			if end == -1:
+				end = len(self._f)
+			try:
+				trailer = PDFParser.parse(bytes(self._f.view(match.end(), end)).decode("latin1"))
+			except Exception:
+				continue
+			if isinstance(trailer, dict):
+				yield (match.start(), trailer)
+
+	def _find_compressed_catalog(self, objstrm_objs):
+		"""Returns the XRef of the catalog inside the newest object stream that
+		contains one, or None. Only used when neither a trailer nor an
+		uncompressed catalog exists, since it decompresses object streams."""
+		for (offset, objstrm_obj) in sorted(objstrm_objs, key = lambda offset_obj: offset_obj[0], reverse = True):
+			try:
+				catalogs = [ obj.xref for obj in ObjectStreamLoader.unpack(objstrm_obj) if obj.is_type(PDFName("/Catalog")) ]
+			except Exception as e:
+				self._log.debug("Cannot search object stream %s at offset 0x%x for a catalog: %s", objstrm_obj, offset, e)
+				continue
+			if len(catalogs) > 0:
+				return catalogs[-1]
+		return None
+
+	def recover(self):
+		"""Returns the reconstructed XRef table of all uncompressed objects, the
+		trailer and a list of (offset, ObjId) tuples of all object streams."""
+		entries = { }
+		objstrms = [ ]
+		objstrm_objs = { }
+		trailers = [ ]
+		catalogs = [ ]
+		for (offset, obj) in self._sweep():
+			if obj.is_type(PDFName("/XRef")):
+				# XRef streams carry the trailer, but are no regular objects
+				trailers.append((offset, obj.content))
+				continue
+			entries[obj.objid] = (offset, UncompressedXRefEntry(obj.objid, obj.gennum, offset))
+			if obj.is_objstrm:
+				objstrms.append((offset, obj.objid))
+				objstrm_objs[offset] = obj
+			elif obj.is_type(PDFName("/Catalog")):
+				catalogs.append((offset, obj.xref))
+
+		# Only the newest version of every object stream is used
+		objstrms = [ (offset, objid) for (offset, objid) in objstrms if entries[objid][0] == offset ]
+
+		if len(entries) == 0:
+			raise MalformedPDFException("No objects found while trying to recover XRef table.")
+		xref_table = XRefTable()
+		for (offset, entry) in entries.values():
+			xref_table.add_entry(entry)
+
+		trailers += self._find_trailers()
+		trailers = [ (offset, trailer) for (offset, trailer) in trailers if PDFName("/Root") in trailer ]
+		if len(trailers) > 0:
+			trailer = dict(max(trailers, key = lambda offset_trailer: offset_trailer[0])[1])
+			for key in [ "/Prev", "/XRefStm" ]:
+				trailer.pop(PDFName(key), None)
+		elif len(catalogs) > 0:
+			self._log.warning("No trailer found, using last catalog object as document root.")
+			trailer = { PDFName("/Root"): max(catalogs)[1] }
+		else:
+			catalog_xref = self._find_compressed_catalog((offset, objstrm_objs[offset]) for (offset, objid) in objstrms)
+			if catalog_xref is None:
+				raise MalformedPDFException("Neither trailer nor catalog found while trying to recover XRef table.")
+			self._log.warning("No trailer found, using catalog object %s from object stream as document root.", catalog_xref)
+			trailer = { PDFName("/Root"): catalog_xref }
+		trailer[PDFName("/Size")] = max(entries) + 1
+
+		self._log.info("Recovered XRef table with %d entries and %d object streams.", len(entries), len(objstrms))
+		return (xref_table, trailer, objstrms)
@@ -22,10 +22,13 @@
 
 from .PDFFilter import PDFFilter
 from llpdf.EncodeDecode import EncodedObject
+from llpdf.tools.WorkerPool import WorkerPool
 
 class DecompressFilter(PDFFilter):
 	def run(self):
-		for obj in self._pdf.stream_objects:
-			if obj.stream.compressed and obj.stream.decompressible:
-				uncompressed_stream = EncodedObject.create(obj.stream.decode(), compress = False)
-				obj.set_stream(uncompressed_stream)
+		objects = [ (obj, obj.stream) for obj in self._pdf.stream_objects ]
+		objects = [ (obj, stream) for (obj, stream) in objects if stream.compressed and stream.decompressible ]
+		decoded_streams = WorkerPool.imap(lambda stream: stream.decode(), (stream for (obj, stream) in objects))
+		for ((obj, stream), decoded_data) in zip(objects, decoded_streams):
+			uncompressed_stream = EncodedObject.create(decoded_data, compress = False)
+			obj.set_stream(uncompressed_stream)
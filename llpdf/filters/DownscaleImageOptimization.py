@@ -27,6 +27,8 @@ from llpdf.img.ImageReformatter import ImageReformatter
 from llpdf.types.PDFObject import PDFObject
 from llpdf.types.PDFName import PDFName
 from llpdf.interpreter.GraphicsInterpreter import GraphicsInterpreter
+from llpdf.tools.WorkerPool import WorkerPool
+from llpdf.CompressionPolicy import StreamKind
 
 class DownscaleImageOptimization(PDFFilter):
 	def _draw_callback(self, draw_cmd):
@@ -51,7 +53,7 @@ class DownscaleImageOptimization(PDFFilter):
 	def _rescale_image(self, image, scale_factor):
 		lossless = not self._args.jpeg_images
 		self._log.debug("Resampling %s (%d bytes) to lossless = %s with scale factor %.3f", image, image.total_size, lossless, scale_factor)
-		reformatter = ImageReformatter(lossless = lossless, scale_factor = scale_factor, jpeg_quality = self._args.jpeg_quality, force_one_bit_alpha = self._args.one_bit_alpha)
+		reformatter = ImageReformatter(lossless = lossless, scale_factor = scale_factor, jpeg_quality = self._args.jpeg_quality, force_one_bit_alpha = self._args.one_bit_alpha, compression = self.compression_policy.settings_for(StreamKind.Image))
 		resampled_image = reformatter.reformat(image)
 		return resampled_image
 
@@ -65,15 +67,7 @@ class DownscaleImageOptimization(PDFFilter):
 			new_alpha_obj = PDFObject.create_image(alpha_xref.objid, alpha_xref.gennum, resampled_image.alpha)
 			self._pdf.replace_object(new_alpha_obj)
 
-	def run(self):
-		self._draw_cmds = collections.defaultdict(list)
-
-		# Run through pages first to determine image extents
-		for (page_obj, page_content) in self._pdf.parsed_pages:
-			interpreter = GraphicsInterpreter(pdf_lookup = self._pdf, page_obj = page_obj)
-			interpreter.set_draw_callback(self._draw_callback)
-			interpreter.run(page_content)
-
+	def _rescale_jobs(self):
 		for (img_xref, img_draw_cmds) in self._draw_cmds.items():
 			try:
 				image = self._pdf.get_image(img_xref)
@@ -90,8 +84,24 @@ class DownscaleImageOptimization(PDFFilter):
 			current_dpi = min(draw_cmd.native_extents.dpi(image.width, image.height) for draw_cmd in img_draw_cmds)
 			scale_factor = min(self._args.target_dpi / current_dpi, 1)
 			self._log.debug("Estimated image %s to have minimum resulution of %d dpi: scale factor = %.3f", img_xref, current_dpi, scale_factor)
+			yield (img_xref, image, scale_factor)
+
+	def _run_rescale_job(self, job):
+		(img_xref, image, scale_factor) = job
+		return (img_xref, image, self._rescale_image(image, scale_factor))
+
+	def run(self):
+		self._draw_cmds = collections.defaultdict(list)
+
+		# Run through pages first to determine image extents
+		for (page_obj, page_content) in self._pdf.parsed_pages:
+			interpreter = GraphicsInterpreter(pdf_lookup = self._pdf, page_obj = page_obj)
+			interpreter.set_draw_callback(self._draw_callback)
+			interpreter.run(page_content)
 
-			resampled_image = self._rescale_image(image, scale_factor)
+		# Images are decoded lazily and rescaled by external programs in
+		# parallel, but replaced in order
+		for (img_xref, image, resampled_image) in WorkerPool.imap(self._run_rescale_job, self._rescale_jobs()):
 			self._save_image(resampled_image, img_xref, "resampled")
 			self._log.debug("Resulting image after resampling: %s (%d bytes, i.e., %+d bytes)", resampled_image, resampled_image.total_size, resampled_image.total_size - image.total_size)
 
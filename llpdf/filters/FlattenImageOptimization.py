@@ -24,14 +24,18 @@ from .PDFFilter import PDFFilter
 from llpdf.img.ImageReformatter import ImageReformatter
 from llpdf.types.PDFObject import PDFObject
 from llpdf.types.PDFName import PDFName
+from llpdf.tools.WorkerPool import WorkerPool
+from llpdf.CompressionPolicy import StreamKind
 
 class FlattenImageOptimization(PDFFilter):
-	def run(self):
-		reformatter = ImageReformatter(lossless = True, scale_factor = 1)
+	def _images_with_alpha(self):
 		for image_obj in self._pdf.image_objects:
 			if PDFName("/SMask") in image_obj.content:
-				current_image = self._pdf.get_image(image_obj.xref)
-				flattened_image = reformatter.flatten(current_image, background_color = self._args.background_color)
+				yield (image_obj.xref, self._pdf.get_image(image_obj.xref))
 
-				flattened_image_obj = PDFObject.create_image(image_obj.xref.objid, image_obj.xref.gennum, flattened_image)
-				self._pdf.replace_object(flattened_image_obj)
+	def run(self):
+		reformatter = ImageReformatter(lossless = True, scale_factor = 1, compression = self.compression_policy.settings_for(StreamKind.Image))
+		flatten = lambda image: (image[0], reformatter.flatten(image[1], background_color = self._args.background_color))
+		for (image_xref, flattened_image) in WorkerPool.imap(flatten, self._images_with_alpha()):
+			flattened_image_obj = PDFObject.create_image(image_xref.objid, image_xref.gennum, flattened_image)
+			self._pdf.replace_object(flattened_image_obj)
@@ -31,6 +31,7 @@ from llpdf.types.PDFObject import PDFObject
 from llpdf.types.Timestamp import Timestamp
 from llpdf.font.T1Font import T1Font
 from llpdf.EncodeDecode import EncodedObject
+from llpdf.CompressionPolicy import StreamKind
 
 class PDFAFilter(PDFFilter):
 	def _add_color_profile(self):
@@ -45,7 +46,7 @@ class PDFAFilter(PDFFilter):
 			PDFName("/Range"):		[ 0, 1, 0, 1, 0, 1 ],
 		}
 		objid = self._pdf.get_free_objid()
-		pdf_object = PDFObject.create(objid, gennum = 0, content = content, stream = EncodedObject.create(profile_data))
+		pdf_object = PDFObject.create(objid, gennum = 0, content = content, stream = EncodedObject.create(profile_data, compression = self.compression_policy.settings_for_object(content)))
 		self._pdf.replace_object(pdf_object)
 		return pdf_object.xref
 
@@ -180,7 +181,7 @@ class PDFAFilter(PDFFilter):
 
 						cidset_objid = self._pdf.get_free_objid()
 						stream = (bytes([ 0xff ]) * full_bytes) + bytes([ last_byte ])
-						pdf_object = PDFObject.create(cidset_objid, gennum = 0, content = { }, stream = EncodedObject.create(stream))
+						pdf_object = PDFObject.create(cidset_objid, gennum = 0, content = { }, stream = EncodedObject.create(stream, compression = self.compression_policy.settings_for(StreamKind.Font)))
 						self._pdf.replace_object(pdf_object)
 
 						font_descriptor_obj.content[PDFName("/CIDSet")] = pdf_object.xref
@@ -21,6 +21,7 @@
 #
 
 import logging
+from llpdf.CompressionPolicy import CompressionPolicy
 
 class PDFFilter(object):
 	def __init__(self, pdf, args):
@@ -29,6 +30,13 @@ class PDFFilter(object):
 		self._args = args
 		self._bytes_saved = 0
 
+	@property
+	def compression_policy(self):
+		"""CompressionPolicy for the streams that the filter compresses, given
+		as the 'compression_policy' argument."""
+		compression_policy = getattr(self._args, "compression_policy", None)
+		return compression_policy if (compression_policy is not None) else CompressionPolicy()
+
 	@property
 	def bytes_saved(self):
 		return self._bytes_saved
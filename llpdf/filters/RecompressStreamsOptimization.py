@@ -0,0 +1,116 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2016 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import zlib
+import itertools
+from .PDFFilter import PDFFilter
+from llpdf.EncodeDecode import EncodedObject, Predictor
+from llpdf.CompressionPolicy import CompressionSettings, StreamKind
+from llpdf.types.PDFName import PDFName
+from llpdf.tools.WorkerPool import WorkerPool
+
+class RecompressStreamsOptimization(PDFFilter):
+	"""Decodes all losslessly encoded streams and encodes them again with
+	several Flate compression settings (including those the compression
+	policy chooses for the kind of stream), with and without PNG
+	prediction, keeping the smallest result if it is smaller than the
+	original."""
+	_CANDIDATE_SETTINGS = (
+		CompressionSettings.maximum(),
+		CompressionSettings(level = 9, memory_level = 9, strategy = zlib.Z_FILTERED),
+		CompressionSettings(level = 9, memory_level = 9, strategy = zlib.Z_RLE),
+	)
+	_SKIPPED_KINDS = frozenset([ StreamKind.Metadata, StreamKind.ObjectStream, StreamKind.XRefStream ])
+
+	_COLORSPACE_COLORS = {
+		PDFName("/DeviceGray"):		1,
+		PDFName("/CalGray"):		1,
+		PDFName("/Indexed"):		1,
+		PDFName("/Separation"):		1,
+		PDFName("/DeviceRGB"):		3,
+		PDFName("/CalRGB"):			3,
+		PDFName("/Lab"):			3,
+		PDFName("/DeviceCMYK"):		4,
+	}
+
+	@classmethod
+	def _colorspace_colors(cls, colorspace):
+		"""Returns the number of color components of a direct color space, or
+		None if it is indirect or unknown."""
+		if isinstance(colorspace, list) and (len(colorspace) > 0):
+			if (colorspace[0] == PDFName("/DeviceN")) and (len(colorspace) > 1) and isinstance(colorspace[1], list):
+				return len(colorspace[1])
+			colorspace = colorspace[0]
+		if not isinstance(colorspace, PDFName):
+			return None
+		return cls._COLORSPACE_COLORS.get(colorspace)
+
+	@classmethod
+	def _image_prediction(cls, content, data):
+		"""Returns the prediction parameters of an image stream, or None if
+		they cannot be determined from its dictionary."""
+		(width, height) = (content.get(PDFName("/Width")), content.get(PDFName("/Height")))
+		if content.get(PDFName("/ImageMask")) is True:
+			(colors, bits_per_component) = (1, 1)
+		else:
+			colors = cls._colorspace_colors(content.get(PDFName("/ColorSpace")))
+			bits_per_component = content.get(PDFName("/BitsPerComponent"))
+		if not all(isinstance(value, int) and (value > 0) for value in (width, height, colors, bits_per_component)):
+			return None
+		row_length = ((width * colors * bits_per_component) + 7) // 8
+		if row_length * height != len(data):
+			# Dictionary does not describe the pixel layout of the stream
+			return None
+		return { "columns": width, "colors": colors, "bits_per_component": bits_per_component }
+
+	def _candidates(self, obj, stream, data):
+		if StreamKind.classify(obj.content) == StreamKind.Image:
+			prediction = self._image_prediction(obj.content, data)
+		elif stream.predictor != Predictor.NoPredictor:
+			prediction = { "columns": stream.columns, "colors": stream.colors, "bits_per_component": stream.bits_per_component }
+		else:
+			prediction = None
+		for compression in (self.compression_policy.settings_for_object(obj.content), ) + self._CANDIDATE_SETTINGS:
+			yield { "compression": compression }
+			if prediction is not None:
+				yield dict(prediction, predict = True, compression = compression)
+
+	def _candidate_jobs(self, objects):
+		for (index, (obj, stream)) in enumerate(objects):
+			data = stream.decode()
+			for candidate in self._candidates(obj, stream, data):
+				yield (index, data, candidate)
+
+	def run(self):
+		objects = [ (obj, obj.stream) for obj in self._pdf.stream_objects if EncodedObject.supports_object(obj) ]
+		objects = [ (obj, stream) for (obj, stream) in objects if stream.decompressible and (StreamKind.classify(obj.content) not in self._SKIPPED_KINDS) ]
+
+		# All candidate encodings of all streams are created in parallel;
+		# results arrive in order, grouped by stream
+		encoded_candidates = WorkerPool.imap(lambda job: (job[0], EncodedObject.create(job[1], **job[2])), self._candidate_jobs(objects))
+		for (index, candidates) in itertools.groupby(encoded_candidates, key = lambda candidate: candidate[0]):
+			(obj, stream) = objects[index]
+			best_stream = min((candidate[1] for candidate in candidates), key = len)
+			if len(best_stream) < len(stream):
+				self._log.debug("Recompressed %s: %s -> %s", obj.xref, stream, best_stream)
+				self._optimized(len(stream), len(best_stream))
+				obj.set_stream(best_stream)
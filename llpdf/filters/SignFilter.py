@@ -72,7 +72,7 @@ class SignFilter(PDFFilter):
 		objid = self._pdf.get_free_objid()
 		obj = PDFObject.create(objid = objid, gennum = 0, content = content)
 		if raw_stream is not None:
-			obj.set_stream(EncodedObject.create(raw_stream))
+			obj.set_stream(EncodedObject.create(raw_stream, compression = self.compression_policy.settings_for_object(content)))
 		self._pdf.replace_object(obj)
 		return PDFXRef(objid, 0)
 
@@ -168,7 +168,7 @@ class SignFilter(PDFFilter):
 		for (varname, replacement) in signform_vars.items():
 			key = ("${" + varname + "}").encode("ascii")
 			signform_data = signform_data.replace(key, replacement)
-		signform.set_stream(EncodedObject.create(signform_data, compress = True))
+		signform.set_stream(EncodedObject.create(signform_data, compress = True, compression = self.compression_policy.settings_for_object(signform.content)))
 		return signform_xref
 
 	def _generate_lock(self):
@@ -29,6 +29,7 @@ from .FlattenImageOptimization import FlattenImageOptimization
 from .RemoveMetadataFilter import RemoveMetadataFilter
 from .PDFAFilter import PDFAFilter
 from .DecompressFilter import DecompressFilter
+from .RecompressStreamsOptimization import RecompressStreamsOptimization
 from .AnalyzeFilter import AnalyzeFilter
 from .TagFilter import TagFilter
 from .EmbedPayloadFilter import EmbedPayloadFilter
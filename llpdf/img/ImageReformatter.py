@@ -30,9 +30,10 @@ from llpdf.EncodeDecode import EncodedObject, Filter
 class ImageReformatter(object):
 	_log = logging.getLogger("llpdf.img.ImageReformatter")
 
-	def __init__(self, lossless, scale_factor = 1, jpeg_quality = 85, force_one_bit_alpha = False):
+	def __init__(self, lossless, scale_factor = 1, jpeg_quality = 85, force_one_bit_alpha = False, compression = None):
 		assert(isinstance(lossless, bool))
 		self._lossless = lossless
+		self._compression = compression
 		self._scale_factor = scale_factor
 		self._jpeg_quality = jpeg_quality
 		self._force_one_bit_alpha = force_one_bit_alpha
@@ -48,13 +49,13 @@ class ImageReformatter(object):
 		return (width, height, colorspace, depth)
 
 	@classmethod
-	def _encode_image(cls, image_filename, lossless):
+	def _encode_image(cls, image_filename, lossless, compression = None):
 		if lossless:
 			img = PnmPicture.read_file(image_filename)
 			if img.img_format == PnmPictureFormat.Bitmap:
 				# PDFs use exactly inverted syntax for 1-bit images
 				img.invert()
-			imgdata = EncodedObject.create(img.data)
+			imgdata = EncodedObject.create(img.data, compression = compression)
 			(colorspace, bits_per_component) = {
 				PnmPictureFormat.Bitmap:		(PDFImageColorSpace.DeviceGray, 1),
 				PnmPictureFormat.Graymap:		(PDFImageColorSpace.DeviceGray, 8),
@@ -101,7 +102,7 @@ class ImageReformatter(object):
 			self._log.debug("Running command: %s", " ".join(conversion_cmd))
 			subprocess.check_call(conversion_cmd)
 
-			return self._encode_image(dst_img_file.name, lossless)
+			return self._encode_image(dst_img_file.name, lossless, compression = self._compression)
 
 	def reformat(self, image):
 		if (image.imgdata.lossless == self._lossless) and (self._scale_factor == 1):
@@ -22,7 +22,7 @@
 
 import logging
 import collections
-from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFName import NAME_XOBJECT, NAME_RESOURCES, NAME_BBOX, NAME_MATRIX, NAME_PATTERN
 from llpdf.types.PDFXRef import PDFXRef
 from llpdf.types.PDFObject import PDFObject
 from llpdf.types.TransformationMatrix import TransformationMatrix
@@ -44,7 +44,7 @@ class GraphicsInterpreter(object):
 		self._draw_callback = None
 
 		if (pdf_lookup is not None) and (page_obj is not None):
-			resources = self._page_obj.content[PDFName("/Resources")]
+			resources = self._page_obj.content[NAME_RESOURCES]
 			if isinstance(resources, PDFXRef):
 				resources = self._pdf_lookup.lookup(resources)
 			self._page_resources = resources
@@ -59,7 +59,7 @@ class GraphicsInterpreter(object):
 			content = self._page_resources.content
 		else:
 			content = self._page_resources
-		patterns = content.get(PDFName("/Pattern"))
+		patterns = content.get(NAME_PATTERN)
 		if patterns is None:
 			return
 
@@ -68,10 +68,10 @@ class GraphicsInterpreter(object):
 			return
 
 		pattern = self._pdf_lookup.lookup(pattern_xref)
-		pattern_bbox = pattern.content[PDFName("/BBox")]
-		pattern_matrix = TransformationMatrix(*pattern.content[PDFName("/Matrix")])
+		pattern_bbox = pattern.content[NAME_BBOX]
+		pattern_matrix = TransformationMatrix(*pattern.content[NAME_MATRIX])
 
-		pattern_resource_xrefs = list(pattern.content[PDFName("/Resources")][PDFName("/XObject")].values())
+		pattern_resource_xrefs = list(pattern.content[NAME_RESOURCES][NAME_XOBJECT].values())
 		if len(pattern_resource_xrefs) != 1:
 			return
 
@@ -118,7 +118,7 @@ class GraphicsInterpreter(object):
 					resources = self._page_resources.content
 				else:
 					resources = self._page_resources
-				xobjects = resources[PDFName("/XObject")]
+				xobjects = resources[NAME_XOBJECT]
 				image_xref = xobjects[image_handle]
 				image_obj = self._pdf_lookup.lookup(image_xref)
 
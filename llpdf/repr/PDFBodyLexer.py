@@ -0,0 +1,213 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import re
+import collections
+
+class PDFBodyLexer(object):
+	"""Finds the boundaries of indirect objects in the body of a PDF file. It
+	operates directly on the buffer backing a StreamRepr and recognizes the
+	object header and the matching "endobj" marker in one pass. When the length
+	of a stream is known, the stream data is skipped instead of searched for the
+	"endstream" marker. If the buffer is 'truncated', i.e., it may end before
+	the object does, a stream that reaches beyond it is not located at all."""
+	ObjectBoundary = collections.namedtuple("ObjectBoundary", [ "objid", "gennum", "offset", "data_begin", "data_end", "stream_begin", "stream_end", "end" ])
+
+	_WHITESPACE = rb"[\x00\t\n\x0c\r ]"
+	_SKIP = rb"(?:" + _WHITESPACE + rb"|%[^\r\n]*)*"
+	_OBJECT_HEADER_RE = re.compile(_SKIP + rb"(?P<objid>\d+)" + _WHITESPACE + rb"+(?P<gennum>\d+)" + _WHITESPACE + rb"+obj(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+	_KEYWORD = rb"(?:stream|endobj)(?<![^\x00\t\n\x0c\r ()<>\[\]{}]......)(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])"
+	_KEYWORD_RE = re.compile(_KEYWORD)
+	_CONTENT_TOKEN_RE = re.compile(rb"\(|%|<<|>>|<|" + _KEYWORD)
+	_LITERAL_STRING_TOKEN_RE = re.compile(rb"[()\\]")
+	_EOL_RE = re.compile(rb"[\r\n]")
+	_ANY_OBJECT_HEADER_RE = re.compile(rb"(?<![0-9])\d+" + _WHITESPACE + rb"+\d+" + _WHITESPACE + rb"+obj(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+	_NEXT_OBJECT_RE = re.compile(rb"[\r\n]" + _WHITESPACE + rb"*\d+" + _WHITESPACE + rb"+\d+" + _WHITESPACE + rb"+obj(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])")
+	_STREAM_EOL_RE = re.compile(rb"\r\n|[\r\n ]|")
+	_STREAM_END_RE = re.compile(_WHITESPACE + rb"*endstream" + _SKIP + rb"endobj")
+
+	def __init__(self, f, truncated = False):
+		self._f = f
+		self._truncated = truncated
+
+	def _skip_literal_string(self, offset, end):
+		"""Returns the offset after the literal string whose opening
+		parenthesis precedes the given offset, or None if it is not
+		terminated."""
+		depth = 1
+		while True:
+			token = self._f.search(self._LITERAL_STRING_TOKEN_RE, offset, end)
+			if token is None:
+				return None
+			offset = token.end()
+			if token.group(0) == b"\\":
+				offset += 1
+			elif token.group(0) == b"(":
+				depth += 1
+			else:
+				depth -= 1
+				if depth == 0:
+					return offset
+
+	def find_content_end(self, offset, end = None):
+		"""Returns the match of the "stream" or "endobj" keyword that ends the
+		object content starting at the given offset, or None. Strings, names
+		and comments are skipped and "stream" is only recognized after the
+		top-level dictionary has been closed."""
+		# Most objects contain neither strings nor comments; if the content
+		# before the first keyword only consists of balanced dictionaries,
+		# that keyword is the one
+		keyword = self._f.search(self._KEYWORD_RE, offset, end)
+		if keyword is None:
+			return None
+		content = bytes(self._f.view(offset, keyword.start()))
+		if (b"(" not in content) and (b"%" not in content) and (content.count(b"<") == 2 * content.count(b"<<") == content.count(b">") == 2 * content.count(b">>")):
+			return keyword
+
+		depth = 0
+		while True:
+			token = self._f.search(self._CONTENT_TOKEN_RE, offset, end)
+			if token is None:
+				return None
+			offset = token.end()
+			value = token.group(0)
+			if value == b"(":
+				offset = self._skip_literal_string(offset, end)
+			elif value == b"%":
+				eol = self._f.search(self._EOL_RE, offset, end)
+				offset = eol.end() if (eol is not None) else None
+			elif value == b"<":
+				# Continue after the closing ">" of the hex string
+				offset = self._f.find(b">", offset, end)
+				if offset != -1:
+					offset += 1
+			elif value == b"<<":
+				depth += 1
+			elif value == b">>":
+				depth = max(depth - 1, 0)
+			elif (value == b"endobj") or (depth == 0):
+				return token
+			if (offset is None) or (offset == -1):
+				return None
+
+	def _find_in_object(self, pattern, start):
+		"""Returns the offset of the pattern at or after the given offset, or
+		-1 if it is not found before the next object header begins."""
+		end = self._f.find(pattern, start)
+		if end == -1:
+			return -1
+		offset = start
+		while True:
+			# Object headers are rare in stream data; only check them where
+			# an "obj" keyword occurs
+			keyword = self._f.find(b"obj", offset, end)
+			if keyword == -1:
+				return end
+			header = self._f.search(self._NEXT_OBJECT_RE, max(start, keyword - 64), keyword + 4)
+			if (header is not None) and (header.end() == keyword + 3):
+				return -1
+			offset = keyword + 3
+
+	def _locate_stream(self, stream_begin, stream_length):
+		"""Returns the end offset of the stream data and the end offset of the
+		whole object, or None if there is no "endstream" marker."""
+		if stream_length is not None:
+			stream_end = stream_begin + stream_length
+			trailer = self._f.match(self._STREAM_END_RE, stream_end)
+			if trailer is not None:
+				return (stream_end, trailer.end())
+
+		# Length unknown or wrong, search for the end of the stream instead,
+		# but not beyond the beginning of the next object
+		stream_end = self._find_in_object(b"endstream", stream_begin)
+		if stream_end == -1:
+			return None
+		endobj = self._find_in_object(b"endobj", stream_end)
+		if endobj == -1:
+			return None
+		return (stream_end, endobj + len(b"endobj"))
+
+	def object_header(self, offset):
+		"""Returns the ObjId and GenNum of the object whose header starts at
+		the given offset, or None if there is no object header."""
+		header = self._f.match(self._OBJECT_HEADER_RE, offset)
+		if header is None:
+			return None
+		return (int(header.group("objid")), int(header.group("gennum")))
+
+	def find_object_header(self, start, end = None):
+		"""Returns the offset of the first object header at or after the given
+		offset, or -1 if there is none."""
+		header = self._f.search(self._ANY_OBJECT_HEADER_RE, start, end)
+		return -1 if (header is None) else header.start()
+
+	def peek_object(self, stream_length = None):
+		"""Returns the boundary of the object at the current position, or None
+		if no object starts there. Does not modify the current position.
+		'stream_length' may be a callable which is passed the offsets of the
+		object content that precedes a stream and that returns the stream
+		length, if it is known."""
+		header = self._f.match(self._OBJECT_HEADER_RE)
+		if header is None:
+			return None
+		(objid, gennum) = (int(header.group("objid")), int(header.group("gennum")))
+		data_begin = header.end()
+		content_end = self.find_content_end(data_begin)
+		if content_end is None:
+			return None
+
+		if content_end.group(0) == b"stream":
+			stream_begin = self._f.match(self._STREAM_EOL_RE, content_end.end()).end()
+			length = stream_length(data_begin, content_end.start()) if (stream_length is not None) else None
+			if self._truncated and (length is not None) and (stream_begin + length + 64 > len(self._f)):
+				# The stream may extend beyond the end of the buffer; searching
+				# for "endstream" could find a marker within the stream data
+				return None
+			stream_location = self._locate_stream(stream_begin, length)
+			if stream_location is not None:
+				(stream_end, end) = stream_location
+				return self.ObjectBoundary(objid = objid, gennum = gennum, offset = header.start("objid"), data_begin = data_begin, data_end = content_end.start(), stream_begin = stream_begin, stream_end = stream_end, end = end)
+
+			# Probably erroneous stream data ("stream" maybe in dict, but no
+			# "endstream")
+			data_end = self._find_in_object(b"endobj", content_end.end())
+			if data_end == -1:
+				return None
+		else:
+			data_end = content_end.start()
+
+		return self.ObjectBoundary(objid = objid, gennum = gennum, offset = header.start("objid"), data_begin = data_begin, data_end = data_end, stream_begin = None, stream_end = None, end = data_end + len(b"endobj"))
+
+	def next_object(self, stream_length = None):
+		"""Returns the boundary of the object at the current position and
+		positions the stream right after its "endobj" marker."""
+		boundary = self.peek_object(stream_length)
+		if boundary is not None:
+			self._f.seek(boundary.end)
+		return boundary
+
+	def __iter__(self):
+		while True:
+			boundary = self.next_object()
+			if boundary is None:
+				break
+			yield boundary
@@ -0,0 +1,169 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import re
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFXRef import PDFXRef
+
+class UnsupportedSyntaxException(Exception):
+	pass
+
+class PDFObjectParser(object):
+	"""Recursive-descent parser for PDF object syntax. It produces the same
+	results as the TPG grammar in PDFParser, but raises
+	UnsupportedSyntaxException for any input that it does not handle
+	identically so that the caller can defer to the grammar."""
+	_SKIP = r"(?:\s+|%[^\n]*)*"
+	_TOKEN_RE = re.compile(_SKIP + "(?:" + "|".join([
+		r"(?P<float>-?\d*\.\d+)",
+		r"(?P<xref>(-?\d+)\s+(-?\d+)\s+R)",
+		r"(?P<integer>-?\d+)",
+		r"(?P<name>/[^\s/<>\[\]()]*)",
+		r"(?P<start_dict><<)",
+		r"(?P<end_dict>>>)",
+		r"(?P<hexstring><[ \n\ra-fA-F0-9]*>)",
+		r"(?P<start_array>\[)",
+		r"(?P<end_array>\])",
+		r"(?P<start_string>\()",
+		r"(?P<bool>[Tt]rue|[Ff]alse)",
+		r"(?P<null>null)",
+	]) + ")")
+	_END_RE = re.compile(_SKIP + r"\Z")
+	_STRING_SPECIAL_RE = re.compile(r"[\\()]")
+	_OCTAL_RE = re.compile(r"[0-7]{1,3}")
+	_ESCAPE_CHARS = {
+		"r":	b"\r",
+		"n":	b"\n",
+		"t":	b"\t",
+		"(":	b"(",
+		")":	b")",
+		"\\":	b"\\",
+	}
+
+	def __init__(self, text):
+		self._text = text
+		self._pos = 0
+
+	def _next_token(self):
+		token = self._TOKEN_RE.match(self._text, self._pos)
+		if token is None:
+			raise UnsupportedSyntaxException("No token recognized at offset %d." % (self._pos))
+		self._pos = token.end()
+		return token
+
+	def _parse_dict(self):
+		result = { }
+		while True:
+			token = self._next_token()
+			if token.lastgroup == "end_dict":
+				return result
+			elif token.lastgroup == "name":
+				key = PDFName(token.group("name"))
+				result[key] = self._parse_value(self._next_token())
+			else:
+				raise UnsupportedSyntaxException("Expected name or end of dictionary at offset %d." % (token.start(token.lastgroup)))
+
+	def _parse_array(self):
+		result = [ ]
+		while True:
+			token = self._next_token()
+			if token.lastgroup == "end_array":
+				return result
+			result.append(self._parse_value(token))
+
+	def _encode(self, text):
+		try:
+			return text.encode("latin1")
+		except UnicodeEncodeError:
+			raise UnsupportedSyntaxException("String contains characters outside of latin1.")
+
+	def _parse_string(self):
+		text = self._text
+		result = bytearray()
+		depth = 1
+		while True:
+			special = self._STRING_SPECIAL_RE.search(text, self._pos)
+			if special is None:
+				raise UnsupportedSyntaxException("Unterminated string.")
+			result += self._encode(text[self._pos : special.start()])
+			char = special.group(0)
+			self._pos = special.end()
+			if char == "(":
+				depth += 1
+				result += b"("
+			elif char == ")":
+				depth -= 1
+				if depth == 0:
+					return result
+				result += b")"
+			else:
+				octal = self._OCTAL_RE.match(text, self._pos)
+				if octal is not None:
+					value = int(octal.group(0), 8)
+					if value > 255:
+						raise UnsupportedSyntaxException("Octal escape out of range.")
+					result.append(value)
+					self._pos = octal.end()
+				else:
+					escaped = self._ESCAPE_CHARS.get(text[self._pos : self._pos + 1])
+					if escaped is None:
+						raise UnsupportedSyntaxException("Unsupported escape sequence in string.")
+					result += escaped
+					self._pos += 1
+
+	def _parse_value(self, token):
+		kind = token.lastgroup
+		if kind == "name":
+			return PDFName(token.group("name"))
+		elif kind == "integer":
+			return int(token.group("integer"))
+		elif kind == "xref":
+			return PDFXRef(int(token.group(3)), int(token.group(4)))
+		elif kind == "start_dict":
+			return self._parse_dict()
+		elif kind == "start_array":
+			return self._parse_array()
+		elif kind == "float":
+			return float(token.group("float"))
+		elif kind == "start_string":
+			return self._parse_string()
+		elif kind == "hexstring":
+			hexdata = token.group("hexstring")[1 : -1].replace("\r", "").replace("\n", "").replace(" ", "")
+			if (len(hexdata) % 2) != 0:
+				raise UnsupportedSyntaxException("Hex string with odd number of digits.")
+			return bytes.fromhex(hexdata)
+		elif kind == "bool":
+			return token.group("bool").lower() == "true"
+		elif kind == "null":
+			return None
+		else:
+			raise UnsupportedSyntaxException("Unexpected %s token at offset %d." % (kind, token.start(kind)))
+
+	def parse_expression(self):
+		result = self._parse_value(self._next_token())
+		if self._END_RE.match(self._text, self._pos) is None:
+			raise UnsupportedSyntaxException("Trailing data after expression at offset %d." % (self._pos))
+		return result
+
+	@classmethod
+	def parse(cls, text):
+		return cls(text).parse_expression()
@@ -23,6 +23,7 @@
 
 from . import tpg
 from . import ParseTools
+from .PDFObjectParser import PDFObjectParser, UnsupportedSyntaxException
 from llpdf.types.PDFName import PDFName
 from llpdf.types.PDFXRef import PDFXRef
 
@@ -110,9 +111,16 @@ class PDFParser(tpg.VerboseParser):
 	verbose = 0
 
 
-def parse(text):
+def parse_tpg(text):
 	return ParseTools.parse_using(text, PDFParser)
 
+def parse(text):
+	try:
+		return PDFObjectParser.parse(text)
+	except UnsupportedSyntaxException:
+		# Let the grammar either handle the input or report the error
+		return parse_tpg(text)
+
 if __name__ == "__main__":
 	with open("parse_test.txt") as f:
 		text = f.read()
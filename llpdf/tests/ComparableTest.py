@@ -0,0 +1,55 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import pickle
+import unittest
+from llpdf.types.PDFXRef import PDFXRef
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFString import PDFString
+from llpdf.types.PDFObject import PDFObject
+
+class ComparableTest(unittest.TestCase):
+	def test_xref(self):
+		self.assertEqual(PDFXRef(1, 0), PDFXRef(1, 0))
+		self.assertNotEqual(PDFXRef(1, 0), PDFXRef(1, 1))
+		self.assertNotEqual(PDFXRef(1, 0), (1, 0))
+		self.assertEqual(set([ PDFXRef(1, 0), PDFXRef(1, 0), PDFXRef(2, 0) ]), set([ PDFXRef(2, 0), PDFXRef(1, 0) ]))
+		self.assertEqual(sorted([ PDFXRef(2, 0), PDFXRef(1, 5), PDFXRef(1, 0) ]), [ PDFXRef(1, 0), PDFXRef(1, 5), PDFXRef(2, 0) ])
+		self.assertEqual(pickle.loads(pickle.dumps(PDFXRef(3, 1))), PDFXRef(3, 1))
+
+	def test_string(self):
+		self.assertEqual(PDFString("foo"), PDFString("foo"))
+		self.assertNotEqual(PDFString("foo"), "foo")
+		self.assertEqual(len(set([ PDFString("foo"), PDFString("foo") ])), 1)
+		self.assertEqual(bytes(pickle.loads(pickle.dumps(PDFString("€")))), bytes(PDFString("€")))
+
+	def test_object(self):
+		obj1 = PDFObject.create(1, 0, { })
+		obj2 = PDFObject.create(1, 0, { PDFName("/Foo"): 1 })
+		self.assertEqual(obj1, obj2)
+		self.assertNotEqual(obj1, PDFObject.create(2, 0, { }))
+		self.assertNotEqual(obj1, obj1.xref)
+		self.assertEqual(len(set([ obj1, obj2 ])), 1)
+
+	def test_mixed_types(self):
+		self.assertNotEqual(PDFXRef(1, 0), PDFName("/Foo"))
+		self.assertLess(PDFName("/Foo"), PDFXRef(1, 0))
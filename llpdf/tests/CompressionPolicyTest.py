@@ -0,0 +1,71 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+import zlib
+import unittest
+from llpdf.CompressionPolicy import CompressionPolicy, CompressionSettings, CompressionBackend, StreamKind
+from llpdf.EncodeDecode import EncodedObject
+from llpdf.types.PDFName import PDFName
+
+class CompressionPolicyTest(unittest.TestCase):
+	_DATA = b"".join(b"%d 0 0 %d re f\n" % (i, i * i) for i in range(2000))
+
+	def test_settings_roundtrip(self):
+		for settings in [ CompressionSettings(), CompressionSettings.fast(), CompressionSettings.maximum(), CompressionSettings(level = 0), CompressionSettings(strategy = zlib.Z_HUFFMAN_ONLY), CompressionSettings(window_bits = 9, memory_level = 1), CompressionSettings(backend = CompressionBackend.Exhaustive) ]:
+			self.assertEqual(zlib.decompress(settings.compress(self._DATA)), self._DATA)
+			compressor = settings.compressobj()
+			self.assertEqual(zlib.decompress(compressor.compress(self._DATA) + compressor.flush()), self._DATA)
+
+	def test_exhaustive_smallest(self):
+		exhaustive = CompressionSettings(backend = CompressionBackend.Exhaustive).compress(self._DATA)
+		for settings in [ CompressionSettings(), CompressionSettings.fast(), CompressionSettings.maximum() ]:
+			self.assertLessEqual(len(exhaustive), len(settings.compress(self._DATA)))
+
+	def test_create(self):
+		fast = EncodedObject.create(self._DATA, compression = CompressionSettings.fast())
+		maximum = EncodedObject.create(self._DATA, compression = CompressionSettings.maximum())
+		self.assertEqual(fast.decode(), self._DATA)
+		self.assertEqual(maximum.decode(), self._DATA)
+		self.assertLess(len(maximum.encoded_data), len(fast.encoded_data))
+		self.assertEqual(EncodedObject.create(self._DATA).encoded_data, zlib.compress(self._DATA))
+		streamed = EncodedObject.create_streaming([ self._DATA[:1000], self._DATA[1000:] ], compression = CompressionSettings.maximum())
+		self.assertEqual(streamed.decode(), self._DATA)
+
+	def test_classify(self):
+		self.assertEqual(StreamKind.classify({ PDFName("/Length"): 123 }), StreamKind.ContentStream)
+		self.assertEqual(StreamKind.classify({ PDFName("/Type"): PDFName("/XObject"), PDFName("/Subtype"): PDFName("/Form") }), StreamKind.ContentStream)
+		self.assertEqual(StreamKind.classify({ PDFName("/Type"): PDFName("/XObject"), PDFName("/Subtype"): PDFName("/Image") }), StreamKind.Image)
+		self.assertEqual(StreamKind.classify({ PDFName("/Length1"): 1234 }), StreamKind.Font)
+		self.assertEqual(StreamKind.classify({ PDFName("/Subtype"): PDFName("/Type1C") }), StreamKind.Font)
+		self.assertEqual(StreamKind.classify({ PDFName("/N"): 3, PDFName("/Alternate"): PDFName("/DeviceRGB") }), StreamKind.ICCProfile)
+		self.assertEqual(StreamKind.classify({ PDFName("/Type"): PDFName("/Metadata"), PDFName("/Subtype"): PDFName("/XML") }), StreamKind.Metadata)
+		self.assertEqual(StreamKind.classify({ PDFName("/Type"): PDFName("/ObjStm"), PDFName("/N"): 100 }), StreamKind.ObjectStream)
+		self.assertEqual(StreamKind.classify({ PDFName("/Type"): PDFName("/XRef") }), StreamKind.XRefStream)
+		self.assertEqual(StreamKind.classify({ PDFName("/FunctionType"): 4 }), StreamKind.Other)
+		self.assertEqual(StreamKind.classify(None), StreamKind.Other)
+
+	def test_policy(self):
+		policy = CompressionPolicy.balanced()
+		self.assertEqual(policy.settings_for(StreamKind.ContentStream).level, 1)
+		self.assertEqual(policy.settings_for(StreamKind.Font).level, 9)
+		self.assertIs(policy.settings_for(StreamKind.Image), policy.default)
+		policy.set_settings(StreamKind.Image, CompressionSettings.maximum())
+		self.assertEqual(policy.settings_for_object({ PDFName("/Subtype"): PDFName("/Image") }).level, 9)
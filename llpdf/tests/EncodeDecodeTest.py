@@ -24,6 +24,11 @@ import zlib
 import base64
 import unittest
 from llpdf.EncodeDecode import EncodedObject, Filter, Predictor
+from llpdf.PNGPrediction import PNGPrediction, PNGPredictor
+from llpdf.types.PDFObject import PDFObject
+from llpdf.tools.LRUCache import LRUCache
+from llpdf.StreamCodecs import ASCIIHexCodec, ASCII85Codec
+from llpdf.types.PDFName import PDFName
 
 class EncodeDecodeTest(unittest.TestCase):
 	def setUp(self):
@@ -179,3 +184,172 @@ class EncodeDecodeTest(unittest.TestCase):
 			Z7Ah2fmL3VnUfwd/E9cGGTJf/DtLNz+73O5zQLPeK+92Y+QCGyYdf3m79/lmAOkKSOw="""))
 		pixel_data = self._data["prng"]
 		self._test_png_predictors(columns, encoded_data, pixel_data)
+
+	def test_decoded_stream_cache(self):
+		cache = LRUCache(max_size = 1024)
+		self.addCleanup(setattr, PDFObject, "decoded_stream_cache", PDFObject.decoded_stream_cache)
+		PDFObject.decoded_stream_cache = cache
+		obj = PDFObject.create(1, 0, { }, stream = EncodedObject.create(b"foo" * 10))
+		self.assertEqual(obj.stream.decode(), b"foo" * 10)
+		self.assertEqual(obj.stream.decode(), b"foo" * 10)
+		self.assertEqual((cache.hits, cache.misses, len(cache)), (1, 1, 1))
+
+		obj.set_stream(EncodedObject.create(b"bar", compress = False))
+		self.assertEqual(len(cache), 0)
+		self.assertEqual(obj.stream.decode(), b"bar")
+
+		other = PDFObject.create(2, 0, { }, stream = EncodedObject.create(bytes(2048)))
+		self.assertEqual(other.stream.decode(), bytes(2048))
+		self.assertEqual(len(cache), 1)
+
+		# Filter parameters changed in place
+		hexobj = PDFObject.create(3, 0, { }, stream = EncodedObject.create(b"616263", compress = False))
+		self.assertEqual(hexobj.stream.decode(), b"616263")
+		hexobj.content[PDFName("/Filter")] = PDFName("/ASCIIHexDecode")
+		self.assertEqual(hexobj.stream.decode(), b"abc")
+		self.assertEqual(len(cache), 2)
+
+		# Same type whether cached or not
+		self.assertIs(type(EncodedObject.create(b"foo", compress = False).decode()), bytes)
+		self.assertIs(type(EncodedObject.create(b"foo" * 10).decode()), bytes)
+		self.assertIs(type(hexobj.stream.decode()), bytes)
+
+	@staticmethod
+	def _png_predict(pixel_data, row_length, bpp, png_predictors):
+		"""Straightforward PNG predictor encoder to test decoding against."""
+		result = bytearray()
+		previous_row = bytes(row_length)
+		for (row_index, png_predictor) in enumerate(png_predictors):
+			row = pixel_data[row_index * row_length : (row_index + 1) * row_length]
+			result.append(png_predictor)
+			for (index, value) in enumerate(row):
+				left = row[index - bpp] if (index >= bpp) else 0
+				above = previous_row[index]
+				upper_left = previous_row[index - bpp] if (index >= bpp) else 0
+				if png_predictor == PNGPredictor.No:
+					prediction = 0
+				elif png_predictor == PNGPredictor.Sub:
+					prediction = left
+				elif png_predictor == PNGPredictor.Up:
+					prediction = above
+				elif png_predictor == PNGPredictor.Average:
+					prediction = (left + above) // 2
+				else:
+					prediction = EncodeDecodeTest._paeth(left, above, upper_left)
+				result.append((value - prediction) & 0xff)
+			previous_row = row
+		return result
+
+	@staticmethod
+	def _paeth(a, b, c):
+		p = a + b - c
+		(pa, pb, pc) = (abs(p - a), abs(p - b), abs(p - c))
+		if (pa <= pb) and (pa <= pc):
+			return a
+		elif pb <= pc:
+			return b
+		return c
+
+	def test_png_predictors_bytes_per_pixel(self):
+		pixel_data = bytes(self._data["prng"] * 3)
+		for (colors, bits_per_component, columns) in [ (3, 8, 13), (4, 8, 6), (1, 16, 19), (3, 16, 3), (1, 1, 99) ]:
+			obj = EncodedObject(b"", Filter.Uncompressed, columns = columns, predictor = Predictor.PNGPredictionOptimum, colors = colors, bits_per_component = bits_per_component)
+			row_count = len(pixel_data) // obj.row_length
+			image_data = pixel_data[ : row_count * obj.row_length]
+			png_predictors = [ PNGPredictor((row * 7) % 5 if (row % 3) else 2) for row in range(row_count) ]
+			encoded_data = self._png_predict(image_data, obj.row_length, obj.bytes_per_pixel, png_predictors)
+			prediction = PNGPrediction(obj.row_length, obj.bytes_per_pixel)
+			self.assertEqual(prediction.depredict(encoded_data, use_numpy = False), image_data)
+			self.assertEqual(prediction.depredict(encoded_data), image_data)
+			self.assertEqual(EncodedObject(encoded_data, Filter.Uncompressed, columns = columns, predictor = Predictor.PNGPredictionOptimum, colors = colors, bits_per_component = bits_per_component).decode(), image_data)
+
+			# Truncated last row
+			self.assertEqual(prediction.depredict(encoded_data[ : -5], use_numpy = False), image_data[ : -5])
+			self.assertEqual(prediction.depredict(encoded_data[ : -5]), image_data[ : -5])
+
+	def test_png_predictors_decode_parms(self):
+		obj = PDFObject.create(1, 0, { }, stream = EncodedObject(b"", Filter.Uncompressed, columns = 5, predictor = Predictor.PNGPredictionUp, colors = 3, bits_per_component = 16))
+		encoded_object = EncodedObject.from_object(obj)
+		self.assertEqual((encoded_object.columns, encoded_object.colors, encoded_object.bits_per_component), (5, 3, 16))
+		self.assertEqual((encoded_object.row_length, encoded_object.bytes_per_pixel), (30, 6))
+
+	def test_png_predictors_encode(self):
+		pixel_data = bytes(self._data["prng"] * 3)
+		for (row_length, bpp) in [ (13, 1), (12, 3), (11, 2), (4, 4) ]:
+			image_data = pixel_data[ : (len(pixel_data) // row_length) * row_length]
+			row_count = len(image_data) // row_length
+			prediction = PNGPrediction(row_length, bpp)
+			for png_predictor in PNGPredictor:
+				encoded_data = self._png_predict(image_data, row_length, bpp, [ png_predictor ] * row_count)
+				self.assertEqual(prediction.predict(image_data, png_predictor = png_predictor, use_numpy = False), encoded_data)
+				self.assertEqual(prediction.predict(image_data, png_predictor = png_predictor), encoded_data)
+			self.assertEqual(prediction.predict(image_data, use_numpy = False), prediction.predict(image_data))
+			self.assertEqual(prediction.depredict(prediction.predict(image_data)), image_data)
+
+	def test_create_predicted(self):
+		image_data = bytes((x + y + (x * y) // 7) & 0xff for y in range(20) for x in range(30))
+		obj = EncodedObject.create(image_data, predict = True, columns = 10, colors = 3)
+		self.assertEqual((obj.columns, obj.colors, obj.bits_per_component), (10, 3, 8))
+		self.assertEqual(obj.decode(), image_data)
+		self.assertEqual(EncodedObject.create(image_data, predict = True).decode(), image_data)
+
+		# Predictors need a filter that supports them
+		for kwargs in [ { "compress": False }, { "filtering": Filter.RunLengthDecode } ]:
+			obj = EncodedObject.create(image_data, predict = True, columns = 10, colors = 3, **kwargs)
+			self.assertEqual(obj.predictor, Predictor.NoPredictor)
+			self.assertNotIn(PDFName("/DecodeParms"), obj.meta_dict)
+			self.assertEqual(obj.decode(), image_data)
+
+	def test_iter_decode(self):
+		image_data = bytes((x + y + (x * y) // 7) & 0xff for y in range(50) for x in range(30))
+		for compress in [ False, True ]:
+			for predict in [ False, True ]:
+				obj = EncodedObject.create(image_data, compress = compress, predict = predict, columns = 10, colors = 3)
+				for chunk_size in [ 1, 7, 30, 100, 10000 ]:
+					chunks = list(obj.iter_decode(chunk_size))
+					self.assertEqual(b"".join(chunks), image_data)
+					if predict and compress:
+						self.assertTrue(all(len(chunk) % 30 == 0 for chunk in chunks))
+
+		obj = EncodedObject(zlib.compress(image_data)[ : -20], Filter.FlateDecode)
+		with self.assertRaises(zlib.error):
+			list(obj.iter_decode(100))
+
+	def test_create_streaming(self):
+		image_data = bytes((x + y + (x * y) // 7) & 0xff for y in range(50) for x in range(30))
+		chunks = [ image_data[offset : offset + 47] for offset in range(0, len(image_data), 47) ]
+		for compress in [ False, True ]:
+			obj = EncodedObject.create_streaming(iter(chunks), compress = compress)
+			self.assertEqual(obj.decode(), image_data)
+			self.assertEqual(obj.predictor, Predictor.NoPredictor)
+
+			obj = EncodedObject.create_streaming(iter(chunks), compress = compress, predict = True, columns = 10, colors = 3)
+			self.assertEqual(obj.predictor, Predictor.PNGPredictionOptimum if compress else Predictor.NoPredictor)
+			self.assertEqual(obj.decode(), image_data)
+			self.assertEqual(b"".join(obj.iter_decode(64)), image_data)
+
+	def test_filter_chain(self):
+		data = bytes(self._data["prng"] * 5)
+		predicted = EncodedObject.create(data, predict = True, columns = 13, filtering = Filter.LZWDecode)
+		for (pdf_filter, encoded_data) in [ (PDFName("/ASCIIHexDecode"), ASCIIHexCodec.encode(predicted.encoded_data)), (PDFName("/ASCII85Decode"), ASCII85Codec.encode(predicted.encoded_data)) ]:
+			content = { PDFName("/Filter"): [ pdf_filter, PDFName("/LZWDecode") ], PDFName("/DecodeParms"): [ None, predicted.decode_parms ] }
+			obj = PDFObject.create(1, 0, content)
+			obj.set_raw_stream(encoded_data)
+			encoded_object = EncodedObject.from_object(obj)
+			self.assertEqual(encoded_object.filter_chain, [ EncodedObject._REV_FILTER_MAP[pdf_filter], Filter.LZWDecode ])
+			self.assertEqual(encoded_object.decode(), data)
+			self.assertEqual(b"".join(encoded_object.iter_decode(100)), data)
+			meta_dict = encoded_object.meta_dict
+			self.assertEqual((meta_dict[PDFName("/Filter")], meta_dict[PDFName("/DecodeParms")]), (content[PDFName("/Filter")], content[PDFName("/DecodeParms")]))
+
+		obj = PDFObject.create(1, 0, { PDFName("/Filter"): [ PDFName("/ASCII85Decode"), PDFName("/FlateDecode") ] })
+		obj.set_raw_stream(ASCII85Codec.encode(zlib.compress(data)))
+		self.assertEqual(EncodedObject.from_object(obj).decode(), data)
+		self.assertNotIn(PDFName("/DecodeParms"), EncodedObject.from_object(obj).meta_dict)
+		self.assertEqual(b"".join(EncodedObject.from_object(obj).iter_decode(100)), data)
+
+	def test_create_filters(self):
+		data = bytes(self._data["linear"] * 3) + bytes(495)
+		for filtering in [ Filter.FlateDecode, Filter.RunLengthDecode, Filter.ASCIIHexDecode, Filter.ASCII85Decode, Filter.LZWDecode ]:
+			self.assertEqual(EncodedObject.create(data, filtering = filtering).decode(), data)
+			self.assertEqual(EncodedObject.create(data, filtering = filtering, predict = True, columns = 11).decode(), data)
@@ -0,0 +1,66 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+
+import unittest
+from llpdf.tools.LRUCache import LRUCache
+
+class LRUCacheTest(unittest.TestCase):
+	def test_eviction(self):
+		cache = LRUCache(2)
+		cache["a"] = 1
+		cache["b"] = 2
+		self.assertEqual(cache.get("a"), 1)
+		cache["c"] = 3
+		self.assertNotIn("b", cache)
+		self.assertEqual(cache["a"], 1)
+		self.assertEqual(cache["c"], 3)
+		self.assertEqual(len(cache), 2)
+		self.assertIsNone(cache.get("b"))
+		with self.assertRaises(KeyError):
+			cache["b"]
+
+	def test_size_limit(self):
+		cache = LRUCache(max_size = 10)
+		cache["a"] = b"1234"
+		cache["b"] = b"5678"
+		self.assertEqual(cache.size, 8)
+		cache.get("a")
+		cache["c"] = b"90"
+		self.assertEqual(cache.size, 10)
+		cache["d"] = b"x"
+		self.assertNotIn("b", cache)
+		self.assertEqual(cache.size, 7)
+		cache["e"] = bytes(11)
+		self.assertNotIn("e", cache)
+		cache["a"] = b"1"
+		self.assertEqual(cache.size, 4)
+		self.assertEqual(cache.pop("a"), b"1")
+		self.assertEqual(cache.size, 3)
+
+	def test_counters(self):
+		cache = LRUCache(2)
+		cache["a"] = 1
+		cache.get("a")
+		cache.get("b")
+		self.assertIn("a", cache)
+		self.assertEqual((cache.hits, cache.misses), (1, 1))
@@ -0,0 +1,87 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import unittest
+from llpdf.FileRepr import StreamRepr
+from llpdf.repr.PDFBodyLexer import PDFBodyLexer
+
+class PDFBodyLexerTest(unittest.TestCase):
+	def test_boundaries(self):
+		data = b"1 0 obj\n<< /Foo /Bar >>\nendobj\n  % comment\r\n12 3 obj<</Length 3>>stream\nabc\nendstream endobj\nxref"
+		f = StreamRepr(data)
+		boundaries = list(PDFBodyLexer(f))
+		self.assertEqual([ (boundary.objid, boundary.gennum) for boundary in boundaries ], [ (1, 0), (12, 3) ])
+		self.assertEqual(data[boundaries[0].data_begin : boundaries[0].data_end], b"\n<< /Foo /Bar >>\n")
+		self.assertEqual(data[boundaries[1].offset : boundaries[1].end], b"12 3 obj<</Length 3>>stream\nabc\nendstream endobj")
+		self.assertEqual(f.tell(), boundaries[1].end)
+
+	def test_stream_length(self):
+		data = b"1 0 obj<</Length 20>>stream\r\nfoo endstream endobj\nendstream\nendobj"
+		boundary = PDFBodyLexer(StreamRepr(data)).next_object(lambda data_begin, data_end: 20)
+		self.assertEqual(data[boundary.stream_begin : boundary.stream_end], b"foo endstream endobj")
+		self.assertEqual(boundary.end, len(data))
+
+		# Without (or with a wrong) length the first marker terminates the stream
+		for stream_length in [ None, lambda data_begin, data_end: 5 ]:
+			boundary = PDFBodyLexer(StreamRepr(data)).next_object(stream_length)
+			self.assertEqual(data[boundary.stream_begin : boundary.stream_end], b"foo ")
+
+	def test_stream_keyword_in_content(self):
+		data = b"1 0 obj\n<< /Title (a livestream \\) (endobj\\\\) (stream)) /N /stream /H <73747265616d> % stream\n /A [ (stream) ] >>\nendobj\n2 0 obj<</Length 3 /S (x stream endobj)>>\nstream\nabc\nendstream\nendobj\n"
+		boundaries = list(PDFBodyLexer(StreamRepr(data)))
+		self.assertEqual([ (boundary.objid, boundary.gennum) for boundary in boundaries ], [ (1, 0), (2, 0) ])
+		self.assertIsNone(boundaries[0].stream_begin)
+		self.assertTrue(data[boundaries[0].data_begin : boundaries[0].data_end].endswith(b"/A [ (stream) ] >>\n"))
+		self.assertEqual(data[boundaries[1].stream_begin : boundaries[1].stream_end], b"abc\n")
+
+	def test_hex_strings(self):
+		data = b"1 0 obj\n<< /A << /B <ab>>> /C <> /D [ <0d0a> ] >>\nstream\nabc\nendstream\nendobj\n2 0 obj <6162>endobj\n"
+		boundaries = list(PDFBodyLexer(StreamRepr(data)))
+		self.assertEqual([ boundary.objid for boundary in boundaries ], [ 1, 2 ])
+		self.assertEqual(data[boundaries[0].stream_begin : boundaries[0].stream_end], b"abc\n")
+		self.assertEqual(data[boundaries[1].data_begin : boundaries[1].data_end], b" <6162>")
+
+	def test_missing_endstream(self):
+		data = b"1 0 obj<<>>stream\nabc\nendobj\n2 0 obj<</Length 3>>stream\nxyz\nendstream\nendobj\n"
+		boundaries = list(PDFBodyLexer(StreamRepr(data)))
+		self.assertEqual([ boundary.objid for boundary in boundaries ], [ 1, 2 ])
+		self.assertIsNone(boundaries[0].stream_begin)
+		self.assertEqual(data[boundaries[1].stream_begin : boundaries[1].stream_end], b"xyz\n")
+
+	def test_no_object(self):
+		f = StreamRepr(b"\nxref\n0 1\n")
+		self.assertIsNone(PDFBodyLexer(f).next_object())
+		self.assertEqual(f.tell(), 0)
+		self.assertIsNone(PDFBodyLexer(StreamRepr(b"1 0 object")).next_object())
+		self.assertIsNone(PDFBodyLexer(StreamRepr(b"1 0 obj << >>")).next_object())
+
+	def test_tokens(self):
+		f = StreamRepr(b"  foo\r\nbar\t\tmoo")
+		self.assertEqual(f.read_next_token(), b"foo")
+		self.assertEqual(f.read_next_token(), b"bar")
+		self.assertIsNone(f.read_next_token())
+
+		f = StreamRepr(b"foo\r\nbar\rmoo")
+		self.assertEqual(f.readline(), b"foo")
+		self.assertEqual(f.readline(), b"bar")
+		self.assertEqual(f.read_next_token(accept_eof = True), b"moo")
+		self.assertTrue(f.at_eof)
@@ -0,0 +1,58 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import gc
+import copy
+import pickle
+import unittest
+from llpdf.types.PDFName import PDFName, NAME_TYPE
+
+class PDFNameTest(unittest.TestCase):
+	def test_interned(self):
+		self.assertIs(PDFName("/Type"), NAME_TYPE)
+		self.assertIs(PDFName("/Foo"), PDFName("/Foo"))
+		self.assertIs(copy.deepcopy({ PDFName("/Foo"): 1 }).popitem()[0], PDFName("/Foo"))
+		self.assertIs(pickle.loads(pickle.dumps(PDFName("/Foo"))), PDFName("/Foo"))
+
+	def test_interned_weakly(self):
+		name = PDFName("/NameThatIsOnlyUsedHere")
+		self.assertIn("/NameThatIsOnlyUsedHere", PDFName._INTERNED)
+		del name
+		gc.collect()
+		self.assertNotIn("/NameThatIsOnlyUsedHere", PDFName._INTERNED)
+
+	def test_escaped(self):
+		name = PDFName("/Adobe#20Green")
+		self.assertEqual(name.display_name, "/Adobe Green")
+		self.assertEqual(name.value, "/Adobe#20Green")
+		self.assertEqual(pickle.loads(pickle.dumps(name)), name)
+		self.assertEqual(PDFName("/A#42"), PDFName("/AB"))
+		self.assertEqual(hash(PDFName("/A#42")), hash(PDFName("/AB")))
+		self.assertEqual(PDFName("/A#2342").display_name, "/A#42")
+		self.assertNotEqual(PDFName("/A#2342"), PDFName("/A#42"))
+
+	def test_compare(self):
+		self.assertNotEqual(PDFName("/Foo"), "/Foo")
+		self.assertLess(PDFName("/A"), PDFName("/B"))
+		self.assertEqual(sorted([ PDFName("/B"), PDFName("/A") ]), [ PDFName("/A"), PDFName("/B") ])
+		with self.assertRaises(AttributeError):
+			PDFName("/Foo").bar = 1
@@ -0,0 +1,52 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import unittest
+from llpdf.repr import PDFParser
+from llpdf.repr.PDFObjectParser import PDFObjectParser, UnsupportedSyntaxException
+from llpdf.types.PDFXRef import PDFXRef
+
+class PDFObjectParserTest(unittest.TestCase):
+	def test_same_as_grammar(self):
+		for text in [
+				"<< /Type /Page /Parent 3 0 R /MediaBox [ 0 0 595.276 841.89 ] /Rotate -90 >>",
+				"[ 1 2 3 R /Foo#20Bar true False null <ab cd> <> .5 ]",
+				"<< /S (Foo (nested\\)) \\101\\0 \\n\\t\\\\ ) /Empty () >>",
+				"<< /A<</B[1 0 R]>>/C/D >>  % trailing comment",
+				"(\xe4\xff)",
+			]:
+			self.assertEqual(PDFObjectParser.parse(text), PDFParser.parse_tpg(text))
+
+	def test_types(self):
+		self.assertIsInstance(PDFObjectParser.parse("(Foo)"), bytearray)
+		self.assertIsInstance(PDFObjectParser.parse("<41>"), bytes)
+		self.assertEqual(PDFObjectParser.parse("[ 1 2 3 R -4 ]"), [ 1, PDFXRef(2, 3), -4 ])
+		self.assertEqual(PDFObjectParser.parse("( \xa0Foo)"), b" \xa0Foo")
+
+	def test_unsupported(self):
+		for text in [ "", "<< >> junk", "(unterminated", "(\\b)", "(\\777)", "<abc>", "<< 1 2 >>" ]:
+			with self.assertRaises(UnsupportedSyntaxException):
+				PDFObjectParser.parse(text)
+
+	def test_fallback(self):
+		with self.assertRaisesRegex(Exception, "Unknown escape character sequence"):
+			PDFParser.parse("(\\b)")
@@ -0,0 +1,544 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import os
+import json
+import hashlib
+import tempfile
+import unittest
+import unittest.mock
+from llpdf.PDFDocument import PDFDocument
+from llpdf.PDFReader import PDFReader
+from llpdf.PDFWriter import PDFWriter
+from llpdf.ParseIndexCache import ParseIndexCache
+from llpdf.EncodeDecode import EncodedObject
+from llpdf.FileRepr import StreamRepr
+from llpdf.CompressionPolicy import CompressionPolicy, CompressionSettings, CompressionBackend, StreamKind
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFXRef import PDFXRef
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.MarkerObject import MarkerObject
+from llpdf.Exceptions import MalformedPDFException
+
+class PDFReaderTest(unittest.TestCase):
+	def setUp(self):
+		self._tempdir = tempfile.TemporaryDirectory()
+
+	def tearDown(self):
+		self._tempdir.cleanup()
+
+	@staticmethod
+	def _build_classic_pdf(revisions):
+		"""Builds a PDF with classic XRef tables from a list of revisions,
+		each of which is a dictionary mapping ObjIds to object bodies."""
+		data = bytearray(b"%PDF-1.4\n%\xb5\xed\xae\xfb\n")
+		prev_xref_offset = None
+		for objs in revisions:
+			offsets = { }
+			for (objid, body) in sorted(objs.items()):
+				offsets[objid] = len(data)
+				data += b"%d 0 obj\n" % (objid) + body + b"\nendobj\n"
+			xref_offset = len(data)
+			data += b"xref\n"
+			for (objid, offset) in sorted(offsets.items()):
+				data += b"%d 1\n%010d 00000 n \n" % (objid, offset)
+			data += b"trailer\n<< /Root 1 0 R /Size %d" % (max(offsets) + 1)
+			if prev_xref_offset is not None:
+				data += b" /Prev %d" % (prev_xref_offset)
+			data += b" >>\nstartxref\n%d\n%%%%EOF\n" % (xref_offset)
+			prev_xref_offset = xref_offset
+		return bytes(data)
+
+	def _write_file(self, data, filename = "test.pdf"):
+		filename = self._tempdir.name + "/" + filename
+		with open(filename, "wb") as f:
+			f.write(data)
+		return filename
+
+	def _classic_testfile(self):
+		return self._write_file(self._build_classic_pdf([
+			{
+				1: b"<< /Type /Catalog /Pages 2 0 R >>",
+				2: b"<< /Type /Pages /Kids [ 3 0 R ] /Count 1 >>",
+				3: b"<< /Type /Page /Parent 2 0 R /Contents 4 0 R >>",
+				4: b"<< /Length 5 0 R >>\nstream\nBT ET\nendstream",
+				5: b"5",
+			},
+			{
+				3: b"<< /Type /Page /Parent 2 0 R /Contents 4 0 R /Rotate 90 >>",
+			},
+		]))
+
+	def _objstrm_testfile(self):
+		pdf = PDFDocument()
+		pdf.trailer[PDFName("/Root")] = pdf.new_object({ PDFName("/Type"): PDFName("/Catalog"), PDFName("/Pages"): PDFXRef(2, 0) }).xref
+		pdf.new_object({ PDFName("/Type"): PDFName("/Pages"), PDFName("/Kids"): [ PDFXRef(3, 0) ], PDFName("/Count"): 1 })
+		pdf.new_object({ PDFName("/Type"): PDFName("/Page"), PDFName("/Parent"): PDFXRef(2, 0), PDFName("/Contents"): PDFXRef(4, 0) })
+		pdf.new_object(stream = EncodedObject.create(b"BT ET"))
+		filename = self._tempdir.name + "/objstrm.pdf"
+		PDFWriter().write(pdf, filename)
+		return filename
+
+	def _assert_same_objects(self, pdf1, pdf2):
+		self.assertEqual(sorted(obj.xref for obj in pdf1), sorted(obj.xref for obj in pdf2))
+		for obj1 in pdf1:
+			obj2 = pdf2.lookup(obj1.xref)
+			self.assertEqual(obj1.content, obj2.content)
+			self.assertEqual(obj1.raw_stream, obj2.raw_stream)
+
+	def test_lazy_classic(self):
+		filename = self._classic_testfile()
+		pdf = PDFReader(lazy = True).read(filename)
+		self.assertEqual(pdf.objcount, 5)
+		pages = list(pdf.pages)
+		self.assertEqual(len(pages), 1)
+		self.assertEqual(pages[0].content[PDFName("/Rotate")], 90)
+		self.assertEqual(pdf[(4, 0)].stream.decode(), b"BT ET")
+		self._assert_same_objects(pdf, PDFReader().read(filename))
+
+	def test_stream_keyword_in_string(self):
+		filename = self._write_file(self._build_classic_pdf([ {
+			1: b"<< /Type /Catalog /Pages 2 0 R /Title (a livestream recording) >>",
+			2: b"<< /Type /Pages /Kids [ 3 0 R ] /Count 1 >>",
+			3: b"<< /Type /Page /Parent 2 0 R /Contents 4 0 R >>",
+			4: b"<< /Length 5 /Note (no stream here) >>\nstream\nBT ET\nendstream",
+		} ]))
+		for reader in [ PDFReader(), PDFReader(lazy = True), PDFReader(use_mmap = True) ]:
+			pdf = reader.read(filename)
+			self.assertEqual(pdf[(1, 0)].content[PDFName("/Title")], b"a livestream recording")
+			self.assertEqual(len(list(pdf.pages)), 1)
+			self.assertEqual(bytes(pdf[(4, 0)].raw_stream), b"BT ET")
+		self.assertEqual([ obj.objid for obj in PDFReader().iter_objects(filename) ], [ 1, 2, 3, 4 ])
+
+	def test_stream_length_failure(self):
+		def length_resolver(xref):
+			raise Exception("Cannot resolve %s" % (xref))
+		obj = PDFObject.parse(StreamRepr(b"4 0 obj << /Length 9 0 R >>\nstream\nBT ET\nendstream\nendobj\n"), length_resolver = length_resolver)
+		self.assertEqual(obj.content[PDFName("/Length")], PDFXRef(9, 0))
+		self.assertEqual(bytes(obj.raw_stream), b"BT ET\n")
+
+	def test_lazy_loads_on_demand(self):
+		pdf = PDFReader(lazy = True).read(self._classic_testfile())
+		pdf.lookup(PDFXRef(1, 0))
+		self.assertEqual(len(pdf._objs), 1)
+		pdf.delete_object(2, 0)
+		self.assertEqual(pdf.objcount, 4)
+		self.assertIsNone(pdf[(2, 0)])
+		self.assertEqual(len(list(pdf)), 4)
+
+	def test_lazy_objstrm(self):
+		filename = self._objstrm_testfile()
+		pdf = PDFReader(lazy = True).read(filename)
+		self.assertEqual(pdf.objcount, 4)
+		self.assertEqual(pdf[(3, 0)].content[PDFName("/Type")], PDFName("/Page"))
+		self.assertEqual(pdf[(4, 0)].stream.decode(), b"BT ET")
+		self.assertEqual(len(list(pdf.pages)), 1)
+
+	def test_lazy_stream_length(self):
+		payload = b"q endstream\nendobj Q"
+		filename = self._write_file(self._build_classic_pdf([
+			{
+				1: b"<< /Type /Catalog >>",
+				2: b"<< /Length 3 0 R >>\nstream\n" + payload + b"\nendstream",
+				3: b"%d" % (len(payload)),
+				4: b"<< /Length %d >>\nstream\n" % (len(payload)) + payload + b"\nendstream",
+			},
+		]))
+		pdf = PDFReader(lazy = True).read(filename)
+		self.assertEqual(pdf[(2, 0)].raw_stream, payload)
+		self.assertEqual(pdf[(4, 0)].raw_stream, payload)
+
+	def test_lazy_content(self):
+		pdf = PDFReader(lazy = True).read(self._classic_testfile())
+		self.assertEqual(pdf.image_objects, [ ])
+		self.assertEqual(pdf.pattern_objects, [ ])
+		# Only the indirect stream length needed to be parsed
+		self.assertEqual([ obj.xref for obj in pdf if obj.content_parsed ], [ PDFXRef(5, 0) ])
+		self.assertTrue(pdf[(4, 0)].stream_length_verified)
+		self.assertEqual(pdf[(3, 0)].getattr(PDFName("/Rotate")), 90)
+		self.assertEqual(sorted(obj.xref for obj in pdf if obj.content_parsed), [ PDFXRef(3, 0), PDFXRef(5, 0) ])
+
+	@staticmethod
+	def _break_startxref(data):
+		# Let startxref point into the header
+		return data[: data.rindex(b"startxref")] + b"startxref\n3\n%%EOF\n"
+
+	def test_objstrm_on_demand(self):
+		filename = self._objstrm_testfile()
+		with open(filename, "rb") as f:
+			data = f.read()
+		with self.assertLogs("llpdf.PDFReader", level = "WARNING"):
+			pdf = PDFReader().read(self._write_file(self._break_startxref(data), "broken.pdf"))
+		self.assertEqual(len(pdf._unloaded_objs), 3)
+		self.assertEqual(pdf[(3, 0)].content[PDFName("/Type")], PDFName("/Page"))
+		self.assertEqual(len(pdf._unloaded_objs), 2)
+		self.assertEqual(pdf.objstrm_objects, [ ])
+		for obj in PDFReader(lazy = True).read(filename):
+			self.assertEqual(pdf.lookup(obj.xref).content, obj.content)
+
+	@staticmethod
+	def _load_index(cache, filename):
+		f = StreamRepr.from_filename(filename)
+		return cache.load(cache.key(filename, f), f)
+
+	def test_index_cache(self):
+		cache = ParseIndexCache(self._tempdir.name + "/cache")
+		filename = self._classic_testfile()
+		pdf = PDFReader(lazy = True, index_cache = cache).read(filename)
+		with self.assertLogs("llpdf.ParseIndexCache", level = "DEBUG"):
+			cached_pdf = PDFReader(index_cache = cache).read(filename)
+		self._assert_same_objects(pdf, cached_pdf)
+		self.assertEqual(cached_pdf.trailer, pdf.trailer)
+		self.assertEqual(cached_pdf[(4, 0)].stream.decode(), b"BT ET")
+
+		# Modifying the file invalidates the index
+		with open(filename, "ab") as f:
+			f.write(b"\n")
+		self.assertIsNone(self._load_index(cache, filename))
+
+	def test_index_cache_values(self):
+		cache = ParseIndexCache(self._tempdir.name + "/cache")
+		filename = self._write_file(self._build_classic_pdf([ {
+			1: b"<< /Type /Catalog /Values [ (text) <41ff> 1.5 -3 true false null [ ] << >> /A#20B 2 0 R ] >>",
+			2: b"[ << /R 1 /b (x) >> ]",
+		} ]))
+		pdf = PDFReader(index_cache = cache).read(filename)
+		with open(os.path.join(cache.directory, os.listdir(cache.directory)[0])) as f:
+			self.assertEqual(json.load(f)["version"], 2)
+		cached_pdf = self._load_index(cache, filename)
+		self._assert_same_objects(pdf, cached_pdf)
+		values = cached_pdf[(1, 0)].content[PDFName("/Values")]
+		self.assertEqual([ type(value) for value in values ], [ type(value) for value in pdf[(1, 0)].content[PDFName("/Values")] ])
+		self.assertEqual(values[-2], PDFName("/A B"))
+
+	def test_index_cache_hashes_once(self):
+		cache = ParseIndexCache(self._tempdir.name + "/cache")
+		filename = self._classic_testfile()
+		with unittest.mock.patch("hashlib.sha256", wraps = hashlib.sha256) as sha256:
+			PDFReader(index_cache = cache).read(filename)
+			PDFReader(index_cache = cache).read(filename)
+		self.assertEqual(sha256.call_count, 2)
+
+	def test_index_cache_size_cap(self):
+		cache = ParseIndexCache(self._tempdir.name + "/cache", max_size = 1)
+		filename = self._classic_testfile()
+		PDFReader(index_cache = cache).read(filename)
+		self.assertIsNone(self._load_index(cache, filename))
+		self.assertEqual(os.listdir(cache.directory), [ ])
+
+	def test_revisions(self):
+		filename = self._classic_testfile()
+		pdf = PDFReader().read(filename)
+		self.assertEqual(len(pdf._unloaded_objs), 0)
+		self.assertEqual([ revision.number for revision in pdf.revisions ], [ 0, 1 ])
+		self.assertEqual(len(pdf.revisions[1].xref_table), 1)
+		self.assertEqual(pdf[(3, 0)].content[PDFName("/Rotate")], 90)
+
+		original = pdf.revisions[0].read_document()
+		self.assertEqual(original.objcount, 5)
+		self.assertNotIn(PDFName("/Rotate"), original[(3, 0)].content)
+		self.assertEqual(original[(4, 0)].stream.decode(), b"BT ET")
+
+	def test_iter_objects(self):
+		reader = PDFReader()
+		objs = list(reader.iter_objects(self._classic_testfile()))
+		self.assertEqual([ obj.objid for obj in objs ], [ 1, 2, 3, 4, 5, 3 ])
+		self.assertEqual(objs[-1].content[PDFName("/Rotate")], 90)
+
+		objs = list(reader.iter_objects(self._objstrm_testfile()))
+		self.assertEqual(sorted(obj.objid for obj in objs if not obj.has_stream), [ 1, 2, 3 ])
+		self.assertFalse(any(obj.is_objstrm for obj in objs))
+		self.assertEqual(len(list(reader.iter_objects(self._objstrm_testfile(), unpack_objstrms = False))), len(objs) - 2)
+
+	def test_iter_objects_chunked(self):
+		payload = b"q endstream\nendobj 7 0 obj Q" * 20
+		filename = self._write_file(self._build_classic_pdf([
+			{
+				1: b"<< /Type /Catalog >>",
+				2: b"<< /Length %d >>\nstream\n" % (len(payload)) + payload + b"\nendstream",
+				3: b"<< /Length 4 0 R >>\nstream\nBT ET\nendstream",
+				4: b"5",
+			},
+			{
+				1: b"<< /Type /Catalog /Version /1.5 >>",
+			},
+		]))
+		expected = [ (obj.objid, obj.content, obj.raw_stream and bytes(obj.raw_stream), obj.stream_offset) for obj in PDFReader(use_mmap = True).iter_objects(filename) ]
+		self.assertEqual([ objid for (objid, _, _, _) in expected ], [ 1, 2, 3, 4, 1 ])
+		self.assertEqual(expected[1][2], payload)
+		for chunk_size in [ 32, 33, 100, 1000 ]:
+			with self.subTest(chunk_size = chunk_size):
+				objs = [ (obj.objid, obj.content, obj.raw_stream and bytes(obj.raw_stream), obj.stream_offset) for obj in PDFReader().iter_objects(filename, chunk_size = chunk_size) ]
+				self.assertEqual(objs, expected)
+
+	def test_iter_objects_resync(self):
+		data = self._build_classic_pdf([
+			{
+				1: b"<< /Type /Catalog >>",
+				2: b"<< /Value 2 >>",
+				3: b"<< /Value 3 >>",
+			},
+		])
+		data = data.replace(b"2 0 obj\n<< /Value 2 >>\nendobj", b"garbage << /Value 2 >>\nendobj")
+		filename = self._write_file(data + b"4 0 obj\n(unterminated\n")
+		for use_mmap in [ False, True ]:
+			with self.subTest(use_mmap = use_mmap), self.assertLogs("llpdf.ChunkedObjectReader", level = "WARNING") as logs:
+				objs = list(PDFReader(use_mmap = use_mmap).iter_objects(filename, chunk_size = 32))
+			self.assertEqual([ obj.objid for obj in objs ], [ 1, 3 ])
+			self.assertEqual(len(logs.records), 2)
+
+	def test_recover(self):
+		filename = self._objstrm_testfile()
+		with open(filename, "rb") as f:
+			data = f.read()
+		with self.assertLogs("llpdf.PDFReader", level = "WARNING"):
+			pdf = PDFReader(recover = True).read(self._write_file(self._break_startxref(data), "broken.pdf"))
+		self._assert_same_objects(pdf, PDFReader(lazy = True).read(filename))
+		self.assertEqual(len(list(pdf.pages)), 1)
+
+	def test_recover_shifted_offsets(self):
+		with self.assertLogs("llpdf.XRefRecovery", level = "INFO"):
+			pdf = PDFReader(recover = True).read(self._shifted_testfile())
+		self.assertEqual(pdf.objcount, 3)
+		self.assertEqual(len(list(pdf.pages)), 1)
+
+	def test_recover_objstrms_on_demand(self):
+		pdf = PDFDocument()
+		pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+		pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+		for objid in range(2, 100):
+			pdf.add(PDFObject.create(objid, 0, { PDFName("/Value"): objid }))
+		filename = self._tempdir.name + "/objstrms.pdf"
+		PDFWriter(compress_object_count = 20).write(pdf, filename)
+		with open(filename, "rb") as f:
+			data = f.read()
+		with self.assertLogs("llpdf.PDFReader", level = "WARNING"):
+			recovered = PDFReader(lazy = True, recover = True).read(self._write_file(self._break_startxref(data), "broken.pdf"))
+		self.assertEqual(recovered[(99, 0)].content, { PDFName("/Value"): 99 })
+		self.assertTrue(recovered._deferred_loaders[0].has_deferred_objects)
+		self.assertEqual(recovered[(1, 0)].content, { PDFName("/Type"): PDFName("/Catalog") })
+		self.assertIsNone(recovered[(1000, 0)])
+		self.assertEqual(len(recovered._deferred_loaders), 0)
+		self._assert_same_objects(pdf, recovered)
+
+	def test_recover_truncated(self):
+		pdf = PDFDocument()
+		pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+		pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+		for objid in range(2, 100):
+			pdf.add(PDFObject.create(objid, 0, { PDFName("/Value"): objid }))
+		filename = self._tempdir.name + "/objstrms.pdf"
+		PDFWriter(compress_object_count = 20).write(pdf, filename)
+		with open(filename, "rb") as f:
+			data = f.read()
+
+		# Neither the XRef stream nor an uncompressed catalog remains
+		data = data[ : data.index(b"/Type /XRef") - 16]
+		with self.assertLogs("llpdf.XRefRecovery", level = "WARNING"):
+			recovered = PDFReader(recover = True).read(self._write_file(data, "truncated.pdf"))
+		self.assertEqual(recovered.trailer[PDFName("/Root")], PDFXRef(1, 0))
+		self.assertEqual(recovered[(1, 0)].content, { PDFName("/Type"): PDFName("/Catalog") })
+		self.assertEqual(recovered[(2, 0)].content, { PDFName("/Value"): 2 })
+
+		data = self._build_classic_pdf([ { 1: b"<< /Value 1 >>" } ])
+		with self.assertRaises(MalformedPDFException), self.assertLogs("llpdf.PDFReader", level = "WARNING"):
+			PDFReader(recover = True).read(self._write_file(data[ : data.index(b"xref")], "truncated.pdf"))
+
+	def test_recover_classic(self):
+		fake_object = b"1 0 obj << /Type /Fake >> endobj"
+		data = self._build_classic_pdf([
+			{
+				1: b"<< /Type /Catalog /Pages 2 0 R >>",
+				2: b"<< /Type /Pages /Kids [ 3 0 R ] /Count 1 >>",
+				3: b"<< /Type /Page /Parent 2 0 R >>",
+				4: b"<< /Length %d >>\nstream\n%s\nendstream" % (len(fake_object), fake_object),
+			},
+			{
+				3: b"<< /Type /Page /Parent 2 0 R /Rotate 90 >>",
+			},
+		])
+		data = self._break_startxref(data.replace(b"trailer", b"broken"))
+		with self.assertLogs("llpdf.XRefRecovery", level = "WARNING"):
+			pdf = PDFReader(recover = True).read(self._write_file(data))
+		self.assertEqual(pdf.objcount, 4)
+		self.assertEqual(pdf[(1, 0)].content[PDFName("/Type")], PDFName("/Catalog"))
+		self.assertEqual(pdf.trailer[PDFName("/Root")], PDFXRef(1, 0))
+		self.assertEqual(list(pdf.pages)[0].content[PDFName("/Rotate")], 90)
+
+	def _shifted_testfile(self):
+		# Insert bytes after the header so that all XRef offsets are wrong
+		data = self._build_classic_pdf([ {
+			1: b"<< /Type /Catalog /Pages 2 0 R >>",
+			2: b"<< /Type /Pages /Kids [ 3 0 R ] /Count 1 >>",
+			3: b"<< /Type /Page /Parent 2 0 R >>",
+		} ])
+		header_length = data.index(b"1 0 obj")
+		return self._write_file(data[ : header_length] + b"%foo\n" + data[header_length : ], "shifted.pdf")
+
+	def test_shifted_offsets(self):
+		filename = self._shifted_testfile()
+		for lazy in [ False, True ]:
+			with self.assertLogs("llpdf.PDFReader", level = "WARNING"):
+				pdf = PDFReader(lazy = lazy).read(filename)
+			self.assertEqual(pdf.objcount, 3)
+			self.assertEqual(len(list(pdf.pages)), 1)
+
+	def test_lazy_fallback(self):
+		data = self._build_classic_pdf([ { 1: b"<< /Type /Catalog >>" } ])
+		data = self._break_startxref(data)
+		with self.assertLogs("llpdf.PDFReader", level = "WARNING"):
+			pdf = PDFReader(lazy = True).read(self._write_file(data))
+		self.assertEqual(pdf.objcount, 1)
+		self.assertEqual(pdf[(1, 0)].content, { PDFName("/Type"): PDFName("/Catalog") })
+
+	def test_mmap_roundtrip(self):
+		filename = self._classic_testfile()
+		for lazy in [ False, True ]:
+			pdf = PDFReader(lazy = lazy, use_mmap = True).read(filename)
+			self.assertIsInstance(pdf[(4, 0)].raw_stream, memoryview)
+			self.assertEqual(pdf[(4, 0)].stream.decode(), b"BT ET")
+
+			output_filename = self._tempdir.name + "/output.pdf"
+			PDFWriter().write(pdf, output_filename)
+			self._assert_same_objects(pdf, PDFReader(lazy = True).read(output_filename))
+
+	def test_classic_xref_roundtrip(self):
+		pdf = PDFReader().read(self._classic_testfile())
+		output_filename = self._tempdir.name + "/output.pdf"
+		PDFWriter(use_xref_stream = False).write(pdf, output_filename)
+		with open(output_filename, "rb") as f:
+			self.assertIn(b"\ntrailer\n", f.read())
+		self._assert_same_objects(pdf, PDFReader().read(output_filename))
+
+	def test_hybrid_xref(self):
+		data = bytearray(b"%PDF-1.5\n%\xb5\xed\xae\xfb\n")
+		offsets = { }
+		objstrm_content = b"4 0 << /Hidden true >>"
+		for (objid, body) in [
+				(1, b"<< /Type /Catalog /Pages 2 0 R /Extra 4 0 R >>"),
+				(2, b"<< /Type /Pages /Kids [ 3 0 R ] /Count 1 >>"),
+				(3, b"<< /Type /Page /Parent 2 0 R >>"),
+				(5, b"<< /Type /ObjStm /N 1 /First 4 /Length %d >>\nstream\n%s\nendstream" % (len(objstrm_content), objstrm_content)),
+			]:
+			offsets[objid] = len(data)
+			data += b"%d 0 obj\n%s\nendobj\n" % (objid, body)
+		xref_stream_data = bytes([ 2, 0, 5, 0 ])
+		offsets[6] = len(data)
+		data += b"6 0 obj\n<< /Type /XRef /Size 7 /Index [ 4 1 ] /W [ 1 2 1 ] /Length 4 >>\nstream\n%s\nendstream\nendobj\n" % (xref_stream_data)
+		xref_offset = len(data)
+		data += b"xref\n0 7\n0000000000 65535 f \n"
+		for objid in range(1, 7):
+			if objid == 4:
+				data += b"0000000000 00000 f \n"
+			else:
+				data += b"%010d 00000 n \n" % (offsets[objid])
+		data += b"trailer\n<< /Root 1 0 R /Size 7 /XRefStm %d >>\nstartxref\n%d\n%%%%EOF\n" % (offsets[6], xref_offset)
+
+		pdf = PDFReader(lazy = True).read(self._write_file(bytes(data)))
+		self.assertEqual(pdf.xref_table.get_entry(4, 0).inside_objid, 5)
+		self.assertEqual(pdf[(4, 0)].content, { PDFName("/Hidden"): True })
+
+	def test_compact(self):
+		filename = self._classic_testfile()
+		pdf = PDFReader(lazy = True).read(filename)
+		for obj in pdf:
+			obj.content
+		self.assertEqual(pdf.compact(), pdf.objcount)
+		self.assertFalse(any(obj.content_parsed for obj in pdf))
+		self.assertIsInstance(pdf[(4, 0)].raw_stream, bytes)
+		self._assert_same_objects(pdf, PDFReader().read(filename))
+
+		pdf[(3, 0)].content[PDFName("/UserUnit")] = 1.5
+		self.assertFalse(pdf[(3, 0)].compact())
+		self.assertEqual(pdf[(3, 0)].content[PDFName("/UserUnit")], 1.5)
+
+		pdf = PDFReader(compact = True).read(filename)
+		self.assertEqual(pdf[(3, 0)].content[PDFName("/Rotate")], 90)
+
+	def test_large_object_streams(self):
+		pdf = PDFDocument()
+		pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+		pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+		for objid in range(2, 1000):
+			pdf.add(PDFObject.create(objid, 0, { PDFName("/Value"): objid }))
+		output_filename = self._tempdir.name + "/output.pdf"
+		PDFWriter(compress_object_count = 300).write(pdf, output_filename)
+		self._assert_same_objects(pdf, PDFReader().read(output_filename))
+
+	def test_marks_of_compressed_objects(self):
+		for use_object_streams in [ False, True ]:
+			pdf = PDFDocument()
+			pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+			pdf.add(PDFObject.create(2, 0, { PDFName("/Marked"): MarkerObject("marker", raw = "[ 1 2 3 ]") }))
+			pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+			output_filename = self._tempdir.name + "/output.pdf"
+			writer = PDFWriter(use_object_streams = use_object_streams)
+			writer.write(pdf, output_filename)
+			if use_object_streams:
+				with self.assertRaises(KeyError):
+					writer.serializer.get_mark("marker")
+			else:
+				with open(output_filename, "rb") as f:
+					f.seek(writer.serializer.get_mark("marker"))
+					self.assertEqual(f.read(9), b"[ 1 2 3 ]")
+
+	def test_compression_policy(self):
+		pdf = PDFDocument()
+		pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+		pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+		for objid in range(2, 500):
+			pdf.add(PDFObject.create(objid, 0, { PDFName("/Value"): objid }))
+		policy = CompressionPolicy(default = CompressionSettings.fast(), settings_by_kind = {
+			StreamKind.ObjectStream:	CompressionSettings(backend = CompressionBackend.Exhaustive),
+			StreamKind.XRefStream:		CompressionSettings(level = 9, window_bits = 9),
+		})
+		output_filename = self._tempdir.name + "/output.pdf"
+		PDFWriter(compression_policy = policy).write(pdf, output_filename)
+		self._assert_same_objects(pdf, PDFReader().read(output_filename))
+
+	def test_compression_policy_streams(self):
+		pdf = PDFDocument()
+		pdf.add(PDFObject.create(1, 0, { PDFName("/Type"): PDFName("/Catalog") }))
+		pdf.trailer[PDFName("/Root")] = PDFXRef(1, 0)
+		streams = {
+			2: ({ }, b"0 0 m 100 100 l S\n" * 100),
+			3: ({ PDFName("/Length1"): 1000 }, bytes(range(100)) * 10),
+			4: ({ PDFName("/Type"): PDFName("/Metadata"), PDFName("/Subtype"): PDFName("/XML") }, b"<x:xmpmeta/>" * 100),
+		}
+		for (objid, (content, data)) in streams.items():
+			pdf.add(PDFObject.create(objid, 0, content, stream = EncodedObject.create(data, compress = False)))
+
+		output_filename = self._tempdir.name + "/output.pdf"
+		PDFWriter().write(pdf, output_filename)
+		self._assert_same_objects(pdf, PDFReader().read(output_filename))
+
+		PDFWriter(compression_policy = CompressionPolicy.balanced()).write(pdf, output_filename)
+		written_pdf = PDFReader().read(output_filename)
+		for (objid, (content, data)) in streams.items():
+			self.assertNotIn(PDFName("/Filter"), pdf[(objid, 0)].content)
+			written_obj = written_pdf[(objid, 0)]
+			self.assertEqual(written_obj.stream.decode(), data)
+			if objid == 4:
+				self.assertNotIn(PDFName("/Filter"), written_obj.content)
+			else:
+				self.assertEqual(written_obj.content[PDFName("/Filter")], PDFName("/FlateDecode"))
+				self.assertLess(len(written_obj.raw_stream), len(data))
@@ -0,0 +1,64 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+import unittest
+from llpdf.PDFDocument import PDFDocument
+from llpdf.EncodeDecode import EncodedObject, Filter, Predictor
+from llpdf.CompressionPolicy import CompressionSettings
+from llpdf.filters import RecompressStreamsOptimization
+from llpdf.types.PDFName import PDFName
+from llpdf.types.PDFObject import PDFObject
+from llpdf.types.PDFXRef import PDFXRef
+from llpdf.tools.WorkerPool import WorkerPool
+
+class RecompressStreamsOptimizationTest(unittest.TestCase):
+	def tearDown(self):
+		WorkerPool.set_max_workers(None)
+
+	def test_recompress(self):
+		WorkerPool.set_max_workers(2)
+		content = b"".join(b"%d %d 10 10 re f\n" % (i % 600, (i * 7) % 800) for i in range(5000))
+		(width, height) = (120, 80)
+		image = bytes((x + y + (c * 40)) & 0xff for y in range(height) for x in range(width) for c in range(3))
+		pdf = PDFDocument()
+		pdf.add(PDFObject.create(1, 0, { }, stream = EncodedObject.create(content, compression = CompressionSettings.fast())))
+		pdf.add(PDFObject.create(2, 0, { PDFName("/Subtype"): PDFName("/Image"), PDFName("/Width"): width, PDFName("/Height"): height, PDFName("/BitsPerComponent"): 8, PDFName("/ColorSpace"): PDFName("/DeviceRGB") }, stream = EncodedObject.create(image, compression = CompressionSettings.fast())))
+		pdf.add(PDFObject.create(3, 0, { }, stream = EncodedObject.create(b"q Q", compress = False)))
+		pdf.add(PDFObject.create(4, 0, { PDFName("/Subtype"): PDFName("/Image"), PDFName("/Filter"): PDFName("/DCTDecode") }))
+		pdf.lookup(PDFXRef(4, 0)).set_raw_stream(b"not really JPEG")
+		pdf.add(PDFObject.create(5, 0, { PDFName("/Subtype"): PDFName("/Image"), PDFName("/Width"): width, PDFName("/Height"): height, PDFName("/BitsPerComponent"): 8, PDFName("/ColorSpace"): PDFXRef(6, 0) }, stream = EncodedObject.create(image, compression = CompressionSettings.fast())))
+		pdf.add(PDFObject.create(7, 0, { PDFName("/Subtype"): PDFName("/Image"), PDFName("/Filter"): [ PDFName("/FlateDecode"), PDFName("/JPXDecode") ] }))
+		pdf.lookup(PDFXRef(7, 0)).set_raw_stream(b"not really JPEG 2000")
+		sizes = { obj.objid: len(obj.raw_stream) for obj in pdf.stream_objects }
+
+		recompress = RecompressStreamsOptimization(pdf, None)
+		recompress.run()
+		self.assertEqual(pdf.lookup(PDFXRef(1, 0)).stream.decode(), content)
+		self.assertEqual(pdf.lookup(PDFXRef(2, 0)).stream.decode(), image)
+		self.assertNotEqual(pdf.lookup(PDFXRef(2, 0)).stream.predictor, Predictor.NoPredictor)
+		self.assertEqual(pdf.lookup(PDFXRef(2, 0)).stream.colors, 3)
+		self.assertEqual(pdf.lookup(PDFXRef(5, 0)).stream.decode(), image)
+		self.assertEqual(pdf.lookup(PDFXRef(5, 0)).stream.predictor, Predictor.NoPredictor)
+		self.assertEqual(pdf.lookup(PDFXRef(3, 0)).stream.filtering, Filter.Uncompressed)
+		self.assertEqual(pdf.lookup(PDFXRef(4, 0)).raw_stream, b"not really JPEG")
+		self.assertEqual(pdf.lookup(PDFXRef(7, 0)).raw_stream, b"not really JPEG 2000")
+		self.assertEqual(recompress.bytes_saved, sum(sizes.values()) - sum(len(obj.raw_stream) for obj in pdf.stream_objects))
+		self.assertGreater(recompress.bytes_saved, 0)
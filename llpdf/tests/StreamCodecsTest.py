@@ -0,0 +1,62 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import random
+import unittest
+from llpdf.StreamCodecs import ASCIIHexCodec, ASCII85Codec, LZWCodec, RunLengthCodec
+
+class StreamCodecsTest(unittest.TestCase):
+	def setUp(self):
+		rng = random.Random(0)
+		self._samples = [ b"", b"a", b"abc" * 100, bytes(5000), rng.randbytes(10000), bytes(rng.choice(b"abcd") for i in range(50000)) ]
+
+	def test_ascii_hex(self):
+		self.assertEqual(ASCIIHexCodec.decode(b"48 65\n6c6C 6f>"), b"Hello")
+		self.assertEqual(ASCIIHexCodec.decode(b"4865 7>  \n"), b"He\x70")
+		for sample in self._samples:
+			self.assertEqual(ASCIIHexCodec.decode(ASCIIHexCodec.encode(sample)), sample)
+
+	def test_ascii85(self):
+		self.assertEqual(ASCII85Codec.decode(b"87cURD]i,\n\"Ebo80~>\r\n"), b"Hello World!")
+		self.assertEqual(ASCII85Codec.decode(b"<~z~>"), bytes(4))
+		for sample in self._samples + [ b"\xff" * 7, b"\x00\x00\x00\x00\x01" ]:
+			self.assertEqual(ASCII85Codec.decode(ASCII85Codec.encode(sample)), sample)
+			self.assertEqual(ASCII85Codec.decode(ASCII85Codec.encode(sample), use_numpy = False), sample)
+		with self.assertRaises(ValueError):
+			ASCII85Codec.decode(b"abc{e~>")
+
+	def test_lzw(self):
+		# Example from the PDF reference
+		self.assertEqual(LZWCodec.decode(bytes.fromhex("80 0b 60 50 22 0c 0c 85 01")), b"-----A---B")
+		self.assertEqual(LZWCodec.encode(b"-----A---B"), bytes.fromhex("80 0b 60 50 22 0c 0c 85 01"))
+		for early_change in [ 0, 1 ]:
+			for sample in self._samples:
+				self.assertEqual(LZWCodec.decode(LZWCodec.encode(sample, early_change = early_change), early_change = early_change), sample)
+		with self.assertRaises(Exception):
+			LZWCodec.decode(bytes.fromhex("80 4b 00"))
+
+	def test_run_length(self):
+		self.assertEqual(RunLengthCodec.decode(bytes([ 2, 1, 2, 3, 254, 9, 128, 0, 7 ])), bytes([ 1, 2, 3, 9, 9, 9 ]))
+		self.assertEqual(RunLengthCodec.encode(bytes([ 1, 2, 3, 9, 9, 9 ])), bytes([ 2, 1, 2, 3, 254, 9, 128 ]))
+		self.assertEqual(len(RunLengthCodec.encode(bytes(1000))), 17)
+		for sample in self._samples:
+			self.assertEqual(RunLengthCodec.decode(RunLengthCodec.encode(sample)), sample)
@@ -0,0 +1,60 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import time
+import threading
+import unittest
+from llpdf.tools.WorkerPool import WorkerPool
+from llpdf.EncodeDecode import EncodedObject
+
+class WorkerPoolTest(unittest.TestCase):
+	def tearDown(self):
+		WorkerPool.set_max_workers(None)
+
+	def test_order(self):
+		WorkerPool.set_max_workers(4)
+		def delayed_square(value):
+			time.sleep(0.001 * (value % 3))
+			return value * value
+		self.assertEqual(list(WorkerPool.imap(delayed_square, range(50))), [ value * value for value in range(50) ])
+		self.assertEqual(WorkerPool.map(delayed_square, iter(range(5))), [ 0, 1, 4, 9, 16 ])
+		self.assertEqual(WorkerPool.map(delayed_square, [ ]), [ ])
+
+	def test_serial(self):
+		WorkerPool.set_max_workers(1)
+		self.assertEqual(set(WorkerPool.map(lambda value: threading.current_thread(), range(10))), set([ threading.current_thread() ]))
+
+	def test_nested(self):
+		WorkerPool.set_max_workers(2)
+		nested_sum = lambda value: sum(WorkerPool.map(lambda inner: inner * value, range(10)))
+		self.assertEqual(WorkerPool.map(nested_sum, range(10)), [ 45 * value for value in range(10) ])
+
+	def test_exception(self):
+		WorkerPool.set_max_workers(2)
+		with self.assertRaises(ZeroDivisionError):
+			WorkerPool.map(lambda value: 1 / value, [ 3, 2, 1, 0 ])
+
+	def test_create_many(self):
+		WorkerPool.set_max_workers(3)
+		datas = [ (b"foo %d " % (i)) * i for i in range(20) ]
+		encoded_objects = EncodedObject.create_many(datas, predict = False)
+		self.assertEqual([ encoded_object.decode() for encoded_object in encoded_objects ], datas)
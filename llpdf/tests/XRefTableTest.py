@@ -0,0 +1,105 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import unittest
+from llpdf.FileRepr import StreamRepr
+from llpdf.Exceptions import MalformedPDFException
+from llpdf.types.XRefTable import XRefTable, UncompressedXRefEntry, CompressedXRefEntry
+
+class XRefTableTest(unittest.TestCase):
+	def _read(self, data):
+		f = StreamRepr(data)
+		xref_table = XRefTable.read_xref_table_from_file(f)
+		return (xref_table, f)
+
+	def test_classic_table(self):
+		data = b"0 4\n0000000003 65535 f\r\n0000000015 00000 n\r\n0000000100 00002 n \n0000000000 00001 f \n10 1\n0000000200 00000 n\r\ntrailer"
+		(xref_table, f) = self._read(data)
+		self.assertEqual(f.read(7), b"trailer")
+		self.assertEqual(len(xref_table), 3)
+		self.assertEqual(xref_table.get_entry(1, 0).offset, 15)
+		self.assertEqual(xref_table.get_entry(2, 2).offset, 100)
+		self.assertIsNone(xref_table.get_entry(2, 0))
+		self.assertIsNone(xref_table.get_entry(3, 0))
+		self.assertEqual(xref_table.get_entry(10, 0).offset, 200)
+		self.assertEqual([ key for (key, entry) in xref_table ], [ (1, 0), (2, 2), (10, 0) ])
+
+	def test_classic_table_nonstandard(self):
+		data = b"1 2\n15 0 n\n  100 0 n\n\ntrailer"
+		(xref_table, f) = self._read(data)
+		self.assertEqual(len(xref_table), 2)
+		self.assertEqual(xref_table.get_entry(2, 0).offset, 100)
+
+		with self.assertRaises(MalformedPDFException):
+			self._read(b"1 2\n0000000015 00000 n\r\ntrailer")
+
+	def test_merge_older(self):
+		(newer, f) = self._read(b"1 2\n0000000000 00001 f\r\n0000000500 00000 n\r\n")
+		older = XRefTable()
+		older.add_entry(UncompressedXRefEntry(objid = 1, gennum = 0, offset = 10))
+		older.add_entry(UncompressedXRefEntry(objid = 2, gennum = 0, offset = 20))
+		older.add_entry(CompressedXRefEntry(objid = 3, inside_objid = 5, index = 0))
+		newer.merge_older(older)
+		self.assertIsNone(newer.get_entry(1, 0))
+		self.assertEqual(newer.get_entry(2, 0).offset, 500)
+		self.assertEqual(newer.get_entry(3, 0).inside_objid, 5)
+		self.assertEqual(len(newer), 2)
+
+	def test_xref_stream(self):
+		data = bytes.fromhex("00 0000 ff  01 0010 00  02 0005 03  01 0100 01  01 0200 00")
+		xref_table = XRefTable()
+		xref_table.parse_xref_object(data, [ 0, 3, 20, 2 ], [ 1, 2, 1 ])
+		self.assertEqual(len(xref_table), 4)
+		self.assertEqual(xref_table.get_entry(1, 0).offset, 0x10)
+		self.assertEqual(xref_table.get_entry(2, 0).inside_objid, 5)
+		self.assertEqual(xref_table.get_entry(2, 0).index, 3)
+		self.assertEqual(xref_table.get_entry(20, 1).offset, 0x100)
+		self.assertEqual(xref_table.get_entry(21, 0).offset, 0x200)
+		self.assertIsNone(xref_table.get_entry(3, 0))
+
+	def test_xref_stream_field_widths(self):
+		xref_table = XRefTable()
+		xref_table.parse_xref_object(bytes.fromhex("000010 000020"), None, [ 0, 3, 0 ])
+		self.assertEqual([ entry.offset for (key, entry) in xref_table ], [ 0x10, 0x20 ])
+
+		xref_table = XRefTable()
+		xref_table.parse_xref_object(bytes.fromhex("0001 0000000000001234 0000  0009 0000000000000000 0000"), [ 7, 2 ], [ 2, 8, 2 ])
+		self.assertEqual(xref_table.get_entry(7, 0).offset, 0x1234)
+		self.assertIsNone(xref_table.get_entry(8, 0))
+
+		with self.assertRaises(MalformedPDFException):
+			XRefTable().parse_xref_object(bytes.fromhex("01 0010 00"), [ 0, 2 ], [ 1, 2, 1 ])
+		with self.assertRaises(MalformedPDFException):
+			XRefTable().parse_xref_object(bytes.fromhex("01 0010 0100000000"), None, [ 1, 2, 5 ])
+
+	def test_pack(self):
+		xref_table = XRefTable()
+		xref_table.parse_xref_object(bytes.fromhex("00 0000 ff  01 0010 00  02 0005 03  01 0100 01  01 0200 00"), [ 0, 3, 20, 2 ], [ 1, 2, 1 ])
+		xref_table.xref_offset = 1234
+		unpacked = XRefTable.unpack(*xref_table.pack(), xref_offset = xref_table.xref_offset)
+		self.assertEqual(len(unpacked), 4)
+		self.assertEqual(unpacked.xref_offset, 1234)
+		self.assertEqual([ (key, str(entry)) for (key, entry) in unpacked ], [ (key, str(entry)) for (key, entry) in xref_table ])
+
+		(types, field2, field3) = xref_table.pack()
+		with self.assertRaises(MalformedPDFException):
+			XRefTable.unpack(types[1:], field2, field3)
@@ -0,0 +1,126 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import threading
+import collections
+
+class LRUCache(object):
+	"""Mapping that holds at most 'max_entries' items and, if 'max_size' is
+	given, items whose sizes (as determined by 'sizeof') add up to at most
+	'max_size'. The least recently used items are evicted when an insertion
+	exceeds either limit; an item that exceeds 'max_size' by itself is not
+	stored at all. Lookups are counted as hits or misses. All operations are
+	thread-safe."""
+	def __init__(self, max_entries = None, max_size = None, sizeof = len):
+		assert((max_entries is None) or (max_entries > 0))
+		assert((max_size is None) or (max_size > 0))
+		self._max_entries = max_entries
+		self._max_size = max_size
+		self._sizeof = sizeof
+		self._entries = collections.OrderedDict()
+		self._size = 0
+		self._hits = 0
+		self._misses = 0
+		self._lock = threading.RLock()
+
+	@property
+	def max_entries(self):
+		return self._max_entries
+
+	@property
+	def max_size(self):
+		return self._max_size
+
+	@property
+	def size(self):
+		"""Total size of all cached items. Only tracked if 'max_size' is set."""
+		return self._size
+
+	@property
+	def hits(self):
+		return self._hits
+
+	@property
+	def misses(self):
+		return self._misses
+
+	def _exceeds_limits(self):
+		if (self._max_entries is not None) and (len(self._entries) > self._max_entries):
+			return True
+		if (self._max_size is not None) and (self._size > self._max_size):
+			return True
+		return False
+
+	def get(self, key, default = None):
+		with self._lock:
+			if key not in self._entries:
+				self._misses += 1
+				return default
+			self._hits += 1
+			self._entries.move_to_end(key)
+			return self._entries[key][0]
+
+	def pop(self, key, default = None):
+		with self._lock:
+			if key not in self._entries:
+				return default
+			(value, size) = self._entries.pop(key)
+			self._size -= size
+			return value
+
+	def __setitem__(self, key, value):
+		size = self._sizeof(value) if (self._max_size is not None) else 0
+		with self._lock:
+			self.pop(key)
+			if (self._max_size is not None) and (size > self._max_size):
+				return
+			self._entries[key] = (value, size)
+			self._size += size
+			while self._exceeds_limits():
+				(evicted_value, evicted_size) = self._entries.popitem(last = False)[1]
+				self._size -= evicted_size
+
+	def __getitem__(self, key):
+		value = self.get(key, self)
+		if value is self:
+			raise KeyError(key)
+		return value
+
+	def __delitem__(self, key):
+		with self._lock:
+			if key not in self._entries:
+				raise KeyError(key)
+			self.pop(key)
+
+	def __contains__(self, key):
+		return key in self._entries
+
+	def __len__(self):
+		return len(self._entries)
+
+	def clear(self):
+		with self._lock:
+			self._entries.clear()
+			self._size = 0
+
+	def __str__(self):
+		return "LRUCache<%d entries, %d bytes, %d hits, %d misses>" % (len(self), self.size, self.hits, self.misses)
@@ -0,0 +1,86 @@
+#	llpdf - Low-level PDF library in native Python.
+#	Copyright (C) 2016-2022 Johannes Bauer
+#
+#	This file is part of llpdf.
+#
+#	llpdf is free software; you can redistribute it and/or modify
+#	it under the terms of the GNU General Public License as published by
+#	the Free Software Foundation; this program is ONLY licensed under
+#	version 3 of the License, later versions are explicitly excluded.
+#
+#	llpdf is distributed in the hope that it will be useful,
+#	but WITHOUT ANY WARRANTY; without even the implied warranty of
+#	MERCHANTABILITY or FITNESS FOR A PARTICULAR PURPOSE.  See the
+#	GNU General Public License for more details.
+#
+#	You should have received a copy of the GNU General Public License
+#	along with llpdf; if not, write to the Free Software
+#	Foundation, Inc., 59 Temple Place, Suite 330, Boston, MA  02111-1307  USA
+#
+#	Johannes Bauer <JohannesBauer@gmx.de>
+#
+
+import os
+import threading
+import collections
+import concurrent.futures
+
+class WorkerPool(object):
+	"""Process-wide pool of worker threads for work that mostly runs without
+	holding the GIL, like zlib compression or waiting for external programs.
+	The pool is created on first use; set_max_workers() changes its size,
+	where a size of one means that all work is done in the calling thread.
+	Work submitted from within a worker is also done in the calling thread,
+	so that workers never wait for each other."""
+	_lock = threading.Lock()
+	_thread_state = threading.local()
+	_executor = None
+	_max_workers = None
+
+	@classmethod
+	def _mark_worker_thread(cls):
+		cls._thread_state.is_worker = True
+
+	@classmethod
+	def set_max_workers(cls, max_workers):
+		assert((max_workers is None) or (max_workers > 0))
+		with cls._lock:
+			if cls._executor is not None:
+				cls._executor.shutdown(wait = True)
+				cls._executor = None
+			cls._max_workers = max_workers
+
+	@classmethod
+	def max_workers(cls):
+		return cls._max_workers if (cls._max_workers is not None) else (os.cpu_count() or 1)
+
+	@classmethod
+	def _get_executor(cls):
+		if (cls.max_workers() == 1) or getattr(cls._thread_state, "is_worker", False):
+			return None
+		with cls._lock:
+			if cls._executor is None:
+				cls._executor = concurrent.futures.ThreadPoolExecutor(max_workers = cls.max_workers(), thread_name_prefix = "llpdf-worker", initializer = cls._mark_worker_thread)
+			return cls._executor
+
+	@classmethod
+	def imap(cls, function, iterable):
+		"""Yields function(item) for all items, in order. At most twice as
+		many items as there are workers are processed ahead of the consumer,
+		which bounds the memory held by results that are not consumed yet."""
+		executor = cls._get_executor()
+		if executor is None:
+			yield from map(function, iterable)
+			return
+
+		pending = collections.deque()
+		for item in iterable:
+			pending.append(executor.submit(function, item))
+			if len(pending) >= 2 * cls.max_workers():
+				yield pending.popleft().result()
+		while len(pending) > 0:
+			yield pending.popleft().result()
+
+	@classmethod
+	def map(cls, function, iterable):
+		return list(cls.imap(function, iterable))
@@ -20,7 +20,11 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 #
 
+import operator
+
 class Comparable(object):
+	__slots__ = ( )
+
 	def _compare(self, other, method):
 		try:
 			return method(self.cmpkey(), other.cmpkey())
@@ -30,22 +34,22 @@ class Comparable(object):
 			return NotImplemented
 
 	def __lt__(self, other):
-		return self._compare(other, lambda s, o: s < o)
+		return self._compare(other, operator.lt)
 
 	def __le__(self, other):
-		return self._compare(other, lambda s, o: s <= o)
+		return self._compare(other, operator.le)
 
 	def __eq__(self, other):
-		return self._compare(other, lambda s, o: s == o)
+		return self._compare(other, operator.eq)
 
 	def __ge__(self, other):
-		return self._compare(other, lambda s, o: s >= o)
+		return self._compare(other, operator.ge)
 
 	def __gt__(self, other):
-		return self._compare(other, lambda s, o: s > o)
+		return self._compare(other, operator.gt)
 
 	def __ne__(self, other):
-		return self._compare(other, lambda s, o: s != o)
+		return self._compare(other, operator.ne)
 
 	def __hash__(self):
 		return hash(self.cmpkey())
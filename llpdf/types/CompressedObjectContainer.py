@@ -24,6 +24,7 @@ from llpdf.types.XRefTable import CompressedXRefEntry
 from llpdf.types.PDFObject import PDFObject
 from llpdf.types.PDFName import PDFName
 from llpdf.EncodeDecode import EncodedObject
+from llpdf.tools.WorkerPool import WorkerPool
 
 class CompressedObjectContainer(object):
 	def __init__(self, objid):
@@ -48,7 +49,7 @@ class CompressedObjectContainer(object):
 		self._contained_stream_size_bytes += len(obj)
 		return CompressedXRefEntry(obj.objid, self.objid, len(self._contained_objects) - 1)
 
-	def serialize(self, serializer):
+	def _serialize_contents(self, serializer):
 		header = [ ]
 		data = bytearray()
 		for obj in self._contained_objects:
@@ -66,7 +67,22 @@ class CompressedObjectContainer(object):
 			PDFName("/N"):		self.objects_inside_count,
 			PDFName("/First"):	len(header),
 		}
-		return PDFObject.create(objid = self.objid, gennum = 0, content = content, stream = EncodedObject.create(full_data))
+		return (content, full_data)
+
+	def serialize(self, serializer, compression = None):
+		(content, full_data) = self._serialize_contents(serializer)
+		return PDFObject.create(objid = self.objid, gennum = 0, content = content, stream = EncodedObject.create(full_data, compression = compression))
+
+	@classmethod
+	def serialize_many(cls, containers, serializer, compression = None):
+		"""Like serialize() for all containers, but compresses the streams in
+		parallel on the WorkerPool. Serialization itself happens in the
+		calling thread; the objects are yielded in order."""
+		def create_object(serialized_container):
+			(objid, content, full_data) = serialized_container
+			return PDFObject.create(objid = objid, gennum = 0, content = content, stream = EncodedObject.create(full_data, compression = compression))
+		serialized_containers = ((container.objid, ) + container._serialize_contents(serializer) for container in containers)
+		yield from WorkerPool.imap(create_object, serialized_containers)
 
 	def __str__(self):
 		return "CompressedContainer<ObjId = %d, %d objects inside: {%s}>" % (self.objid, self.objects_inside_count, ", ".join(str(obj.objid) for obj in self._contained_objects))
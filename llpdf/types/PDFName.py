@@ -22,15 +22,43 @@
 
 import re
 import string
+import weakref
+import threading
 from .Comparable import Comparable
 
 class PDFName(Comparable):
+	"""PDF name object. Names are immutable and interned, i.e., constructing a
+	name from the same string twice returns the identical instance as long as
+	that instance is in use. Names that are no longer referenced are removed
+	from the table of interned names."""
+	__slots__ = ( "_name", "_hash", "__weakref__" )
 	_HEX_CHAR = re.compile("#([a-fA-F0-9]{2})")
 	_PRINTABLE = set(string.ascii_letters + string.digits + ".-+_")
+	_INTERNED = weakref.WeakValueDictionary()
+	_INTERN_LOCK = threading.Lock()
 
-	def __init__(self, name):
-		assert(name.startswith("/"))
-		self._name = self._HEX_CHAR.sub(lambda match: chr(int(match.group(1), 16)), name)
+	def __new__(cls, name):
+		instance = cls._INTERNED.get(name)
+		if instance is None:
+			assert(name.startswith("/"))
+			with cls._INTERN_LOCK:
+				# Another thread may have interned the name meanwhile
+				instance = cls._INTERNED.get(name)
+				if instance is None:
+					instance = super().__new__(cls)
+					instance._name = cls._HEX_CHAR.sub(lambda match: chr(int(match.group(1), 16)), name) if ("#" in name) else name
+					instance._hash = hash(("PDFName", instance._name))
+					cls._INTERNED[name] = instance
+		return instance
+
+	def __reduce__(self):
+		return (PDFName, (self.value, ))
+
+	def __copy__(self):
+		return self
+
+	def __deepcopy__(self, memo):
+		return self
 
 	@property
 	def display_name(self):
@@ -39,6 +67,25 @@ class PDFName(Comparable):
 	def cmpkey(self):
 		return ("PDFName", self._name)
 
+	def __eq__(self, other):
+		if self is other:
+			return True
+		elif isinstance(other, PDFName):
+			return self._name == other._name
+		else:
+			return NotImplemented
+
+	def __ne__(self, other):
+		if self is other:
+			return False
+		elif isinstance(other, PDFName):
+			return self._name != other._name
+		else:
+			return NotImplemented
+
+	def __hash__(self):
+		return self._hash
+
 	@staticmethod
 	def _escape(char):
 		return "#%02x" % (ord(char))
@@ -53,6 +100,45 @@ class PDFName(Comparable):
 	def __str__(self):
 		return "Name<%s>" % (self.value)
 
+# Frequently used names, to avoid constructing them in hot code paths
+NAME_TYPE = PDFName("/Type")
+NAME_SUBTYPE = PDFName("/Subtype")
+NAME_LENGTH = PDFName("/Length")
+NAME_FILTER = PDFName("/Filter")
+NAME_DECODE_PARMS = PDFName("/DecodeParms")
+NAME_PREDICTOR = PDFName("/Predictor")
+NAME_COLUMNS = PDFName("/Columns")
+NAME_COLORS = PDFName("/Colors")
+NAME_BITS_PER_COMPONENT = PDFName("/BitsPerComponent")
+NAME_EARLY_CHANGE = PDFName("/EarlyChange")
+NAME_N = PDFName("/N")
+NAME_FIRST = PDFName("/First")
+NAME_OBJSTM = PDFName("/ObjStm")
+NAME_XREF = PDFName("/XRef")
+NAME_XOBJECT = PDFName("/XObject")
+NAME_IMAGE = PDFName("/Image")
+NAME_RESOURCES = PDFName("/Resources")
+NAME_PAGE = PDFName("/Page")
+NAME_PAGES = PDFName("/Pages")
+NAME_KIDS = PDFName("/Kids")
+NAME_CONTENTS = PDFName("/Contents")
+NAME_ROOT = PDFName("/Root")
+NAME_BBOX = PDFName("/BBox")
+NAME_MATRIX = PDFName("/Matrix")
+NAME_PATTERN = PDFName("/Pattern")
+NAME_PATTERN_TYPE = PDFName("/PatternType")
+NAME_PAINT_TYPE = PDFName("/PaintType")
+NAME_SMASK = PDFName("/SMask")
+NAME_METADATA = PDFName("/Metadata")
+NAME_FORM = PDFName("/Form")
+NAME_FUNCTION_TYPE = PDFName("/FunctionType")
+NAME_LENGTH1 = PDFName("/Length1")
+NAME_LENGTH2 = PDFName("/Length2")
+NAME_LENGTH3 = PDFName("/Length3")
+NAME_TYPE1C = PDFName("/Type1C")
+NAME_CID_FONT_TYPE0C = PDFName("/CIDFontType0C")
+NAME_OPEN_TYPE = PDFName("/OpenType")
+
 if __name__ == "__main__":
 	x = PDFName("/Adobe#20Green")
 	print(x, x.value)
@@ -21,15 +21,26 @@
 #
 
 import re
+import itertools
 from llpdf.repr import PDFParser
-from llpdf.types.PDFName import PDFName
+from llpdf.repr.PDFSerializer import PDFSerializer
+from llpdf.repr.PDFBodyLexer import PDFBodyLexer
+from llpdf.types.PDFName import PDFName, NAME_TYPE, NAME_SUBTYPE, NAME_LENGTH, NAME_OBJSTM, NAME_XOBJECT, NAME_IMAGE, NAME_PATTERN_TYPE, NAME_PAINT_TYPE, NAME_SMASK, NAME_BITS_PER_COMPONENT
 from llpdf.types.PDFXRef import PDFXRef
 from llpdf.FileRepr import StreamRepr
 from llpdf.EncodeDecode import EncodedObject
+from llpdf.tools.LRUCache import LRUCache
 from .Comparable import Comparable
 
 class PDFObject(Comparable):
+	__slots__ = ( "_objid", "_gennum", "_raw_content", "_content", "_stream", "_stream_length_verified", "_stream_offset", "_stream_cache_key" )
+	# Decoded stream data of all objects, shared so that its size is bounded.
+	# Replace by a differently sized LRUCache as needed.
+	decoded_stream_cache = LRUCache(max_entries = 1024, max_size = 64 * 1024 * 1024)
+	_stream_cache_keys = itertools.count()
+	_COMPACT_STREAM_COPY_LIMIT = 128
 	_OBJ_RE = re.compile(r"^(?P<obj_header>(?P<objid>\d+)\s+(?P<gennum>\d+)\s+obj?)")
+	_LENGTH_RE = re.compile(rb"/Length(?![^\x00\t\n\x0c\r ()<>\[\]{}/%])\s*(?P<value>\d+)(?:\s+(?P<gennum>\d+)\s+R)?")
 
 	def __init__(self, objid, gennum, rawdata):
 		assert(objid is not None)
@@ -38,41 +49,127 @@ class PDFObject(Comparable):
 		assert(isinstance(gennum, int))
 		self._objid = objid
 		self._gennum = gennum
+		self._raw_content = None
+		self._stream_length_verified = False
+		self._stream_offset = None
+		self._stream_cache_key = None
 		if rawdata is not None:
 			strm = StreamRepr(rawdata)
-			stream_begin = strm.read_until_token(b"stream")
-			if stream_begin is not None:
-				stream_data = strm.read_until_token(b"endstream")
-				if stream_data is not None:
-					content = stream_begin
-					self._stream = stream_data
-				else:
-					# Probably erroneous stream data ("stream" maybe in dict,
-					# but no "endstream")
-					content = rawdata
-					self._stream = None
-			else:
-				# No stream in this object found, just content
-				content = rawdata
-				self._stream = None
-
-			content = content.decode("latin1")
-
-			# Remove line continuations
-			content = content.replace("\\\r\n", "")
-			content = content.replace("\\\n", "")
-			content = content.replace("\\\r", "")
-
-			self._content = PDFParser.parse(content)
-			if (self._stream is not None) and (PDFName("/Length") in self._content) and isinstance(self._content[PDFName("/Length")], int):
-				# When direct length field is given, then truncate the stream
-				# according to it. For indirect streams, we don't do this (yet)
-				self._stream = self._stream[ : self._content[PDFName("/Length")]]
+			self._set_raw_data(*self._split_object(strm, 0, len(strm)))
 		else:
 			self._stream = None
 			self._content = None
 
+	@staticmethod
+	def _split_object(f, start, end):
+		"""Splits the object data between the given offsets into the content
+		and the stream data (or None if there is no stream). The stream data is
+		a zero-copy view into the underlying buffer."""
+		content_end = PDFBodyLexer(f).find_content_end(start, end)
+		if (content_end is not None) and (content_end.group(0) == b"stream"):
+			stream_begin = content_end.start()
+			stream_data_begin = stream_begin + len(b"stream")
+			stream_end = f.find(b"endstream", stream_data_begin, end)
+			if stream_end != -1:
+				# Skip the EOL marker that follows the stream keyword
+				if f.view(stream_data_begin, stream_data_begin + 2) == b"\r\n":
+					stream_data_begin += 2
+				elif f.view(stream_data_begin, stream_data_begin + 1) in [ b"\r", b"\n", b" " ]:
+					stream_data_begin += 1
+				return (f.view(start, stream_begin), f.view(stream_data_begin, stream_end))
+			else:
+				# Probably erroneous stream data ("stream" maybe in dict,
+				# but no "endstream")
+				return (f.view(start, end), None)
+		else:
+			# No stream in this object found, just content
+			return (f.view(start, end), None)
+
+	@staticmethod
+	def _parse_content(raw_content):
+		content = bytes(raw_content).decode("latin1")
+
+		# Remove line continuations
+		content = content.replace("\\\r\n", "")
+		content = content.replace("\\\n", "")
+		content = content.replace("\\\r", "")
+
+		return PDFParser.parse(content)
+
+	def _set_raw_data(self, raw_content, stream, content = None, stream_length_verified = False):
+		"""Sets the object data. Unless the parsed content is already known, it
+		is only parsed when first accessed."""
+		self._invalidate_decoded_stream()
+		self._stream = stream
+		self._stream_length_verified = stream_length_verified
+		if content is None:
+			self._raw_content = bytes(raw_content)
+			self._content = None
+		else:
+			self._raw_content = None
+			self._content = content
+		if (self._stream is not None) and (not stream_length_verified) and isinstance(self.getattr(NAME_LENGTH), int):
+			# When direct length field is given, then truncate the stream
+			# according to it. For indirect streams, we don't do this (yet)
+			self._stream = self._stream[ : self.content[NAME_LENGTH]]
+
+	def _may_contain_name(self, name):
+		"""Cheaply checks if the unparsed object content could contain the
+		given name. Never returns False if the name is present."""
+		if self._raw_content is None:
+			return True
+		return (b"#" in self._raw_content) or (name.display_name.encode("latin1") in self._raw_content)
+
+	@classmethod
+	def _sniff_length(cls, raw_content):
+		"""Returns the /Length value of a stream dictionary (an int or a
+		PDFXRef) without fully parsing it, or None if it cannot be determined
+		unambiguously."""
+		raw_content = bytes(raw_content)
+		if raw_content.count(b"/Length") != 1:
+			return None
+		match = cls._LENGTH_RE.search(raw_content)
+		if match is None:
+			return None
+		elif match.group("gennum") is None:
+			return int(match.group("value"))
+		else:
+			return PDFXRef(int(match.group("value")), int(match.group("gennum")))
+
+	@classmethod
+	def _serializes_losslessly(cls, value):
+		"""Checks if the content parses back to the identical value after it
+		has been serialized. Floats are rounded and PDFStrings become bytes on
+		serialization, marker objects lose their meaning."""
+		if isinstance(value, dict):
+			return all(isinstance(key, PDFName) and cls._serializes_losslessly(item) for (key, item) in value.items())
+		elif isinstance(value, list):
+			return all(cls._serializes_losslessly(item) for item in value)
+		else:
+			return (value is None) or (type(value) in (int, bool, bytes, PDFName, PDFXRef))
+
+	def compact(self):
+		"""Replaces the parsed content by its serialized form, which is parsed
+		again when the content is accessed the next time, and stores small
+		streams as bytes instead of views into the file buffer. Returns True
+		if the content was compacted."""
+		if isinstance(self._stream, memoryview) and (len(self._stream) <= self._COMPACT_STREAM_COPY_LIMIT):
+			self._stream = bytes(self._stream)
+		if (self._raw_content is not None) or (self._content is None) or (not self._serializes_losslessly(self._content)):
+			return False
+		self._raw_content = bytes(PDFSerializer().serialize(self._content))
+		self._content = None
+		return True
+
+	def _invalidate_decoded_stream(self):
+		if self._stream_cache_key is not None:
+			self.decoded_stream_cache.pop(self._stream_cache_key)
+			self._stream_cache_key = None
+
 	def set_content(self, content):
+		# Filter parameters may have changed
+		self._invalidate_decoded_stream()
+		self._raw_content = None
 		self._content = content
 
 	def set_stream(self, stream):
@@ -81,14 +178,17 @@ class PDFObject(Comparable):
 		stream.update_meta_dict(self.content)
 
 	def set_raw_stream(self, raw_stream):
-		assert((raw_stream is None) or isinstance(raw_stream, (bytes, bytearray)))
+		assert((raw_stream is None) or isinstance(raw_stream, (bytes, bytearray, memoryview)))
+		self._invalidate_decoded_stream()
 		self._stream = raw_stream
+		self._stream_offset = None
 
 	def replace_by(self, pdfobj):
 		self.set_content(pdfobj.content)
 		self.set_stream(pdfobj.raw_stream)
 
 	def truncate(self, stream_length):
+		self._invalidate_decoded_stream()
 		self._stream = self._stream[ : stream_length]
 
 	@classmethod
@@ -103,16 +203,16 @@ class PDFObject(Comparable):
 	@classmethod
 	def create_image(cls, objid, gennum, img, alpha_xref = None):
 		content = {
-			PDFName("/Type"):				PDFName("/XObject"),
-			PDFName("/Subtype"):			PDFName("/Image"),
+			NAME_TYPE:				NAME_XOBJECT,
+			NAME_SUBTYPE:			NAME_IMAGE,
 			PDFName("/Width"):				img.width,
 			PDFName("/Height"):				img.height,
-			PDFName("/BitsPerComponent"):	img.bits_per_component,
+			NAME_BITS_PER_COMPONENT:		img.bits_per_component,
 			PDFName("/ColorSpace"):			PDFName("/" + img.colorspace.name),
 			PDFName("/Interpolate"):		True,
 		}
 		if alpha_xref is not None:
-			content[PDFName("/SMask")] = alpha_xref
+			content[NAME_SMASK] = alpha_xref
 		return cls.create(objid, gennum, content, stream = img.imgdata)
 
 	@property
@@ -122,6 +222,19 @@ class PDFObject(Comparable):
 	def cmpkey(self):
 		return ("PDFObject", self.xref)
 
+	def __eq__(self, other):
+		if isinstance(other, PDFObject):
+			return (self._objid == other._objid) and (self._gennum == other._gennum)
+		return NotImplemented
+
+	def __ne__(self, other):
+		if isinstance(other, PDFObject):
+			return (self._objid != other._objid) or (self._gennum != other._gennum)
+		return NotImplemented
+
+	def __hash__(self):
+		return self._objid ^ (self._gennum << 32)
+
 	@property
 	def objid(self):
 		return self._objid
@@ -130,54 +243,120 @@ class PDFObject(Comparable):
 	def gennum(self):
 		return self._gennum
 
-	@classmethod
-	def parse(cls, f):
-		pos = f.tell()
-		objid = f.read_next_token()
-		gennum = f.read_next_token()
-		object_start = f.read_next_token()
-		object_data = f.read_until_token(b"endobj")
-
-		if (object_start is None) or (object_data is None) or (object_start != b"obj"):
-			f.seek(pos)
+	@staticmethod
+	def _resolve_stream_length(length, length_resolver):
+		if isinstance(length, PDFXRef) and (length_resolver is not None):
+			length = length_resolver(length)
+		if isinstance(length, int) and (length >= 0):
+			return length
+		else:
 			return None
 
-		objid = int(objid.decode("ascii"))
-		gennum = int(gennum.decode("ascii"))
-		return cls(objid = objid, gennum = gennum, rawdata = object_data)
+	@classmethod
+	def parse(cls, f, length_resolver = None, base_offset = 0, truncated = False):
+		"""Parses the object at the current position of the StreamRepr. If the
+		stream length is given directly or can be determined through the
+		optional 'length_resolver' (which gets passed a PDFXRef and returns
+		its integer value or None), the stream data is skipped instead of
+		searched for the "endstream" marker. 'base_offset' is the file offset
+		at which the StreamRepr begins and 'truncated' indicates that it may
+		end in the middle of an object."""
+		parsed = { }
+		def stream_length(data_begin, data_end):
+			try:
+				length = cls._sniff_length(f.view(data_begin, data_end))
+				if length is None:
+					content = cls._parse_content(f.view(data_begin, data_end))
+					parsed["content"] = content
+					length = content.get(NAME_LENGTH) if isinstance(content, dict) else None
+				parsed["length"] = cls._resolve_stream_length(length, length_resolver)
+			except Exception:
+				# Search for the "endstream" marker instead; the content is
+				# parsed again (and fails) only when it is accessed
+				parsed.clear()
+			return parsed.get("length")
+
+		boundary = PDFBodyLexer(f, truncated = truncated).next_object(stream_length)
+		if boundary is None:
+			return None
+		obj = cls(objid = boundary.objid, gennum = boundary.gennum, rawdata = None)
+		if boundary.stream_begin is not None:
+			stream = f.view(boundary.stream_begin, boundary.stream_end)
+			stream_length_verified = (parsed.get("length") == len(stream))
+			obj._stream_offset = base_offset + boundary.stream_begin
+		else:
+			stream = None
+			stream_length_verified = False
+		obj._set_raw_data(f.view(boundary.data_begin, boundary.data_end), stream, content = parsed.get("content"), stream_length_verified = stream_length_verified)
+		return obj
 
 	@property
 	def content(self):
+		if self._raw_content is not None:
+			self._content = self._parse_content(self._raw_content)
+			self._raw_content = None
 		return self._content
 
+	@property
+	def content_parsed(self):
+		return self._raw_content is None
+
+	@property
+	def stream_length_verified(self):
+		"""True if the stream data was delimited by its /Length."""
+		return self._stream_length_verified
+
+	@property
+	def stream_offset(self):
+		"""Offset of the raw stream data in the file the object was parsed
+		from, or None if unknown."""
+		return self._stream_offset
+
 	@property
 	def raw_stream(self):
 		return self._stream
 
 	@property
 	def stream(self):
+		"""EncodedObject of the stream data. Its decoded data is kept in the
+		decoded_stream_cache until the stream, the content or the filter
+		parameters in the content are changed."""
 		if not self.has_stream:
 			return None
-		else:
-			return EncodedObject.from_object(self)
+		encoded_object = EncodedObject.from_object(self)
+		decoding_parameters = encoded_object.decoding_parameters
+		if (self._stream_cache_key is not None) and (self._stream_cache_key[1] != decoding_parameters):
+			# /Filter or /DecodeParms were changed in place
+			self._invalidate_decoded_stream()
+		if self._stream_cache_key is None:
+			self._stream_cache_key = (next(self._stream_cache_keys), decoding_parameters)
+		encoded_object.use_decode_cache(self.decoded_stream_cache, self._stream_cache_key)
+		return encoded_object
 
 	@property
 	def has_stream(self):
 		return self.raw_stream is not None
 
+	def is_type(self, type_name):
+		"""Checks the /Type of the object, parsing the content only if the
+		type name occurs in it at all."""
+		return self._may_contain_name(type_name) and (self.getattr(NAME_TYPE) == type_name)
+
 	@property
 	def is_objstrm(self):
-		return self.has_stream and isinstance(self.content, dict) and (self.content.get(PDFName("/Type")) == PDFName("/ObjStm"))
+		return self.has_stream and self.is_type(NAME_OBJSTM)
 
 	@property
 	def is_image(self):
-		return self.has_stream and (self.content.get(PDFName("/Type")) == PDFName("/XObject")) and (self.content.get(PDFName("/Subtype")) == PDFName("/Image"))
+		return self.has_stream and self._may_contain_name(NAME_IMAGE) and (self.content.get(NAME_TYPE) == NAME_XOBJECT) and (self.content.get(NAME_SUBTYPE) == NAME_IMAGE)
 
 	@property
 	def is_pattern(self):
-		return (self.getattr(PDFName("/PatternType")) == 1) and (self.getattr(PDFName("/PaintType")) == 1)
+		return self._may_contain_name(NAME_PATTERN_TYPE) and (self.getattr(NAME_PATTERN_TYPE) == 1) and (self.getattr(NAME_PAINT_TYPE) == 1)
 
 	def getattr(self, key):
+		if not self._may_contain_name(key):
+			return None
 		if not isinstance(self.content, dict):
 			return None
 		return self.content.get(key)
@@ -23,9 +23,12 @@
 from .Comparable import Comparable
 
 class PDFString(Comparable):
+	__slots__ = ( "_text", "_encoding", "_hash" )
+
 	def __init__(self, text):
 		assert(isinstance(text, str))
 		self._text = text
+		self._hash = hash(text)
 		try:
 			self._encoding = self._text.encode("ascii")
 		except UnicodeEncodeError:
@@ -38,6 +41,22 @@ class PDFString(Comparable):
 	def cmpkey(self):
 		return ("PDFString", self.text)
 
+	def __eq__(self, other):
+		if isinstance(other, PDFString):
+			return self._text == other._text
+		return NotImplemented
+
+	def __ne__(self, other):
+		if isinstance(other, PDFString):
+			return self._text != other._text
+		return NotImplemented
+
+	def __hash__(self):
+		return self._hash
+
+	def __reduce__(self):
+		return (PDFString, (self._text, ))
+
 	def __bytes__(self):
 		return self._encoding
 
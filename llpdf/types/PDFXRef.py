@@ -23,9 +23,12 @@
 from .Comparable import Comparable
 
 class PDFXRef(Comparable):
+	__slots__ = ( "_objid", "_gennum", "_hash" )
+
 	def __init__(self, objid, gennum):
 		self._objid = objid
 		self._gennum = gennum
+		self._hash = objid ^ (gennum << 32)
 
 	@property
 	def objid(self):
@@ -38,6 +41,22 @@ class PDFXRef(Comparable):
 	def cmpkey(self):
 		return ("PDFXRef", self._objid, self._gennum)
 
+	def __eq__(self, other):
+		if isinstance(other, PDFXRef):
+			return (self._objid == other._objid) and (self._gennum == other._gennum)
+		return NotImplemented
+
+	def __ne__(self, other):
+		if isinstance(other, PDFXRef):
+			return (self._objid != other._objid) or (self._gennum != other._gennum)
+		return NotImplemented
+
+	def __hash__(self):
+		return self._hash
+
+	def __reduce__(self):
+		return (PDFXRef, (self._objid, self._gennum))
+
 	def __repr__(self):
 		return str(self)
 
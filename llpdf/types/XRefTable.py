@@ -20,11 +20,15 @@
 #	Johannes Bauer <JohannesBauer@gmx.de>
 #
 
+import re
+import sys
 import enum
+import array
 import logging
 from llpdf.types.PDFName import PDFName
 from llpdf.types.PDFObject import PDFObject
 from llpdf.EncodeDecode import EncodedObject
+from llpdf.Exceptions import MalformedPDFException
 
 class XRefTableEntryType(enum.IntEnum):
 	FreeObject = 0
@@ -32,6 +36,8 @@ class XRefTableEntryType(enum.IntEnum):
 	CompressedObject = 2
 
 class XRefEntry(object):
+	__slots__ = ( "_objid", "_gennum" )
+
 	def __init__(self, objid, gennum):
 		self._objid = objid
 		self._gennum = gennum
@@ -49,10 +55,14 @@ class XRefEntry(object):
 		return self._gennum
 
 class ReservedXRefEntry(XRefEntry):
+	__slots__ = ( )
+
 	def __str__(self):
 		return "ReservedRefEntry <ObjId=%d, GenNum=%d>"
 
 class CompressedXRefEntry(XRefEntry):
+	__slots__ = ( "_inside_objid", "_index" )
+
 	def __init__(self, objid, inside_objid, index):
 		"""Object 'objid' is compressed inside object (objid = 'inside_objid',
 		gennum = 0) at index 'index'."""
@@ -76,6 +86,8 @@ class CompressedXRefEntry(XRefEntry):
 		return "CompXRefEntry <ObjId=%d, GenNum=%d> inside object %d[%d]" % (self.objid, self.gennum, self.inside_objid, self.index)
 
 class UncompressedXRefEntry(XRefEntry):
+	__slots__ = ( "_offset", )
+
 	def __init__(self, objid, gennum, offset):
 		XRefEntry.__init__(self, objid, gennum)
 		self._offset = offset
@@ -88,10 +100,25 @@ class UncompressedXRefEntry(XRefEntry):
 		return "UncompXRefEntry <ObjId=%d, GenNum=%d>: @0x%x" % (self.objid, self.gennum, self.offset)
 
 class XRefTable(object):
+	"""XRef table that stores one entry per ObjId in typed arrays (entry type,
+	second and third field as in XRef streams) instead of one Python object
+	per entry. Entry objects are only created when they are accessed."""
 	_log = logging.getLogger("llpdf.types.XRefTable")
+	_ABSENT = 0xff
+	_RESERVED = 0xfe
+	_IN_USE_TYPES = (XRefTableEntryType.UncompressedObject, XRefTableEntryType.CompressedObject, _RESERVED)
+	_MAX_OBJID = 16 * 1024 * 1024
+	_SUBSECTION_HEADER_RE = re.compile(rb"[\x00\t\n\x0c\r ]*(?P<start>\d+)[\t ]+(?P<count>\d+)[\t ]*(?:\r\n|\r|\n)")
+	_STRICT_ENTRIES_RE = re.compile(rb"(?:\d{10} \d{5} [fn](?: \r| \n|\r\n))*")
+	_ENTRY_RE = re.compile(rb"[\x00\t\n\x0c\r ]*(?P<field2>\d+)[\t ]+(?P<field3>\d+)[\t ]+(?P<type>[fn])[\t ]*(?:\r\n|\r|\n)?")
+	_CLASSIC_TYPE_TRANSLATION = bytes.maketrans(b"fn", bytes([ XRefTableEntryType.FreeObject, XRefTableEntryType.UncompressedObject ]))
+	_XREF_STREAM_TYPE_TRANSLATION = bytes([ value if (value in (XRefTableEntryType.FreeObject, XRefTableEntryType.UncompressedObject, XRefTableEntryType.CompressedObject)) else XRefTableEntryType.FreeObject for value in range(256) ])
 
 	def __init__(self):
-		self._content = { }
+		self._types = bytearray()
+		self._field2 = array.array("Q")
+		self._field3 = array.array("I")
+		self._in_use_count = 0
 		self._max_objid = 0
 		self._xref_offset = None
 
@@ -103,36 +130,68 @@ class XRefTable(object):
 	def xref_offset(self, offset):
 		self._xref_offset = offset
 
-	def _read_next_xref_batch(self, f):
-		pos = f.tell()
-		entries_hdr = f.readline()
-		try:
-			entries_hdr = entries_hdr.decode("ascii").rstrip("\r\n").split()
-		except UnicodeDecodeError:
-			# XRef Table is at end or we cannot parse this.
-			f.seek(pos)
-			return False
+	def _ensure_size(self, size):
+		if size > self._MAX_OBJID:
+			raise MalformedPDFException("XRef table ObjId %d exceeds maximum of %d." % (size - 1, self._MAX_OBJID))
+		missing = size - len(self._types)
+		if missing > 0:
+			self._types += bytes([ self._ABSENT ]) * missing
+			self._field2.frombytes(bytes(self._field2.itemsize * missing))
+			self._field3.frombytes(bytes(self._field3.itemsize * missing))
 
-		if len(entries_hdr) != 2:
+	@classmethod
+	def _count_in_use(cls, types):
+		return sum(types.count(entry_type) for entry_type in cls._IN_USE_TYPES)
+
+	def _set(self, objid, entry_type, field2, field3):
+		self._ensure_size(objid + 1)
+		was_in_use = self._types[objid] in self._IN_USE_TYPES
+		is_in_use = entry_type in self._IN_USE_TYPES
+		self._types[objid] = entry_type
+		self._field2[objid] = field2
+		self._field3[objid] = field3
+		self._in_use_count += int(is_in_use) - int(was_in_use)
+		if is_in_use:
+			self._max_objid = max(self._max_objid, objid)
+
+	def _set_block(self, start, types, field2, field3):
+		"""Sets a contiguous block of entries at once."""
+		end = start + len(types)
+		self._ensure_size(end)
+		self._in_use_count += self._count_in_use(types) - self._count_in_use(self._types[start : end])
+		self._types[start : end] = types
+		self._field2[start : end] = field2
+		self._field3[start : end] = field3
+		last_in_use = max(types.rfind(entry_type) for entry_type in self._IN_USE_TYPES)
+		if last_in_use != -1:
+			self._max_objid = max(self._max_objid, start + last_in_use)
+
+	def _read_next_xref_batch(self, f):
+		header = f.match(self._SUBSECTION_HEADER_RE)
+		if header is None:
 			# XRef Table is at end or we cannot parse this.
-			f.seek(pos)
 			return False
 
-		(start_id, entry_cnt) = (int(entries_hdr[0]), int(entries_hdr[1]))
+		(start_id, entry_cnt) = (int(header.group("start")), int(header.group("count")))
 		self._log.debug("XRef table has %d entries starting with objid %d", entry_cnt, start_id)
-		for objid in range(start_id, start_id + entry_cnt):
-			line = f.readline()
-			parsed_line = line.decode("ascii").strip().split()
-			if len(parsed_line) != 3:
-				raise Exception("Expected XRef line to contain three entries, but %d found: %s" % (len(parsed_line), line))
-			if parsed_line[2] not in [ "f", "n" ]:
-				raise Exception("Expected XRef line to contain free or nonfree object, but found: %s" % (line))
-
-			offset = int(parsed_line[0])
-			gennum = int(parsed_line[1])
-			used_object = (parsed_line[2] == "n")
-			if used_object:
-				self.add_entry(UncompressedXRefEntry(objid = objid, gennum = gennum, offset = offset))
+		block_begin = header.end()
+		block = bytes(f.view(block_begin, block_begin + (20 * entry_cnt)))
+		if (len(block) == 20 * entry_cnt) and (self._STRICT_ENTRIES_RE.fullmatch(block) is not None):
+			# All entries are exactly 20 bytes long, decode the whole block at once
+			fields = block.split()
+			types = block[17 : : 20].translate(self._CLASSIC_TYPE_TRANSLATION)
+			self._set_block(start_id, types, array.array("Q", map(int, fields[0 : : 3])), array.array("I", map(int, fields[1 : : 3])))
+			f.seek(block_begin + len(block))
+		else:
+			# Nonstandard line endings or padding, decode entry by entry
+			f.seek(block_begin)
+			for objid in range(start_id, start_id + entry_cnt):
+				entry = f.match(self._ENTRY_RE)
+				if entry is None:
+					raise MalformedPDFException("Expected XRef entry for ObjId %d at offset 0x%x." % (objid, f.tell()))
+				entry_type = XRefTableEntryType.UncompressedObject if (entry.group("type") == b"n") else XRefTableEntryType.FreeObject
+				self._set(objid, entry_type, int(entry.group("field2")), int(entry.group("field3")))
+				f.seek(entry.end())
 		return True
 
 	@classmethod
@@ -144,52 +203,128 @@ class XRefTable(object):
 				break
 		return xref_table
 
+	@staticmethod
+	def _decode_column(rawdata, entry_width, entry_count, offset, width, typecode):
+		"""Decodes one big-endian field of all XRef stream entries at once by
+		scattering its bytes into an array of the given type."""
+		end = entry_count * entry_width
+		itemsize = array.array(typecode).itemsize
+		if width > itemsize:
+			# Leading zeros are permissible, values exceeding the array type are not
+			for byteno in range(width - itemsize):
+				if any(rawdata[offset + byteno : end : entry_width]):
+					raise MalformedPDFException("XRef stream field at offset %d with width of %d bytes exceeds %d bytes." % (offset, width, itemsize))
+			(offset, width) = (offset + width - itemsize, itemsize)
+		padded = bytearray(itemsize * entry_count)
+		for byteno in range(width):
+			padded[itemsize - width + byteno : : itemsize] = rawdata[offset + byteno : end : entry_width]
+		column = array.array(typecode, padded)
+		if sys.byteorder == "little":
+			column.byteswap()
+		return column
+
 	def parse_xref_object(self, rawdata, index, field_lengths):
-		entry_width = sum(field_lengths)
-		self._log.trace("XRefStrm length is %d bytes with field lengths %s, i.e. %d full entries (%d bytes per entry, %d dangling bytes). Index is %s.", len(rawdata), field_lengths, len(rawdata) // entry_width, len(rawdata) % entry_width, entry_width, index)
 		assert((index is None) or isinstance(index, list))
-		if index is None:
-			index = [ 0, None ]
-		assert((len(index) % 2) == 0)
-		assert(len(index) == 2)			# For now, only this is supported
 		assert(isinstance(rawdata, (bytes, bytearray)))
 		assert(len(field_lengths) == 3)
-		assert((len(rawdata) % entry_width) == 0)
-		entries = [ rawdata[i : i + entry_width] for i in range(0, len(rawdata), entry_width) ]
-
-		field_1_offset = 0
-		field_2_offset = field_lengths[0]
-		field_3_offset = field_lengths[0] + field_lengths[1]
-		for (objid, entry) in enumerate(entries, index[0]):
-			type_field = XRefTableEntryType(self._to_int(entry[field_1_offset : field_2_offset]))
-			field_2 = self._to_int(entry[field_2_offset : field_3_offset])
-			field_3 = self._to_int(entry[field_3_offset : ])
-			if type_field == XRefTableEntryType.FreeObject:
-				# Linked list of free objects
-				(next_free_objid, next_free_gennum) = (field_2, field_3)
-				if (next_free_objid == 0) and (next_free_gennum):
-					# TODO: Is my assumption true?
-					self._log.trace("XRefStrm ObjId %d: Currently no next free object." % (objid))
-				else:
-					self._log.trace("XRefStrm ObjId %d: Next free object: ObjId=%d, GenNum=%d" % (objid, next_free_objid, next_free_gennum))
-			elif type_field == XRefTableEntryType.UncompressedObject:
-				# Uncompressed object
-				(byte_offset, gennum) = (field_2, field_3)
-				self._log.trace("XRefStrm ObjId %d: Uncompressed object at %d, gennum %d" % (objid, byte_offset, gennum))
-				self.add_entry(UncompressedXRefEntry(objid = objid, gennum = gennum, offset = byte_offset))
-			elif type_field == XRefTableEntryType.CompressedObject:
-				# Compressed object
-				(objstrm_objid, index) = (field_2, field_3)
-				self._log.trace("XRefStrm ObjId %d: Compressed object inside ObjStm objid = %d, index %d" % (objid, objstrm_objid, index))
-				self.add_entry(CompressedXRefEntry(objid = objid, inside_objid = objstrm_objid, index = index))
+		entry_width = sum(field_lengths)
+		if entry_width == 0:
+			raise MalformedPDFException("XRef stream has entries of zero width.")
+		entry_count = len(rawdata) // entry_width
+		self._log.trace("XRefStrm length is %d bytes with field lengths %s, i.e. %d full entries (%d bytes per entry, %d dangling bytes). Index is %s.", len(rawdata), field_lengths, entry_count, entry_width, len(rawdata) % entry_width, index)
+		if index is None:
+			index = [ 0, entry_count ]
+		if (len(index) % 2) != 0:
+			raise MalformedPDFException("XRef stream /Index must contain pairs of integers, but has %d elements." % (len(index)))
+		subsections = list(zip(index[0 : : 2], index[1 : : 2]))
+		indexed_count = sum(count for (start_id, count) in subsections)
+		if indexed_count > entry_count:
+			raise MalformedPDFException("XRef stream /Index references %d entries, but data contains only %d." % (indexed_count, entry_count))
+		elif (indexed_count < entry_count) or ((len(rawdata) % entry_width) != 0):
+			self._log.warning("XRef stream contains %d bytes of trailing data after %d entries.", len(rawdata) - (indexed_count * entry_width), indexed_count)
+
+		(type_width, field2_width, field3_width) = field_lengths
+		if type_width == 0:
+			types = bytes([ XRefTableEntryType.UncompressedObject ]) * indexed_count
+		elif type_width == 1:
+			types = bytes(rawdata[ : indexed_count * entry_width : entry_width])
+		else:
+			types = bytes(min(value, 0xff) for value in self._decode_column(rawdata, entry_width, indexed_count, 0, type_width, "Q"))
+		# Unknown types are to be treated like references to the null object,
+		# i.e., like free objects
+		types = types.translate(self._XREF_STREAM_TYPE_TRANSLATION)
+		field2 = self._decode_column(rawdata, entry_width, indexed_count, type_width, field2_width, "Q")
+		field3 = self._decode_column(rawdata, entry_width, indexed_count, type_width + field2_width, field3_width, "I")
+
+		position = 0
+		for (start_id, count) in subsections:
+			self._log.trace("XRefStrm subsection with %d entries starting with ObjId %d", count, start_id)
+			self._set_block(start_id, types[position : position + count], field2[position : position + count], field3[position : position + count])
+			position += count
 
 	def add_entry(self, entry):
-		self._content[(entry.objid, entry.gennum)] = entry
-		self._max_objid = max(self._max_objid, entry.objid)
-
-	@staticmethod
-	def _to_int(data):
-		return sum(value << (byteno * 8) for (byteno, value) in enumerate(reversed(data)))
+		if isinstance(entry, UncompressedXRefEntry):
+			self._set(entry.objid, XRefTableEntryType.UncompressedObject, entry.offset, entry.gennum)
+		elif isinstance(entry, CompressedXRefEntry):
+			self._set(entry.objid, XRefTableEntryType.CompressedObject, entry.inside_objid, entry.index)
+		elif isinstance(entry, ReservedXRefEntry):
+			self._set(entry.objid, self._RESERVED, 0, entry.gennum)
+		else:
+			raise TypeError("Unsupported XRef entry type: %s" % (type(entry)))
+
+	def _entry_type(self, objid):
+		if objid < len(self._types):
+			return self._types[objid]
+		return self._ABSENT
+
+	def _get_entry(self, objid):
+		entry_type = self._entry_type(objid)
+		if entry_type == XRefTableEntryType.UncompressedObject:
+			return UncompressedXRefEntry(objid = objid, gennum = self._field3[objid], offset = self._field2[objid])
+		elif entry_type == XRefTableEntryType.CompressedObject:
+			return CompressedXRefEntry(objid = objid, inside_objid = self._field2[objid], index = self._field3[objid])
+		elif entry_type == self._RESERVED:
+			return ReservedXRefEntry(objid, self._field3[objid])
+		else:
+			return None
+
+	def uncompressed_objects(self):
+		"""Yields ObjId, GenNum and offset of all uncompressed objects without
+		creating entry objects."""
+		(types, field2, field3) = (self._types, self._field2, self._field3)
+		objid = types.find(XRefTableEntryType.UncompressedObject)
+		while objid != -1:
+			yield (objid, field3[objid], field2[objid])
+			objid = types.find(XRefTableEntryType.UncompressedObject, objid + 1)
+
+	def find_entry(self, objid):
+		"""Returns the entry of the ObjId regardless of its GenNum, or None."""
+		return self._get_entry(objid)
+
+	def get_entry(self, objid, gennum):
+		entry = self._get_entry(objid)
+		if (entry is None) or (entry.gennum != gennum):
+			return None
+		return entry
+
+	def merge_older(self, older_table):
+		"""Merges the entries of a XRef table that belongs to a previous
+		revision of the document. Objects which are already present in this
+		table, either in use or free, supersede the older entries."""
+		for objid in range(len(older_table._types)):
+			entry_type = older_table._types[objid]
+			if (entry_type != self._ABSENT) and (self._entry_type(objid) == self._ABSENT):
+				self._set(objid, entry_type, older_table._field2[objid], older_table._field3[objid])
+
+	def merge_hybrid(self, xref_stream_table):
+		"""Merges the XRef stream referenced by /XRefStm in the trailer of a
+		hybrid-reference file. Its entries take precedence over objects that
+		are absent or marked free in this classic XRef table, but not over
+		objects which are in use."""
+		for objid in range(len(xref_stream_table._types)):
+			entry_type = xref_stream_table._types[objid]
+			if (entry_type != self._ABSENT) and (self._entry_type(objid) in (self._ABSENT, XRefTableEntryType.FreeObject)):
+				self._set(objid, entry_type, xref_stream_table._field2[objid], xref_stream_table._field3[objid])
 
 	@staticmethod
 	def _write_xref_entry(f, offset, gennum, f_or_n):
@@ -199,30 +334,30 @@ class XRefTable(object):
 	def write_xref_table(self, f):
 		self._xref_offset = f.tell()
 
-		gennum = 0
 		f.writeline("xref")
 		f.writeline("0 %d" % (1 + self._max_objid))
 		self._write_xref_entry(f, 0, 65535, "f")
 		for objid in range(1, self._max_objid + 1):
-			entry = self._content.get((objid, gennum))
-			if entry is None:
-				self._write_xref_entry(f, 0, 65535, "f")
+			if self._entry_type(objid) == XRefTableEntryType.UncompressedObject:
+				self._write_xref_entry(f, self._field2[objid], self._field3[objid], "n")
 			else:
-				self._write_xref_entry(f, entry.offset, entry.gennum, "n")
+				self._write_xref_entry(f, 0, 65535, "f")
 
 	def _get_offset_width(self):
-		max_offset = 0
-		for entry in self._content.values():
-			if not entry.compressed:
-				max_offset = max(max_offset, entry.offset)
+		max_offset = max((offset for (entry_type, offset) in zip(self._types, self._field2) if entry_type == XRefTableEntryType.UncompressedObject), default = 0)
 		offset_width = (max_offset.bit_length() + 7) // 8
 		offset_width = max(offset_width, 1)
 		return offset_width
 
+	def _get_field3_width(self):
+		# Generation numbers of uncompressed objects, or indices inside object
+		# streams for compressed objects
+		max_value = max((value for (entry_type, value) in zip(self._types, self._field3) if entry_type in (XRefTableEntryType.UncompressedObject, XRefTableEntryType.CompressedObject)), default = 0)
+		return max(1, (max_value.bit_length() + 7) // 8)
+
 	def get_free_objid(self):
 		for objid in range(1, self._max_objid + 1):
-			key = (objid, 0)
-			if key not in self._content:
+			if self._types[objid] not in self._IN_USE_TYPES:
 				return objid
 		return self._max_objid + 1
 
@@ -233,42 +368,78 @@ class XRefTable(object):
 		return objid
 
 	@staticmethod
-	def _append_binary_xref_entry(data, field2_width, field1, field2, field3):
+	def _append_binary_xref_entry(data, field2_width, field3_width, field1, field2, field3):
 		data.append(field1)
 		data += field2.to_bytes(length = field2_width, byteorder = "big")
-		data.append(field3)
+		data += field3.to_bytes(length = field3_width, byteorder = "big")
 
-	def _serialize_xref_data(self, offset_width):
-		gennum = 0
+	def _serialize_xref_data(self, offset_width, field3_width):
 		result = bytearray()
-		self._append_binary_xref_entry(result, offset_width, XRefTableEntryType.FreeObject, 0, 255)
+		self._append_binary_xref_entry(result, offset_width, field3_width, XRefTableEntryType.FreeObject, 0, 255)
 		for objid in range(1, self._max_objid + 1):
-			entry = self._content.get((objid, gennum))
-			if entry is None:
-				self._append_binary_xref_entry(result, offset_width, XRefTableEntryType.FreeObject, 0, 255)
-			elif not entry.compressed:
-				self._append_binary_xref_entry(result, offset_width, XRefTableEntryType.UncompressedObject, entry.offset, entry.gennum)
+			entry_type = self._types[objid]
+			if entry_type in (XRefTableEntryType.UncompressedObject, XRefTableEntryType.CompressedObject):
+				self._append_binary_xref_entry(result, offset_width, field3_width, entry_type, self._field2[objid], self._field3[objid])
 			else:
-				self._append_binary_xref_entry(result, offset_width, XRefTableEntryType.CompressedObject, entry.inside_objid, entry.index)
+				self._append_binary_xref_entry(result, offset_width, field3_width, XRefTableEntryType.FreeObject, 0, 255)
 		return result
 
-	def serialize_xref_object(self, trailer_dict, objid):
+	@staticmethod
+	def _strip_trailer(trailer_dict):
+		# References to previous XRef sections of the input file are
+		# meaningless in the written file
+		return { key: value for (key, value) in trailer_dict.items() if key not in [ PDFName("/Prev"), PDFName("/XRefStm") ] }
+
+	def classic_trailer(self, trailer_dict):
+		trailer = self._strip_trailer(trailer_dict)
+		trailer[PDFName("/Size")] = self._max_objid + 1
+		return trailer
+
+	def serialize_xref_object(self, trailer_dict, objid, compression = None):
 		offset_width = self._get_offset_width()
-		content = dict(trailer_dict)
+		field3_width = self._get_field3_width()
+		content = self._strip_trailer(trailer_dict)
 		content.update({
 			PDFName("/Type"):	PDFName("/XRef"),
 			PDFName("/Index"):	[ 0, self._max_objid + 1 ],
 			PDFName("/Size"):	self._max_objid + 1,
-			PDFName("/W"):		[ 1, offset_width, 1 ],
+			PDFName("/W"):		[ 1, offset_width, field3_width ],
 		})
-		data = self._serialize_xref_data(offset_width)
-		return PDFObject.create(objid = objid, gennum = 0, content = content, stream = EncodedObject.create(data))
+		data = self._serialize_xref_data(offset_width, field3_width)
+		return PDFObject.create(objid = objid, gennum = 0, content = content, stream = EncodedObject.create(data, predict = True, columns = 1 + offset_width + field3_width, compression = compression))
+
+	def pack(self):
+		"""Returns the entry types and the second and third field of all
+		entries as little-endian byte strings, see unpack()."""
+		field2 = array.array("Q", self._field2)
+		field3 = array.array("I", self._field3)
+		if sys.byteorder == "big":
+			field2.byteswap()
+			field3.byteswap()
+		return (bytes(self._types), field2.tobytes(), field3.tobytes())
+
+	@classmethod
+	def unpack(cls, types, field2, field3, xref_offset = None):
+		field2 = array.array("Q", field2)
+		field3 = array.array("I", field3)
+		if not (len(types) == len(field2) == len(field3)):
+			raise MalformedPDFException("Packed XRef table has %d types, but %d and %d field values." % (len(types), len(field2), len(field3)))
+		if sys.byteorder == "big":
+			field2.byteswap()
+			field3.byteswap()
+		xref_table = cls()
+		xref_table._set_block(0, bytes(types), field2, field3)
+		xref_table.xref_offset = xref_offset
+		return xref_table
 
 	def __iter__(self):
-		return iter(self._content.items())
+		for objid in range(len(self._types)):
+			if self._types[objid] in self._IN_USE_TYPES:
+				entry = self._get_entry(objid)
+				yield ((entry.objid, entry.gennum), entry)
 
 	def __len__(self):
-		return len(self._content)
+		return self._in_use_count
 
 	def dump(self):
 		for ((objid, gennum), entry) in sorted(self):